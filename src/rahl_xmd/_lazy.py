@@ -0,0 +1,39 @@
+"""
+Lazy package exports for RAHL XMD.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(module_globals: Dict[str, Any],
+                 lazy_imports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build a package's module __getattr__ and __dir__ (PEP 562).
+    
+    Exported objects are imported from their submodule on first access
+    and then cached in the package namespace.
+    
+    Args:
+        module_globals: Package's globals()
+        lazy_imports: Exported name -> submodule defining it, relative
+            to the package
+    
+    Returns:
+        __getattr__ and __dir__ functions for the package
+    """
+    package = module_globals["__name__"]
+    
+    def __getattr__(name: str) -> Any:
+        """Import exported objects on first access."""
+        if name in lazy_imports:
+            module = importlib.import_module(f".{lazy_imports[name]}", package)
+            obj = getattr(module, name)
+            module_globals[name] = obj
+            return obj
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+    
+    def __dir__() -> List[str]:
+        return sorted(list(module_globals) + list(lazy_imports))
+    
+    return __getattr__, __dir__
@@ -5,24 +5,142 @@ Discord bot integration for RAHL XMD pairing system.
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
+from collections import OrderedDict
 import asyncio
-import json
-from datetime import datetime
+import atexit
+import concurrent.futures
+import orjson
+import os
+import queue
+import random
+import signal
+import threading
+import time
+from datetime import datetime, timezone
 import io
+from PIL import Image
 
-from ..core.pairing_system import PairingSystem, CodeTheme, PairingStatus
+from ..core.pairing_system import PairingSystem, PairingCode, CodeTheme, PairingStatus
 from ..core.qr_generator import QRGenerator
-from ..core.animation_engine import AnimationEngine
+from ..core.animation_engine import AnimationEngine, render_frames
 from ..utils.logger import setup_logger
 
 
 logger = setup_logger(__name__)
 
+# Theme lookups, computed once
+_THEMES_BY_VALUE: Dict[str, CodeTheme] = {t.value: t for t in CodeTheme}
+_THEME_VALUES_CSV = ', '.join(_THEMES_BY_VALUE)
+
+# QR generator of the current worker process, created on first use
+_worker_qr_generator: Optional[QRGenerator] = None
+
+# Reusable encode buffers of the current worker process
+_buf_pool: "queue.LifoQueue[io.BytesIO]" = queue.LifoQueue(maxsize=8)
+_MAX_POOLED_BUF_SIZE = 1024 * 1024
+
+# Palette size for interactive animated QR GIFs
+_GIF_COLORS = 32
+
+
+def _get_worker_qr_generator() -> QRGenerator:
+    """Get the QR generator of the current worker process."""
+    global _worker_qr_generator
+    if _worker_qr_generator is None:
+        _worker_qr_generator = QRGenerator()
+    return _worker_qr_generator
+
+
+def _acquire_buf() -> io.BytesIO:
+    """Get an empty encode buffer from the pool."""
+    try:
+        buf = _buf_pool.get_nowait()
+    except queue.Empty:
+        return io.BytesIO()
+    buf.seek(0)
+    buf.truncate(0)
+    return buf
+
+
+def _release_buf(buf: io.BytesIO) -> None:
+    """Return an encode buffer to the pool, dropping oversized ones."""
+    if buf.tell() > _MAX_POOLED_BUF_SIZE:
+        return
+    try:
+        _buf_pool.put_nowait(buf)
+    except queue.Full:
+        pass
+
+
+def _render_qr(pairing_code: PairingCode) -> bytes:
+    """
+    Render a pairing code QR image as PNG bytes.
+    
+    Args:
+        pairing_code: PairingCode object
+    
+    Returns:
+        PNG encoded image
+    """
+    qr_generator = _get_worker_qr_generator()
+    image_binary = _acquire_buf()
+    try:
+        return qr_generator.generate_qr_png_bytes(pairing_code, buffer=image_binary)
+    finally:
+        _release_buf(image_binary)
+
+
+def _encode_gif(frames: List[Image.Image]) -> bytes:
+    """
+    Encode animation frames as GIF bytes.
+    
+    Args:
+        frames: Animation frames
+    
+    Returns:
+        GIF encoded animation
+    """
+    # Quantize once against a shared palette so the encoder has no
+    # per-frame palette work left to do
+    palette = frames[0].convert('RGB').quantize(colors=_GIF_COLORS)
+    frames = [
+        frame.convert('RGB').quantize(palette=palette, dither=Image.Dither.NONE)
+        for frame in frames
+    ]
+    
+    gif_binary = _acquire_buf()
+    try:
+        frames[0].save(
+            gif_binary,
+            format='GIF',
+            save_all=True,
+            append_images=frames[1:],
+            duration=100,
+            loop=0,
+            disposal=2
+        )
+        return gif_binary.getvalue()
+    finally:
+        _release_buf(gif_binary)
+
 
 class RAHLDiscordBot(commands.Bot):
     """Discord bot for RAHL XMD pairing system."""
     
+    # Seconds a fetched Discord user stays cached
+    _USER_TTL = 300
+    
+    # Maximum number of rendered QR codes kept in memory
+    _QR_CACHE_SIZE = 256
+    
+    # Number of worker processes for image rendering
+    _POOL_WORKERS = 2
+    
+    # Limits on commands processed concurrently
+    _MAX_IN_FLIGHT = 64
+    _MAX_PER_GUILD = 4
+    
     def __init__(self, 
                  command_prefix: str = "!",
                  intents: Optional[discord.Intents] = None,
@@ -47,33 +165,91 @@ class RAHLDiscordBot(commands.Bot):
         self.qr_generator = QRGenerator()
         self.animation_engine = AnimationEngine(qr_generator=self.qr_generator)
         
+        # Worker processes for CPU-bound QR and GIF rendering
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self._POOL_WORKERS)
+        
+        # Rendered QR PNGs ((code, theme) -> bytes), least recently used first
+        self._qr_cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        
         # User mapping (Discord ID -> RAHL XMD user ID)
         self.user_mapping: Dict[int, str] = {}
         
+        # Cache of fetched Discord users (Discord ID -> (fetched at, user))
+        self._user_cache: Dict[int, Tuple[float, discord.User]] = {}
+        
+        # Command concurrency limits (guild ID, 0 for DMs -> semaphore)
+        self._global_sem = asyncio.Semaphore(self._MAX_IN_FLIGHT)
+        self._per_guild_sem: Dict[int, asyncio.Semaphore] = {}
+        
+        # Rate limit state (bucket -> monotonic time the bucket frees up)
+        self._bucket_reset: Dict[str, float] = {}
+        
+        # Mapping changes are batched and flushed periodically
+        self._mapping_dirty = False
+        self._flush_interval = 5.0
+        self._mapping_save_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Static embeds, copied and timestamped per use
+        self._themes_embed_template = self._build_themes_embed()
+        self._help_embed_template = self._build_help_embed()
+        
         # Load user mapping
         self._load_user_mapping()
+        
+        # Reverse index (RAHL XMD user ID -> Discord ID), kept in lockstep
+        self._reverse_mapping: Dict[str, int] = {v: k for k, v in self.user_mapping.items()}
+        
+        # Make sure pending mapping changes survive interpreter shutdown
+        atexit.register(self._flush_user_mapping)
     
     def _load_user_mapping(self) -> None:
         """Load Discord user mapping from file."""
         try:
             mapping_file = self.pairing_system.data_dir / "discord_users.json"
             if mapping_file.exists():
-                with open(mapping_file, 'r') as f:
-                    self.user_mapping = json.load(f)
-                    # Convert keys back to integers
-                    self.user_mapping = {int(k): v for k, v in self.user_mapping.items()}
+                # JSON object keys are strings; convert back to integers
+                self.user_mapping = {
+                    int(k): v for k, v in orjson.loads(mapping_file.read_bytes()).items()
+                }
                 logger.info(f"Loaded {len(self.user_mapping)} user mappings")
         except Exception as e:
             logger.error(f"Failed to load user mapping: {e}")
     
     def _save_user_mapping(self) -> None:
         """Save Discord user mapping to file."""
-        try:
-            mapping_file = self.pairing_system.data_dir / "discord_users.json"
-            with open(mapping_file, 'w') as f:
-                json.dump(self.user_mapping, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save user mapping: {e}")
+        # Saves run from the flush loop's worker thread and at shutdown
+        with self._mapping_save_lock:
+            # Cleared before serializing so changes made meanwhile stay pending
+            self._mapping_dirty = False
+            try:
+                mapping_file = self.pairing_system.data_dir / "discord_users.json"
+                tmp_file = mapping_file.with_suffix('.tmp')
+                tmp_file.write_bytes(orjson.dumps(
+                    self.user_mapping,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ))
+                os.replace(tmp_file, mapping_file)
+            except Exception as e:
+                self._mapping_dirty = True
+                logger.error(f"Failed to save user mapping: {e}")
+    
+    def _flush_user_mapping(self) -> None:
+        """Save user mapping only if it changed since the last save."""
+        if self._mapping_dirty:
+            self._save_user_mapping()
+    
+    async def _flush_loop(self) -> None:
+        """Periodically flush pending user mapping changes to disk."""
+        while not self.is_closed():
+            await asyncio.sleep(self._flush_interval)
+            if self._mapping_dirty:
+                await asyncio.get_running_loop().run_in_executor(None, self._save_user_mapping)
+    
+    def _handle_sigterm(self) -> None:
+        """Flush user mapping and shut down on SIGTERM."""
+        self._flush_user_mapping()
+        asyncio.create_task(self.close())
     
     def _get_or_create_user_id(self, discord_user: discord.User) -> str:
         """
@@ -87,11 +263,21 @@ class RAHLDiscordBot(commands.Bot):
         """
         discord_id = discord_user.id
         
-        if discord_id in self.user_mapping:
-            return self.user_mapping[discord_id]
+        user_id = self.user_mapping.get(discord_id)
+        if user_id is not None:
+            return user_id
         
-        # Create new user
         user_id = f"discord_{discord_id}"
+        
+        # Known to the pairing system but not mapped yet; skip building
+        # the registration data (the avatar URL in particular)
+        if self.pairing_system.get_user(user_id) is not None:
+            self.user_mapping[discord_id] = user_id
+            self._reverse_mapping[user_id] = discord_id
+            self._mapping_dirty = True
+            return user_id
+        
+        # Create new user
         username = f"{discord_user.name}#{discord_user.discriminator}"
         
         try:
@@ -105,7 +291,8 @@ class RAHLDiscordBot(commands.Bot):
             )
             
             self.user_mapping[discord_id] = user_id
-            self._save_user_mapping()
+            self._reverse_mapping[user_id] = discord_id
+            self._mapping_dirty = True
             
             logger.info(f"Created new user for Discord user {username}")
             return user_id
@@ -114,15 +301,203 @@ class RAHLDiscordBot(commands.Bot):
             # User might already exist
             if "already exists" in str(e):
                 self.user_mapping[discord_id] = user_id
-                self._save_user_mapping()
+                self._reverse_mapping[user_id] = discord_id
+                self._mapping_dirty = True
                 return user_id
             raise
     
+    async def _get_user_id(self, discord_user: discord.User) -> str:
+        """
+        Get RAHL XMD user ID for Discord user.
+        
+        A synchronous call, kept async for its callers. Lookup and
+        registration run on the event loop so that concurrent commands
+        from one new user can't register it twice. Registration usually
+        just buffers a log entry for the pairing system's flush thread,
+        but when the log passes its compaction threshold it rewrites the
+        users snapshot (pickle and fsync) inline, on the loop; compacting
+        on another thread would race the store mutations made here.
+        
+        Args:
+            discord_user: Discord user object
+        
+        Returns:
+            RAHL XMD user ID
+        """
+        return self._get_or_create_user_id(discord_user)
+    
+    async def _cached_fetch_user(self, discord_id: int) -> discord.User:
+        """
+        Get a Discord user, preferring cached copies over REST calls.
+        
+        Args:
+            discord_id: Discord user ID
+        
+        Returns:
+            Discord user object
+        """
+        now = time.monotonic()
+        entry = self._user_cache.get(discord_id)
+        if entry and now - entry[0] < self._USER_TTL:
+            return entry[1]
+        
+        user = self.get_user(discord_id) or await self.fetch_user(discord_id)
+        self._user_cache[discord_id] = (now, user)
+        return user
+    
+    @staticmethod
+    def _bucket_for(ctx: commands.Context) -> str:
+        """Get the rate limit bucket for replies in a command context."""
+        return f"channel:{ctx.channel.id}"
+    
+    @staticmethod
+    def _get_retry_after(error: discord.HTTPException) -> float:
+        """Read the Retry-After delay from a rate limited response."""
+        try:
+            return float(error.response.headers.get('Retry-After', 1.0))
+        except (AttributeError, TypeError, ValueError):
+            return 1.0
+    
+    async def _send_with_retry(self,
+                               coro_factory: Callable[[], Awaitable[Any]],
+                               bucket: str = "global",
+                               max_attempts: int = 4) -> Any:
+        """
+        Run a Discord API call, backing off exponentially when rate limited.
+        
+        Args:
+            coro_factory: Callable creating a fresh API call coroutine
+            bucket: Rate limit bucket the call belongs to
+            max_attempts: Maximum number of attempts
+        
+        Returns:
+            Result of the API call
+        """
+        for attempt in range(max_attempts):
+            # Wait out a rate limit already known for this bucket
+            delay = self._bucket_reset.get(bucket, 0.0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            try:
+                return await coro_factory()
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == max_attempts - 1:
+                    raise
+                
+                backoff = min((2 ** attempt) * self._get_retry_after(e) + random.random() * 0.1, 30)
+                self._bucket_reset[bucket] = time.monotonic() + backoff
+                logger.warning(f"Rate limited on {bucket}, retrying in {backoff:.2f}s")
+    
+    async def _get_qr_png(self, pairing_code: PairingCode) -> bytes:
+        """
+        Get the rendered QR PNG for a pairing code, rendering on cache miss.
+        
+        Args:
+            pairing_code: PairingCode object
+        
+        Returns:
+            PNG encoded image
+        """
+        key = (pairing_code.code, pairing_code.theme.value)
+        png_bytes = self._qr_cache.get(key)
+        if png_bytes is not None:
+            self._qr_cache.move_to_end(key)
+            return png_bytes
+        
+        # Render QR code off the event loop
+        png_bytes = await asyncio.get_running_loop().run_in_executor(
+            self._pool, _render_qr, pairing_code
+        )
+        
+        self._qr_cache[key] = png_bytes
+        if len(self._qr_cache) > self._QR_CACHE_SIZE:
+            self._qr_cache.popitem(last=False)
+        
+        return png_bytes
+    
+    def _build_themes_embed(self) -> discord.Embed:
+        """Build the static part of the !themes embed."""
+        embed = discord.Embed(
+            title="🎨 Available Themes",
+            description="Choose a theme for your pairing codes:",
+            color=discord.Color.gold()
+        )
+        
+        for theme in CodeTheme:
+            embed.add_field(
+                name=theme.value.title(),
+                value=f"`!pair {theme.value}`",
+                inline=True
+            )
+        
+        embed.add_field(
+            name="🌀 Animated QR",
+            value="Use `!animatedqr <code>` after generating a code",
+            inline=False
+        )
+        
+        embed.set_footer(text="RAHL XMD Pairing System")
+        
+        return embed
+    
+    def _build_help_embed(self) -> discord.Embed:
+        """Build the static part of the !help embed."""
+        embed = discord.Embed(
+            title="🤖 RAHL XMD Pairing Bot Help",
+            description="Here are all available commands:",
+            color=discord.Color.blue()
+        )
+        
+        commands_info = [
+            ("!pair [theme]", "Generate a pairing code with optional theme"),
+            ("!scan <code>", "Use someone's pairing code to connect"),
+            ("!mypairs", "Show your active pairings"),
+            ("!pairstats", "Show your pairing statistics"),
+            ("!animatedqr <code>", "Generate animated QR code for your pairing code"),
+            ("!themes", "Show available themes"),
+            ("!help", "Show this help message"),
+        ]
+        
+        for cmd, desc in commands_info:
+            embed.add_field(name=cmd, value=desc, inline=False)
+        
+        embed.add_field(
+            name="💡 Quick Start",
+            value="1. Use `!pair` to generate a code\n"
+                  "2. Share the code with friends\n"
+                  "3. They use `!scan <your-code>` to connect\n"
+                  "4. Use `!mypairs` to see your connections",
+            inline=False
+        )
+        
+        embed.set_footer(text="RAHL XMD Pairing System")
+        
+        return embed
+    
     async def setup_hook(self) -> None:
         """Setup bot commands."""
         # Sync application commands
         await self.tree.sync()
         logger.info("Bot commands synced")
+        
+        # Start batched user mapping persistence
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._handle_sigterm)
+        except NotImplementedError:
+            # Signal handlers are not available on this platform (e.g. Windows)
+            pass
+    
+    async def close(self) -> None:
+        """Flush pending state and close the bot."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._flush_user_mapping()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        await super().close()
     
     async def on_ready(self) -> None:
         """Called when bot is ready."""
@@ -130,12 +505,12 @@ class RAHLDiscordBot(commands.Bot):
         logger.info(f'Connected to {len(self.guilds)} guilds')
         
         # Set bot status
-        await self.change_presence(
+        await self._send_with_retry(lambda: self.change_presence(
             activity=discord.Activity(
                 type=discord.ActivityType.watching,
                 name="for pairing codes 👁️"
             )
-        )
+        ), "presence")
     
     async def on_message(self, message: discord.Message) -> None:
         """Handle incoming messages."""
@@ -143,8 +518,14 @@ class RAHLDiscordBot(commands.Bot):
         if message.author.bot:
             return
         
-        # Process commands
-        await self.process_commands(message)
+        # Process commands, bounded so one busy guild can't starve the others
+        guild_id = message.guild.id if message.guild else 0
+        guild_sem = self._per_guild_sem.get(guild_id)
+        if guild_sem is None:
+            guild_sem = self._per_guild_sem[guild_id] = asyncio.Semaphore(self._MAX_PER_GUILD)
+        
+        async with self._global_sem, guild_sem:
+            await self.process_commands(message)
     
     @commands.command(name="pair")
     async def pair_command(self, ctx: commands.Context, theme: str = "default"):
@@ -154,15 +535,16 @@ class RAHLDiscordBot(commands.Bot):
         Usage: !pair [theme]
         Themes: default, neon, cyberpunk, matrix, aurora, hologram
         """
+        now = datetime.now(timezone.utc)
+        
         try:
             # Get or create user
-            user_id = self._get_or_create_user_id(ctx.author)
+            user_id = await self._get_user_id(ctx.author)
             
             # Validate theme
-            try:
-                code_theme = CodeTheme(theme.lower())
-            except ValueError:
-                await ctx.send(f"❌ Invalid theme. Available themes: {', '.join(t.value for t in CodeTheme)}")
+            code_theme = _THEMES_BY_VALUE.get(theme.lower())
+            if code_theme is None:
+                await self._send_with_retry(lambda: ctx.send(f"❌ Invalid theme. Available themes: {_THEME_VALUES_CSV}"), self._bucket_for(ctx))
                 return
             
             # Generate pairing code
@@ -173,60 +555,55 @@ class RAHLDiscordBot(commands.Bot):
                 max_uses=3
             )
             
-            # Generate QR code
-            qr_img = self.qr_generator.generate_qr_code(pairing_code)
+            # Get QR code image
+            png_bytes = await self._get_qr_png(pairing_code)
             
-            # Convert to bytes for Discord
-            with io.BytesIO() as image_binary:
-                qr_img.save(image_binary, 'PNG')
-                image_binary.seek(0)
-                
-                # Create embed
-                embed = discord.Embed(
-                    title="🔗 RAHL XMD Pairing Code",
-                    description=f"Share this code with others to connect!",
-                    color=discord.Color.blue(),
-                    timestamp=datetime.now()
-                )
-                
-                embed.add_field(
-                    name="📋 Code",
-                    value=f"```{pairing_code.code}```",
-                    inline=False
-                )
-                
-                embed.add_field(
-                    name="🎨 Theme",
-                    value=pairing_code.theme.value.title(),
-                    inline=True
-                )
-                
-                embed.add_field(
-                    name="⏰ Expires",
-                    value=f"<t:{int(pairing_code.expires_at.timestamp())}:R>",
-                    inline=True
-                )
-                
-                embed.add_field(
-                    name="📊 Uses",
-                    value=f"{pairing_code.uses_count}/{pairing_code.max_uses}",
-                    inline=True
-                )
-                
-                embed.set_footer(text="RAHL XMD Pairing System")
-                embed.set_image(url="attachment://qrcode.png")
-                
-                # Send message
-                await ctx.send(
-                    embed=embed,
-                    file=discord.File(image_binary, filename="qrcode.png")
-                )
-                
-                logger.info(f"Generated pairing code {pairing_code.code} for {ctx.author}")
+            # Create embed
+            embed = discord.Embed(
+                title="🔗 RAHL XMD Pairing Code",
+                description=f"Share this code with others to connect!",
+                color=discord.Color.blue(),
+                timestamp=now
+            )
+            
+            embed.add_field(
+                name="📋 Code",
+                value=f"```{pairing_code.code}```",
+                inline=False
+            )
+            
+            embed.add_field(
+                name="🎨 Theme",
+                value=pairing_code.theme.value.title(),
+                inline=True
+            )
+            
+            embed.add_field(
+                name="⏰ Expires",
+                value=f"<t:{int(pairing_code.expires_at.timestamp())}:R>",
+                inline=True
+            )
+            
+            embed.add_field(
+                name="📊 Uses",
+                value=f"{pairing_code.uses_count}/{pairing_code.max_uses}",
+                inline=True
+            )
+            
+            embed.set_footer(text="RAHL XMD Pairing System")
+            embed.set_image(url="attachment://qrcode.png")
+            
+            # Send message (each attempt gets a fresh file object)
+            await self._send_with_retry(lambda: ctx.send(
+                embed=embed,
+                file=discord.File(io.BytesIO(png_bytes), filename="qrcode.png")
+            ), self._bucket_for(ctx))
+            
+            logger.info(f"Generated pairing code {pairing_code.code} for {ctx.author}")
         
         except Exception as e:
             logger.error(f"Error in pair command: {e}")
-            await ctx.send(f"❌ An error occurred: {str(e)}")
+            await self._send_with_retry(lambda: ctx.send(f"❌ An error occurred: {str(e)}"), self._bucket_for(ctx))
     
     @commands.command(name="scan")
     async def scan_command(self, ctx: commands.Context, code: str):
@@ -235,9 +612,11 @@ class RAHLDiscordBot(commands.Bot):
         
         Usage: !scan <code>
         """
+        now = datetime.now(timezone.utc)
+        
         try:
             # Get or create user
-            user_id = self._get_or_create_user_id(ctx.author)
+            user_id = await self._get_user_id(ctx.author)
             
             # Use pairing code
             success, message = self.pairing_system.use_pairing_code(code.upper(), user_id)
@@ -252,7 +631,7 @@ class RAHLDiscordBot(commands.Bot):
                         title="✅ Pairing Successful!",
                         description=f"You are now paired with another user!",
                         color=discord.Color.green(),
-                        timestamp=datetime.now()
+                        timestamp=now
                     )
                     
                     embed.add_field(
@@ -276,28 +655,24 @@ class RAHLDiscordBot(commands.Bot):
                     
                     embed.set_footer(text="RAHL XMD Pairing System")
                     
-                    await ctx.send(embed=embed)
+                    await self._send_with_retry(lambda: ctx.send(embed=embed), self._bucket_for(ctx))
                     
                     # Try to notify the other user
                     other_user_id = pairing.user2_id if pairing.user1_id == user_id else pairing.user1_id
                     
                     # Find Discord user
-                    discord_id = None
-                    for disc_id, rahl_id in self.user_mapping.items():
-                        if rahl_id == other_user_id:
-                            discord_id = disc_id
-                            break
+                    discord_id = self._reverse_mapping.get(other_user_id)
                     
                     if discord_id:
                         try:
-                            other_user = await self.fetch_user(discord_id)
+                            other_user = await self._cached_fetch_user(discord_id)
                             if other_user:
                                 # Send DM
                                 dm_embed = discord.Embed(
                                     title="🔔 New Pairing!",
                                     description=f"**{ctx.author.name}** used your pairing code!",
                                     color=discord.Color.blue(),
-                                    timestamp=datetime.now()
+                                    timestamp=now
                                 )
                                 
                                 dm_embed.add_field(
@@ -312,18 +687,18 @@ class RAHLDiscordBot(commands.Bot):
                                     inline=True
                                 )
                                 
-                                await other_user.send(embed=dm_embed)
-                        except:
+                                await self._send_with_retry(lambda: other_user.send(embed=dm_embed), f"dm:{other_user.id}")
+                        except discord.HTTPException:
                             pass  # Couldn't send DM
                 
                 logger.info(f"User {ctx.author} used code {code}")
             
             else:
-                await ctx.send(f"❌ {message}")
+                await self._send_with_retry(lambda: ctx.send(f"❌ {message}"), self._bucket_for(ctx))
         
         except Exception as e:
             logger.error(f"Error in scan command: {e}")
-            await ctx.send(f"❌ An error occurred: {str(e)}")
+            await self._send_with_retry(lambda: ctx.send(f"❌ An error occurred: {str(e)}"), self._bucket_for(ctx))
     
     @commands.command(name="mypairs")
     async def mypairs_command(self, ctx: commands.Context):
@@ -332,9 +707,11 @@ class RAHLDiscordBot(commands.Bot):
         
         Usage: !mypairs
         """
+        now = datetime.now(timezone.utc)
+        
         try:
             # Get or create user
-            user_id = self._get_or_create_user_id(ctx.author)
+            user_id = await self._get_user_id(ctx.author)
             
             # Get pairings
             pairings = self.pairing_system.get_user_pairings(
@@ -347,7 +724,7 @@ class RAHLDiscordBot(commands.Bot):
                     title="🤷 No Active Pairings",
                     description="You haven't paired with anyone yet!",
                     color=discord.Color.orange(),
-                    timestamp=datetime.now()
+                    timestamp=now
                 )
                 
                 embed.add_field(
@@ -356,7 +733,7 @@ class RAHLDiscordBot(commands.Bot):
                     inline=False
                 )
                 
-                await ctx.send(embed=embed)
+                await self._send_with_retry(lambda: ctx.send(embed=embed), self._bucket_for(ctx))
                 return
             
             # Create embed
@@ -364,22 +741,30 @@ class RAHLDiscordBot(commands.Bot):
                 title=f"🔗 Your Active Pairings ({len(pairings)})",
                 description="Here are your current connections:",
                 color=discord.Color.blue(),
-                timestamp=datetime.now()
+                timestamp=now
             )
             
-            for i, pairing in enumerate(pairings[:5], 1):
-                # Get other user's info
-                other_user_id = pairing.user2_id if pairing.user1_id == user_id else pairing.user1_id
-                
-                # Try to find Discord user
-                discord_user = None
-                for disc_id, rahl_id in self.user_mapping.items():
-                    if rahl_id == other_user_id:
-                        try:
-                            discord_user = await self.fetch_user(disc_id)
-                        except:
-                            pass
-                        break
+            shown_pairings = pairings[:5]
+            other_ids = [
+                p.user2_id if p.user1_id == user_id else p.user1_id
+                for p in shown_pairings
+            ]
+            disc_ids = [self._reverse_mapping.get(other_id) for other_id in other_ids]
+            
+            # Fetch known Discord users concurrently
+            fetched = iter(await asyncio.gather(
+                *(self._cached_fetch_user(disc_id) for disc_id in disc_ids if disc_id),
+                return_exceptions=True
+            ))
+            discord_users = [next(fetched) if disc_id else None for disc_id in disc_ids]
+            
+            for i, (pairing, other_user_id, discord_user) in enumerate(
+                    zip(shown_pairings, other_ids, discord_users), 1):
+                # Failed fetches fall back to the RAHL XMD user ID
+                if isinstance(discord_user, discord.HTTPException):
+                    discord_user = None
+                elif isinstance(discord_user, BaseException):
+                    raise discord_user
                 
                 user_display = discord_user.mention if discord_user else f"`{other_user_id[:8]}...`"
                 
@@ -394,11 +779,11 @@ class RAHLDiscordBot(commands.Bot):
             if len(pairings) > 5:
                 embed.set_footer(text=f"... and {len(pairings) - 5} more pairings")
             
-            await ctx.send(embed=embed)
+            await self._send_with_retry(lambda: ctx.send(embed=embed), self._bucket_for(ctx))
         
         except Exception as e:
             logger.error(f"Error in mypairs command: {e}")
-            await ctx.send(f"❌ An error occurred: {str(e)}")
+            await self._send_with_retry(lambda: ctx.send(f"❌ An error occurred: {str(e)}"), self._bucket_for(ctx))
     
     @commands.command(name="pairstats")
     async def pairstats_command(self, ctx: commands.Context):
@@ -407,9 +792,11 @@ class RAHLDiscordBot(commands.Bot):
         
         Usage: !pairstats
         """
+        now = datetime.now(timezone.utc)
+        
         try:
             # Get or create user
-            user_id = self._get_or_create_user_id(ctx.author)
+            user_id = await self._get_user_id(ctx.author)
             
             # Get stats
             stats = self.pairing_system.get_user_stats(user_id)
@@ -418,7 +805,7 @@ class RAHLDiscordBot(commands.Bot):
             embed = discord.Embed(
                 title="📊 Your Pairing Statistics",
                 color=discord.Color.purple(),
-                timestamp=datetime.now()
+                timestamp=now
             )
             
             embed.add_field(
@@ -461,11 +848,11 @@ class RAHLDiscordBot(commands.Bot):
             
             embed.set_footer(text="RAHL XMD Pairing System")
             
-            await ctx.send(embed=embed)
+            await self._send_with_retry(lambda: ctx.send(embed=embed), self._bucket_for(ctx))
         
         except Exception as e:
             logger.error(f"Error in pairstats command: {e}")
-            await ctx.send(f"❌ An error occurred: {str(e)}")
+            await self._send_with_retry(lambda: ctx.send(f"❌ An error occurred: {str(e)}"), self._bucket_for(ctx))
     
     @commands.command(name="animatedqr")
     async def animatedqr_command(self, ctx: commands.Context, code: str):
@@ -474,62 +861,62 @@ class RAHLDiscordBot(commands.Bot):
         
         Usage: !animatedqr <code>
         """
+        now = datetime.now(timezone.utc)
+        
         try:
             # Get pairing code
             pairing_code = self.pairing_system.get_pairing_code(code.upper())
             
             if not pairing_code:
-                await ctx.send(f"❌ Pairing code not found")
+                await self._send_with_retry(lambda: ctx.send(f"❌ Pairing code not found"), self._bucket_for(ctx))
                 return
             
             # Check if user owns the code
-            user_id = self._get_or_create_user_id(ctx.author)
+            user_id = await self._get_user_id(ctx.author)
             if pairing_code.owner_id != user_id:
-                await ctx.send(f"❌ You don't own this pairing code")
+                await self._send_with_retry(lambda: ctx.send(f"❌ You don't own this pairing code"), self._bucket_for(ctx))
                 return
             
-            # Generate animated frames
-            frames = self.animation_engine.create_theme_animation(
+            # Render animation chunks in parallel off the event loop
+            loop = asyncio.get_running_loop()
+            specs = self.animation_engine.frame_specs(
                 pairing_code,
-                pairing_code.theme
+                pairing_code.theme,
+                chunks=self._POOL_WORKERS
             )
+            frame_chunks = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, render_frames, spec) for spec in specs)
+            )
+            frames = [frame for chunk in frame_chunks for frame in chunk]
             
             if len(frames) > 1:
-                # Save as GIF
-                with io.BytesIO() as gif_binary:
-                    # Save first frame
-                    frames[0].save(
-                        gif_binary,
-                        format='GIF',
-                        save_all=True,
-                        append_images=frames[1:],
-                        duration=100,
-                        loop=0,
-                        optimize=True
-                    )
-                    gif_binary.seek(0)
-                    
-                    # Send GIF
-                    file = discord.File(gif_binary, filename="animated_qr.gif")
-                    
-                    embed = discord.Embed(
-                        title="🌀 Animated QR Code",
-                        description=f"Here's your animated QR code for `{code}`",
-                        color=discord.Color.blue(),
-                        timestamp=datetime.now()
-                    )
-                    
-                    embed.set_image(url="attachment://animated_qr.gif")
-                    embed.set_footer(text="RAHL XMD Pairing System")
-                    
-                    await ctx.send(embed=embed, file=file)
+                # Encode in this process, where the frames already are, off
+                # the event loop; sending them back to the pool would pickle
+                # every frame a second time
+                gif_bytes = await loop.run_in_executor(None, _encode_gif, frames)
+                
+                embed = discord.Embed(
+                    title="🌀 Animated QR Code",
+                    description=f"Here's your animated QR code for `{code}`",
+                    color=discord.Color.blue(),
+                    timestamp=now
+                )
+                
+                embed.set_image(url="attachment://animated_qr.gif")
+                embed.set_footer(text="RAHL XMD Pairing System")
+                
+                # Send GIF (each attempt gets a fresh file object)
+                await self._send_with_retry(lambda: ctx.send(
+                    embed=embed,
+                    file=discord.File(io.BytesIO(gif_bytes), filename="animated_qr.gif")
+                ), self._bucket_for(ctx))
             
             else:
-                await ctx.send("❌ Could not generate animated QR code")
+                await self._send_with_retry(lambda: ctx.send("❌ Could not generate animated QR code"), self._bucket_for(ctx))
         
         except Exception as e:
             logger.error(f"Error in animatedqr command: {e}")
-            await ctx.send(f"❌ An error occurred: {str(e)}")
+            await self._send_with_retry(lambda: ctx.send(f"❌ An error occurred: {str(e)}"), self._bucket_for(ctx))
     
     @commands.command(name="themes")
     async def themes_command(self, ctx: commands.Context):
@@ -538,29 +925,10 @@ class RAHLDiscordBot(commands.Bot):
         
         Usage: !themes
         """
-        embed = discord.Embed(
-            title="🎨 Available Themes",
-            description="Choose a theme for your pairing codes:",
-            color=discord.Color.gold(),
-            timestamp=datetime.now()
-        )
+        embed = self._themes_embed_template.copy()
+        embed.timestamp = datetime.now(timezone.utc)
         
-        for theme in CodeTheme:
-            embed.add_field(
-                name=theme.value.title(),
-                value=f"`!pair {theme.value}`",
-                inline=True
-            )
-        
-        embed.add_field(
-            name="🌀 Animated QR",
-            value="Use `!animatedqr <code>` after generating a code",
-            inline=False
-        )
-        
-        embed.set_footer(text="RAHL XMD Pairing System")
-        
-        await ctx.send(embed=embed)
+        await self._send_with_retry(lambda: ctx.send(embed=embed), self._bucket_for(ctx))
     
     @commands.command(name="help")
     async def help_command(self, ctx: commands.Context):
@@ -569,35 +937,7 @@ class RAHLDiscordBot(commands.Bot):
         
         Usage: !help
         """
-        embed = discord.Embed(
-            title="🤖 RAHL XMD Pairing Bot Help",
-            description="Here are all available commands:",
-            color=discord.Color.blue(),
-            timestamp=datetime.now()
-        )
-        
-        commands_info = [
-            ("!pair [theme]", "Generate a pairing code with optional theme"),
-            ("!scan <code>", "Use someone's pairing code to connect"),
-            ("!mypairs", "Show your active pairings"),
-            ("!pairstats", "Show your pairing statistics"),
-            ("!animatedqr <code>", "Generate animated QR code for your pairing code"),
-            ("!themes", "Show available themes"),
-            ("!help", "Show this help message"),
-        ]
-        
-        for cmd, desc in commands_info:
-            embed.add_field(name=cmd, value=desc, inline=False)
-        
-        embed.add_field(
-            name="💡 Quick Start",
-            value="1. Use `!pair` to generate a code\n"
-                  "2. Share the code with friends\n"
-                  "3. They use `!scan <your-code>` to connect\n"
-                  "4. Use `!mypairs` to see your connections",
-            inline=False
-        )
-        
-        embed.set_footer(text="RAHL XMD Pairing System")
+        embed = self._help_embed_template.copy()
+        embed.timestamp = datetime.now(timezone.utc)
         
-        await ctx.send(embed=embed)
+        await self._send_with_retry(lambda: ctx.send(embed=embed), self._bucket_for(ctx))
@@ -1,13 +1,23 @@
 """
 Bot integration modules for RAHL XMD pairing system.
+
+Bot classes are imported on first access so that using one transport
+doesn't pull in the client libraries of the others.
 """
 
-from .discord_bot import RAHLDiscordBot
-from .telegram_bot import RAHLTelegramBot
-from .web_bot import RAHLWebBot
+from .._lazy import lazy_exports
+
+# Exported name -> submodule defining it
+_LAZY_IMPORTS = {
+    "RAHLDiscordBot": "discord_bot",
+    "RAHLTelegramBot": "telegram_bot",
+    "RAHLWebBot": "web_bot",
+}
 
 __all__ = [
     "RAHLDiscordBot",
     "RAHLTelegramBot",
     "RAHLWebBot",
 ]
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
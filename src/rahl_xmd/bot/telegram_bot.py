@@ -3,8 +3,10 @@ Telegram bot integration for RAHL XMD pairing system.
 """
 
 import asyncio
+import atexit
+import os
 from typing import Optional, Dict, Any
-import json
+import orjson
 from datetime import datetime
 import io
 from pathlib import Path
@@ -50,11 +52,25 @@ class RAHLTelegramBot:
         # User mapping (Telegram ID -> RAHL XMD user ID)
         self.user_mapping: Dict[int, str] = {}
         
+        # Mapping changes are batched and flushed periodically
+        self._mapping_dirty = False
+        self._flush_interval = 5.0
+        self._flush_task: Optional[asyncio.Task] = None
+        
         # Load user mapping
         self._load_user_mapping()
         
+        # Make sure pending mapping changes survive interpreter shutdown
+        atexit.register(self._flush_user_mapping)
+        
         # Create application
-        self.application = Application.builder().token(token).build()
+        self.application = (
+            Application.builder()
+            .token(token)
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
         
         # Register handlers
         self._register_handlers()
@@ -64,10 +80,10 @@ class RAHLTelegramBot:
         try:
             mapping_file = self.pairing_system.data_dir / "telegram_users.json"
             if mapping_file.exists():
-                with open(mapping_file, 'r') as f:
-                    self.user_mapping = json.load(f)
-                    # Convert keys back to integers
-                    self.user_mapping = {int(k): v for k, v in self.user_mapping.items()}
+                # JSON object keys are strings; convert back to integers
+                self.user_mapping = {
+                    int(k): v for k, v in orjson.loads(mapping_file.read_bytes()).items()
+                }
                 logger.info(f"Loaded {len(self.user_mapping)} user mappings")
         except Exception as e:
             logger.error(f"Failed to load user mapping: {e}")
@@ -76,11 +92,39 @@ class RAHLTelegramBot:
         """Save Telegram user mapping to file."""
         try:
             mapping_file = self.pairing_system.data_dir / "telegram_users.json"
-            with open(mapping_file, 'w') as f:
-                json.dump(self.user_mapping, f, indent=2)
+            tmp_file = mapping_file.with_suffix('.tmp')
+            tmp_file.write_bytes(orjson.dumps(
+                self.user_mapping,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ))
+            os.replace(tmp_file, mapping_file)
+            self._mapping_dirty = False
         except Exception as e:
             logger.error(f"Failed to save user mapping: {e}")
     
+    def _flush_user_mapping(self) -> None:
+        """Save user mapping only if it changed since the last save."""
+        if self._mapping_dirty:
+            self._save_user_mapping()
+    
+    async def _flush_loop(self) -> None:
+        """Periodically flush pending user mapping changes to disk."""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            self._flush_user_mapping()
+    
+    async def _post_init(self, application: Application) -> None:
+        """Start background tasks once the application is initialized."""
+        # SIGTERM is handled by the application and ends in _post_shutdown
+        self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def _post_shutdown(self, application: Application) -> None:
+        """Stop background tasks and flush pending state."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._flush_user_mapping()
+    
     def _get_or_create_user_id(self, telegram_user) -> str:
         """
         Get or
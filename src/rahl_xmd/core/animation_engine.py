@@ -6,12 +6,70 @@ from PIL import Image, ImageDraw, ImageSequence
 import numpy as np
 from typing import List, Optional, Tuple, Dict, Any
 import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-import random
 
 from .pairing_system import CodeTheme
 from .qr_generator import QRGenerator
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:
+    CUPY_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # Compiled pixel kernels; the animations fall back to NumPy without Numba
+    
+    @njit(parallel=True, cache=True)
+    def _wave_kernel(img, out, amplitude, frequency, phase):
+        """Shift every row of img horizontally by its wave offset into out."""
+        height, width, channels = img.shape
+        for y in prange(height):
+            offset = amplitude * math.sin(y * frequency + phase)
+            for x in range(width):
+                src_x = min(max(int(x + offset), 0), width - 1)
+                for c in range(channels):
+                    out[y, x, c] = img[y, src_x, c]
+    
+    @njit(cache=True)
+    def _sparkle_kernel(out, xs, ys, radii, values):
+        """Blend round sparkle stamps of the given brightness into out."""
+        height, width, channels = out.shape
+        for k in range(xs.shape[0]):
+            x, y, radius, value = xs[k], ys[k], radii[k], values[k]
+            for py in range(max(0, y - radius), min(height, y + radius + 1)):
+                for px in range(max(0, x - radius), min(width, x + radius + 1)):
+                    dist = math.sqrt((py - y) ** 2 + (px - x) ** 2) / radius
+                    alpha = min(max(1 - dist, 0.0), 1.0)
+                    for c in range(channels):
+                        blended = out[py, px, c] * (1 - alpha) + value * alpha
+                        out[py, px, c] = min(max(blended, 0.0), 255.0)
+    
+    @njit(cache=True)
+    def _rain_kernel(out, xs, ys, lengths, main_mask):
+        """Draw fading green rain trails into out."""
+        height = out.shape[0]
+        for k in range(xs.shape[0]):
+            for i in range(lengths[k]):
+                y = ys[k] - i
+                if 0 <= y < height:
+                    intensity = 255 * (1 - i / lengths[k])
+                    if not main_mask[k, i]:
+                        intensity *= 0.5
+                    out[y, xs[k], 0] = 0
+                    out[y, xs[k], 1] = int(intensity)
+                    out[y, xs[k], 2] = 0
+
 
 class AnimationType(str, Enum):
     """Types of animations."""
@@ -28,10 +86,45 @@ class AnimationType(str, Enum):
 class AnimationEngine:
     """Creates animated QR codes and effects."""
     
+    # Default animation for each theme
+    THEME_ANIMATIONS = {
+        CodeTheme.NEON: AnimationType.PULSE,
+        CodeTheme.CYBERPUNK: AnimationType.GLITCH,
+        CodeTheme.MATRIX: AnimationType.RAIN,
+        CodeTheme.AURORA: AnimationType.WAVE,
+        CodeTheme.HOLOGRAM: AnimationType.SCAN,
+        CodeTheme.DEFAULT: AnimationType.FADE
+    }
+    
+    # Animations whose frames don't depend on earlier frames and can be
+    # rendered independently in chunks
+    CHUNKABLE_ANIMATIONS = frozenset({
+        AnimationType.PULSE,
+        AnimationType.ROTATE,
+        AnimationType.GLITCH,
+        AnimationType.WAVE,
+        AnimationType.SCAN,
+        AnimationType.FADE,
+    })
+    
+    # Chunkable animations with at least this many frames are rendered
+    # across worker processes
+    PARALLEL_MIN_FRAMES = 32
+    
+    # Animations rendered as one batch on the GPU by the 'gpu' backend
+    GPU_ANIMATIONS = frozenset({
+        AnimationType.PULSE,
+        AnimationType.WAVE,
+    })
+    
+    # Number of base QR images kept for repeated animations of a code
+    QR_CACHE_SIZE = 64
+    
     def __init__(self, 
                  qr_generator: Optional[QRGenerator] = None,
                  default_fps: int = 10,
-                 default_duration: float = 3.0):
+                 default_duration: float = 3.0,
+                 backend: str = 'cpu'):
         """
         Initialize animation engine.
         
@@ -39,17 +132,28 @@ class AnimationEngine:
             qr_generator: QRGenerator instance
             default_fps: Default frames per second
             default_duration: Default animation duration in seconds
+            backend: 'cpu', or 'gpu' to render supported animations with
+                CuPy (falls back to 'cpu' when CuPy isn't installed)
         """
+        if backend not in ('cpu', 'gpu'):
+            raise ValueError(f"Unknown animation backend: {backend}")
+        
         self.qr_generator = qr_generator or QRGenerator()
         self.default_fps = default_fps
         self.default_duration = default_duration
+        self.backend = backend if CUPY_AVAILABLE else 'cpu'
+        self._rng = np.random.default_rng()
+        
+        # Base QR images ((code, owner ID, theme) -> image), least recently used first
+        self._qr_cache: "OrderedDict[Tuple[str, str, Any], Image.Image]" = OrderedDict()
     
     def create_animated_qr(self,
                           pairing_code: Any,  # PairingCode or similar
                           animation_type: AnimationType = AnimationType.PULSE,
                           fps: Optional[int] = None,
                           duration: Optional[float] = None,
-                          loop: bool = True) -> List[Image.Image]:
+                          loop: bool = True,
+                          frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
         """
         Create animated QR code frames.
         
@@ -59,6 +163,8 @@ class AnimationEngine:
             fps: Frames per second
             duration: Duration in seconds
             loop: Whether animation loops
+            frame_range: Only render frames [start, stop) of the animation
+                (chunkable animation types only)
         
         Returns:
             List of PIL Image frames
@@ -68,130 +174,223 @@ class AnimationEngine:
         total_frames = int(fps * duration)
         
         # Generate base QR code
+        base_qr = self._get_base_qr(pairing_code)
+        
+        # Create frames based on animation type, spreading long chunkable
+        # animations across worker processes
+        if (frame_range is None
+                and self.backend == 'cpu'
+                and animation_type in self.CHUNKABLE_ANIMATIONS
+                and total_frames >= self.PARALLEL_MIN_FRAMES):
+            frames = self._render_parallel(base_qr, animation_type, total_frames)
+        else:
+            frames = self._render_animation(base_qr, animation_type, total_frames, frame_range)
+        
+        # If not looping, add fade out at the end
+        is_last_chunk = frame_range is None or frame_range[1] >= total_frames
+        if not loop and is_last_chunk and len(frames) > 1:
+            frames.extend(self._create_fade_out(frames[-1], fps // 2))
+        
+        return frames
+    
+    def _get_base_qr(self, pairing_code: Any) -> Image.Image:
+        """Get the base QR image of a pairing code, generating it on a cache miss."""
+        # The QR encodes the code and owner and is styled by the theme
+        key = (pairing_code.code, pairing_code.owner_id, pairing_code.theme)
+        base_qr = self._qr_cache.get(key)
+        if base_qr is not None:
+            self._qr_cache.move_to_end(key)
+            return base_qr
+        
         base_qr = self.qr_generator.generate_qr_code(pairing_code)
         
-        # Create frames based on animation type
-        frames = []
+        self._qr_cache[key] = base_qr
+        if len(self._qr_cache) > self.QR_CACHE_SIZE:
+            self._qr_cache.popitem(last=False)
+        
+        return base_qr
+    
+    def _render_animation(self, base_img: Image.Image, animation_type: AnimationType, frames: int,
+                          frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
+        """Render the frames of an animation in this process."""
+        if self.backend == 'gpu' and animation_type in self.GPU_ANIMATIONS:
+            return self._render_gpu(base_img, animation_type, frames, frame_range)
         
         if animation_type == AnimationType.PULSE:
-            frames = self._create_pulse_animation(base_qr, total_frames)
+            return self._create_pulse_animation(base_img, frames, frame_range)
         elif animation_type == AnimationType.ROTATE:
-            frames = self._create_rotate_animation(base_qr, total_frames)
+            return self._create_rotate_animation(base_img, frames, frame_range)
         elif animation_type == AnimationType.GLITCH:
-            frames = self._create_glitch_animation(base_qr, total_frames)
+            return self._create_glitch_animation(base_img, frames, frame_range)
         elif animation_type == AnimationType.RAIN:
-            frames = self._create_rain_animation(base_qr, total_frames)
+            return self._create_rain_animation(base_img, frames)
         elif animation_type == AnimationType.WAVE:
-            frames = self._create_wave_animation(base_qr, total_frames)
+            return self._create_wave_animation(base_img, frames, frame_range)
         elif animation_type == AnimationType.SCAN:
-            frames = self._create_scan_animation(base_qr, total_frames)
+            return self._create_scan_animation(base_img, frames, frame_range)
         elif animation_type == AnimationType.FADE:
-            frames = self._create_fade_animation(base_qr, total_frames)
+            return self._create_fade_animation(base_img, frames, frame_range)
         elif animation_type == AnimationType.SPARKLE:
-            frames = self._create_sparkle_animation(base_qr, total_frames)
+            return self._create_sparkle_animation(base_img, frames)
         else:
             # Default: pulse animation
-            frames = self._create_pulse_animation(base_qr, total_frames)
+            return self._create_pulse_animation(base_img, frames, frame_range)
+    
+    def _render_parallel(self, base_img: Image.Image, animation_type: AnimationType,
+                         frames: int) -> List[Image.Image]:
+        """Render a chunkable animation in chunks on the frame worker pool."""
+        chunks = min(os.cpu_count() or 1, frames)
+        if chunks < 2:
+            return self._render_animation(base_img, animation_type, frames)
+        
+        bounds = [frames * k // chunks for k in range(chunks + 1)]
+        pool = _get_frame_pool()
+        futures = [
+            pool.submit(_render_chunk, base_img, animation_type, frames, (bounds[k], bounds[k + 1]))
+            for k in range(chunks)
+        ]
+        
+        # Chunks come back as frame arrays and are wrapped in this process
+        return [Image.fromarray(frame) for future in futures for frame in future.result()]
+    
+    def _render_gpu(self, base_img: Image.Image, animation_type: AnimationType, frames: int,
+                    frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
+        """Render all frames of a pulse or wave animation as one batch with CuPy."""
+        gpu_img = cp.asarray(np.array(base_img))
+        height, width, _ = gpu_img.shape
+        indices = cp.asarray(self._frame_indices(frames, frame_range), dtype=cp.float64)
         
-        # If not looping, add fade out at the end
-        if not loop and len(frames) > 1:
-            frames.extend(self._create_fade_out(frames[-1], fps // 2))
+        if animation_type == AnimationType.PULSE:
+            # Same pulse per frame as _create_pulse_animation
+            mask = cp.mean(gpu_img, axis=2) < 200
+            qr_pixels = gpu_img[mask].astype(cp.float64)
+            pulses = 0.7 + 0.3 * cp.sin(2 * math.pi * indices / frames)
+            
+            stack = cp.broadcast_to(gpu_img, (len(indices),) + gpu_img.shape).copy()
+            stack[:, mask] = cp.clip(qr_pixels[None] * pulses[:, None, None], 0, 255)
+        else:
+            # Same per-row offsets as _create_wave_animation, for every frame
+            rows = cp.arange(height)
+            xs = cp.arange(width)
+            phases = 2 * math.pi * indices / frames
+            amplitudes = 5 * cp.sin(phases * 2)
+            
+            offsets = amplitudes[:, None] * cp.sin(rows[None, :] * 0.05 + phases[:, None])
+            src_x = (xs[None, None, :] + offsets[:, :, None]).astype(cp.intp)
+            cp.clip(src_x, 0, width - 1, out=src_x)
+            stack = gpu_img[rows[None, :, None], src_x]
         
-        return frames
+        # Download once and split into frames
+        return [Image.fromarray(frame) for frame in cp.asnumpy(stack)]
     
-    def _create_pulse_animation(self, base_img: Image.Image, frames: int) -> List[Image.Image]:
+    def _create_pulse_animation(self, base_img: Image.Image, frames: int,
+                                frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
         """Create pulsing animation."""
         img_array = np.array(base_img)
         result_frames = []
         
-        for i in range(frames):
-            # Calculate pulse intensity
+        # Find non-background pixels (assuming background is light)
+        brightness = np.mean(img_array, axis=2)
+        mask = brightness < 200  # Darker pixels are QR code
+        qr_pixels = img_array[mask].astype(np.uint16)
+        scaled = np.empty_like(qr_pixels)
+        
+        # Scratch frame reused by every iteration (fromarray copies RGB data)
+        frame_array = np.empty_like(img_array)
+        
+        for i in self._frame_indices(frames, frame_range):
+            # Calculate pulse intensity, in 1/256 steps (at most 1.0)
             pulse = 0.7 + 0.3 * math.sin(2 * math.pi * i / frames)
+            multiplier = int(pulse * 256)
             
-            # Apply pulse to non-background pixels
-            frame_array = img_array.copy()
-            
-            # Find non-background pixels (assuming background is light)
-            brightness = np.mean(frame_array, axis=2)
-            mask = brightness < 200  # Darker pixels are QR code
-            
-            # Apply pulse to QR code pixels
-            for channel in range(3):
-                channel_data = frame_array[:, :, channel]
-                channel_data[mask] = np.clip(channel_data[mask] * pulse, 0, 255)
+            # Apply pulse to QR code pixels in 8.8 fixed point
+            np.copyto(frame_array, img_array)
+            np.multiply(qr_pixels, multiplier, out=scaled)
+            scaled >>= 8
+            frame_array[mask] = scaled
             
-            frame = Image.fromarray(frame_array.astype(np.uint8))
+            frame = Image.fromarray(frame_array)
             result_frames.append(frame)
         
         return result_frames
     
-    def _create_rotate_animation(self, base_img: Image.Image, frames: int) -> List[Image.Image]:
+    def _create_rotate_animation(self, base_img: Image.Image, frames: int,
+                                 frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
         """Create rotating animation."""
         result_frames = []
         
-        for i in range(frames):
+        for i in self._frame_indices(frames, frame_range):
             angle = (360 * i / frames) % 360
             
-            # Rotate image
-            rotated = base_img.rotate(angle, expand=False, fillcolor=(255, 255, 255))
-            
-            # Keep original size
-            if rotated.size != base_img.size:
-                # Crop to center
-                left = (rotated.width - base_img.width) // 2
-                top = (rotated.height - base_img.height) // 2
-                right = left + base_img.width
-                bottom = top + base_img.height
-                rotated = rotated.crop((left, top, right, bottom))
+            # Rotate image (expand=False keeps the original size)
+            rotated = base_img.rotate(angle, resample=Image.Resampling.BILINEAR,
+                                      expand=False, fillcolor=(255, 255, 255))
             
             result_frames.append(rotated)
         
         return result_frames
     
-    def _create_glitch_animation(self, base_img: Image.Image, frames: int) -> List[Image.Image]:
+    def _create_glitch_animation(self, base_img: Image.Image, frames: int,
+                                 frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
         """Create glitch effect animation."""
         img_array = np.array(base_img)
         height, width, _ = img_array.shape
         result_frames = []
         
-        for i in range(frames):
-            frame_array = img_array.copy()
+        # Draw every random choice up front: the effect gates (shift, channel
+        # shift, pixelation) and the parameters of each effect
+        frame_count = len(self._frame_indices(frames, frame_range))
+        gates = self._rng.random((frame_count, 3))
+        shifts = self._rng.integers(-5, 6, size=frame_count)
+        channel_shifts = self._rng.integers(-3, 4, size=frame_count)
+        channel_flags = self._rng.random((frame_count, 3)) < 0.5
+        channel_axes = self._rng.integers(0, 2, size=(frame_count, 3))
+        block_sizes = self._rng.integers(2, 5, size=frame_count)
+        
+        # Scratch frames reused by every iteration (fromarray copies RGB data)
+        scratch = np.empty_like(img_array)
+        shifted = np.empty_like(img_array)
+        channel_buf = np.empty((height, width), dtype=img_array.dtype)
+        
+        for k, (shift_gate, channel_gate, pixel_gate) in enumerate(gates):
+            np.copyto(scratch, img_array)
+            frame_array = scratch
             
             # Random glitch effects
-            if random.random() < 0.3:
+            if shift_gate < 0.3:
                 # Horizontal shift
-                shift = random.randint(-5, 5)
+                shift = shifts[k]
                 if shift != 0:
-                    frame_array = np.roll(frame_array, shift, axis=1)
+                    frame_array = self._shift1d_axis(frame_array, shift, 1, shifted)
             
-            if random.random() < 0.2:
+            if channel_gate < 0.2:
                 # Color channel shift
-                channel_shift = random.randint(-3, 3)
-                for channel in range(3):
-                    if random.random() < 0.5:
-                        frame_array[:, :, channel] = np.roll(
-                            frame_array[:, :, channel], 
-                            channel_shift, 
-                            axis=random.randint(0, 1)
+                channel_shift = channel_shifts[k]
+                if channel_shift != 0:
+                    for channel in np.flatnonzero(channel_flags[k]):
+                        frame_array[:, :, channel] = self._shift1d_axis(
+                            frame_array[:, :, channel],
+                            channel_shift,
+                            channel_axes[k, channel],
+                            channel_buf
                         )
             
-            if random.random() < 0.1:
-                # Pixelation effect
-                block_size = random.randint(2, 4)
+            if pixel_gate < 0.1:
+                # Pixelation effect: average whole blocks, leave the remainder
+                block_size = block_sizes[k]
                 h_blocks = height // block_size
                 w_blocks = width // block_size
+                h_end = h_blocks * block_size
+                w_end = w_blocks * block_size
                 
-                for h in range(h_blocks):
-                    for w in range(w_blocks):
-                        h_start = h * block_size
-                        w_start = w * block_size
-                        block = frame_array[h_start:h_start+block_size, 
-                                          w_start:w_start+block_size]
-                        avg_color = np.mean(block, axis=(0, 1))
-                        frame_array[h_start:h_start+block_size, 
-                                  w_start:w_start+block_size] = avg_color
+                block_avg = frame_array[:h_end, :w_end].reshape(
+                    h_blocks, block_size, w_blocks, block_size, 3
+                ).mean(axis=(1, 3))
+                frame_array[:h_end, :w_end] = np.repeat(
+                    np.repeat(block_avg, block_size, axis=0), block_size, axis=1
+                )
             
-            frame = Image.fromarray(frame_array.astype(np.uint8))
+            frame = Image.fromarray(frame_array)
             result_frames.append(frame)
         
         return result_frames
@@ -202,135 +401,171 @@ class AnimationEngine:
         height, width, _ = img_array.shape
         result_frames = []
         
-        # Initialize rain drops
+        # Initialize rain drops as parallel arrays
         drop_count = width // 10
-        drops = []
-        for _ in range(drop_count):
-            drops.append({
-                'x': random.randint(0, width - 1),
-                'y': random.randint(-height, -1),
-                'speed': random.uniform(2, 5),
-                'length': random.randint(5, 15)
-            })
+        xs = self._rng.integers(0, width, size=drop_count)
+        ys = self._rng.integers(-height, 0, size=drop_count).astype(np.float64)
+        speeds = self._rng.uniform(2, 5, size=drop_count)
+        lengths = self._rng.integers(5, 16, size=drop_count)
+        
+        # Trail position of every drop segment and its fade intensity
+        trail = np.arange(lengths.max(initial=0))
+        in_trail = trail[None, :] < lengths[:, None]
+        intensities = 255 * (1 - trail[None, :] / lengths[:, None])
+        
+        # Scratch frame reused by every iteration (fromarray copies RGB data)
+        frame_array = np.empty_like(img_array)
         
         for frame_num in range(frames):
-            frame_array = img_array.copy()
+            np.copyto(frame_array, img_array)
+            
+            # Update positions, resetting drops that fell off screen
+            ys += speeds
+            off_screen = ys > height
+            reset_count = int(np.count_nonzero(off_screen))
+            if reset_count:
+                ys[off_screen] = self._rng.integers(-height, 0, size=reset_count)
+                xs[off_screen] = self._rng.integers(0, width, size=reset_count)
             
-            # Update and draw drops
-            for drop in drops:
-                # Update position
-                drop['y'] += drop['speed']
+            if NUMBA_AVAILABLE:
+                is_main = self._rng.random(in_trail.shape) < 0.8
+                _rain_kernel(frame_array, xs, ys.astype(np.int64), lengths, is_main)
+            else:
+                # Draw the visible segments of every drop
+                y_pos = ys.astype(int)[:, None] - trail[None, :]
+                visible = in_trail & (y_pos >= 0) & (y_pos < height)
+                seg_intensity = intensities[visible]
                 
-                # Reset if off screen
-                if drop['y'] > height:
-                    drop['y'] = random.randint(-height, -1)
-                    drop['x'] = random.randint(0, width - 1)
+                # Matrix green color: main drop or dimmer trail
+                is_main = self._rng.random(seg_intensity.size) < 0.8
+                green = np.where(is_main, seg_intensity, seg_intensity * 0.5).astype(np.uint8)
                 
-                # Draw drop
-                for i in range(drop['length']):
-                    y_pos = int(drop['y']) - i
-                    if 0 <= y_pos < height and 0 <= drop['x'] < width:
-                        # Fade intensity
-                        intensity = 255 * (1 - i / drop['length'])
-                        
-                        # Matrix green color
-                        if random.random() < 0.8:  # Main drop
-                            frame_array[y_pos, drop['x']] = [0, int(intensity), 0]
-                        else:  # Trail
-                            frame_array[y_pos, drop['x']] = [0, int(intensity * 0.5), 0]
+                rows = y_pos[visible]
+                cols = np.broadcast_to(xs[:, None], y_pos.shape)[visible]
+                frame_array[rows, cols] = 0
+                frame_array[rows, cols, 1] = green
             
-            frame = Image.fromarray(frame_array.astype(np.uint8))
+            frame = Image.fromarray(frame_array)
             result_frames.append(frame)
         
         return result_frames
     
-    def _create_wave_animation(self, base_img: Image.Image, frames: int) -> List[Image.Image]:
+    def _create_wave_animation(self, base_img: Image.Image, frames: int,
+                               frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
         """Create wave distortion animation."""
         img_array = np.array(base_img)
         height, width, _ = img_array.shape
         result_frames = []
         
-        for i in range(frames):
-            frame_array = np.zeros_like(img_array)
-            
+        # Pixel coordinate grids, shared by all frames
+        rows = np.arange(height)
+        xs = np.arange(width)
+        row_starts = (rows * width)[:, None]
+        frequency = 0.05
+        
+        # Scratch frame reused by every iteration (fromarray copies RGB data)
+        pixels = img_array.reshape(-1, 3)
+        frame_array = np.empty_like(img_array)
+        frame_pixels = frame_array.reshape(-1, 3)
+        
+        for i in self._frame_indices(frames, frame_range):
             # Calculate wave parameters
             wave_phase = 2 * math.pi * i / frames
             amplitude = 5 * math.sin(wave_phase * 2)
-            frequency = 0.05
             
-            # Apply wave distortion
-            for y in range(height):
-                for x in range(width):
-                    # Calculate source position with wave distortion
-                    offset = amplitude * math.sin(y * frequency + wave_phase)
-                    src_x = int(x + offset)
-                    src_y = y
-                    
-                    # Clamp to image bounds
-                    src_x = max(0, min(width - 1, src_x))
-                    src_y = max(0, min(height - 1, src_y))
-                    
-                    # Copy pixel
-                    frame_array[y, x] = img_array[src_y, src_x]
+            if NUMBA_AVAILABLE:
+                _wave_kernel(img_array, frame_array, amplitude, frequency, wave_phase)
+            else:
+                # Source column of every pixel: one wave offset per row,
+                # truncated like int() and clamped to image bounds
+                offsets = amplitude * np.sin(rows * frequency + wave_phase)
+                src_x = (xs[None, :] + offsets[:, None]).astype(np.intp)
+                np.clip(src_x, 0, width - 1, out=src_x)
+                
+                # Gather pixels straight into the scratch frame
+                src_x += row_starts
+                np.take(pixels, src_x.ravel(), axis=0, out=frame_pixels)
             
-            frame = Image.fromarray(frame_array.astype(np.uint8))
+            frame = Image.fromarray(frame_array)
             result_frames.append(frame)
         
         return result_frames
     
-    def _create_scan_animation(self, base_img: Image.Image, frames: int) -> List[Image.Image]:
+    def _create_scan_animation(self, base_img: Image.Image, frames: int,
+                               frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
         """Create scanning line animation."""
         img_array = np.array(base_img)
         height, width, _ = img_array.shape
         result_frames = []
         
-        for i in range(frames):
-            frame_array = img_array.copy()
+        scan_height = height // 10
+        
+        # Highlight draws for the widest scan band of every frame
+        frame_indices = self._frame_indices(frames, frame_range)
+        rands = self._rng.random((len(frame_indices), 2 * scan_height, width))
+        
+        # Scratch frame reused by every iteration (fromarray copies RGB data)
+        frame_array = np.empty_like(img_array)
+        
+        for i, frame_rands in zip(frame_indices, rands):
+            np.copyto(frame_array, img_array)
             
             # Calculate scan line position
             scan_y = int(height * i / frames)
-            scan_height = height // 10
+            y0, y1 = max(0, scan_y - scan_height), min(height, scan_y + scan_height)
             
-            # Draw scan line effect
-            for y in range(max(0, scan_y - scan_height), min(height, scan_y + scan_height)):
-                # Calculate intensity (bell curve)
-                distance = abs(y - scan_y) / scan_height
-                intensity = max(0, 1 - distance * distance)
-                
-                # Apply highlight to scan line
-                for x in range(width):
-                    if random.random() < intensity * 0.3:
-                        # Add highlight
-                        highlight = np.array([100, 100, 100]) * intensity
-                        frame_array[y, x] = np.clip(frame_array[y, x] + highlight, 0, 255)
+            # Intensity of every scanned row (bell curve)
+            distance = np.abs(np.arange(y0, y1) - scan_y) / scan_height
+            intensity = np.maximum(0, 1 - distance * distance)
+            
+            # Randomly highlight pixels, more often near the scan line
+            highlight_mask = frame_rands[:y1 - y0] < intensity[:, None] * 0.3
+            highlight = np.broadcast_to((100 * intensity)[:, None], highlight_mask.shape)
             
-            frame = Image.fromarray(frame_array.astype(np.uint8))
+            region = frame_array[y0:y1]
+            region[highlight_mask] = np.clip(
+                region[highlight_mask] + highlight[highlight_mask][:, None], 0, 255
+            )
+            
+            frame = Image.fromarray(frame_array)
             result_frames.append(frame)
         
         return result_frames
     
-    def _create_fade_animation(self, base_img: Image.Image, frames: int) -> List[Image.Image]:
+    def _create_fade_animation(self, base_img: Image.Image, frames: int,
+                               frame_range: Optional[Tuple[int, int]] = None) -> List[Image.Image]:
         """Create fade in/out animation."""
         result_frames = []
         
-        # Fade in
+        # Fade in, full opacity, then fade out
         fade_in_frames = frames // 3
-        for i in range(fade_in_frames):
-            alpha = i / fade_in_frames
-            faded = self._apply_alpha(base_img, alpha)
-            result_frames.append(faded)
-        
-        # Full opacity
         full_frames = frames // 3
-        for _ in range(full_frames):
-            result_frames.append(base_img.copy())
-        
-        # Fade out
         fade_out_frames = frames - fade_in_frames - full_frames
-        for i in range(fade_out_frames):
-            alpha = 1 - i / fade_out_frames
-            faded = self._apply_alpha(base_img, alpha)
-            result_frames.append(faded)
+        
+        # Alpha of every fading frame
+        indices = np.array(self._frame_indices(frames, frame_range))
+        fading_in = indices < fade_in_frames
+        fading_out = indices >= fade_in_frames + full_frames
+        alphas = np.ones(len(indices))
+        alphas[fading_in] = indices[fading_in] / fade_in_frames
+        alphas[fading_out] = 1 - (indices[fading_out] - fade_in_frames - full_frames) / fade_out_frames
+        
+        # Broadcast the base RGBA image to all fading frames at once and
+        # write their alpha channels
+        fading = fading_in | fading_out
+        rgba = np.array(base_img.convert('RGBA'))
+        faded = np.broadcast_to(rgba, (int(np.count_nonzero(fading)),) + rgba.shape).copy()
+        faded[..., 3] = (alphas[fading] * 255).astype(np.uint8)[:, None, None]
+        
+        # Full opacity frames all share one copy of the base image
+        opaque = base_img.copy()
+        
+        faded_frames = iter(faded)
+        for is_fading in fading:
+            if is_fading:
+                result_frames.append(Image.fromarray(next(faded_frames), 'RGBA'))
+            else:
+                result_frames.append(opaque)
         
         return result_frames
     
@@ -340,62 +575,96 @@ class AnimationEngine:
         height, width, _ = img_array.shape
         result_frames = []
         
-        # Generate sparkles
+        # Generate sparkles as parallel arrays (x, y, size, intensity, phase, speed)
         sparkle_count = (height * width) // 500
-        sparkles = []
-        for _ in range(sparkle_count):
-            sparkles.append({
-                'x': random.randint(0, width - 1),
-                'y': random.randint(0, height - 1),
-                'size': random.uniform(1, 3),
-                'intensity': random.uniform(0.5, 1),
-                'phase': random.uniform(0, 2 * math.pi),
-                'speed': random.uniform(0.1, 0.3)
-            })
+        xs = self._rng.integers(0, width, size=sparkle_count).tolist()
+        ys = self._rng.integers(0, height, size=sparkle_count).tolist()
+        radii = self._rng.uniform(1, 3, size=sparkle_count).astype(int).tolist()
+        intensities = self._rng.uniform(0.5, 1, size=sparkle_count)
+        phases = self._rng.uniform(0, 2 * math.pi, size=sparkle_count)
+        speeds = self._rng.uniform(0.1, 0.3, size=sparkle_count)
+        
+        # Brightness of every sparkle in every frame
+        frame_nums = np.arange(frames)
+        brightness = (np.sin(phases[:, None] + frame_nums[None, :] * speeds[:, None]) + 1) / 2
+        brightness *= intensities[:, None]
+        sparkle_values = 255 * brightness
+        
+        # Scratch frame reused by every iteration (fromarray copies RGB data)
+        frame_array = np.empty_like(img_array)
+        
+        if NUMBA_AVAILABLE:
+            xs_arr, ys_arr, radii_arr = (np.array(v, dtype=np.int64) for v in (xs, ys, radii))
+            frame_values = np.ascontiguousarray(sparkle_values.T)
+        else:
+            sparkle_values = sparkle_values.astype(np.uint16).tolist()
+            
+            # Alpha stamp per sparkle radius (fades at edges, zero outside),
+            # in 1/256 steps with its complement for uint16 blending
+            kernels = {}
+            for radius in set(radii):
+                d = np.arange(-radius, radius + 1)
+                dist = np.sqrt(d[:, None] ** 2 + d[None, :] ** 2) / radius
+                alpha = np.rint(np.clip(1 - dist, 0, 1) * 256).astype(np.uint16)[:, :, None]
+                kernels[radius] = (alpha, 256 - alpha)
         
         for frame_num in range(frames):
-            frame_array = img_array.copy()
+            np.copyto(frame_array, img_array)
             
-            # Update and draw sparkles
-            for sparkle in sparkles:
-                # Calculate brightness
-                brightness = (math.sin(sparkle['phase'] + frame_num * sparkle['speed']) + 1) / 2
-                brightness *= sparkle['intensity']
-                
-                # Draw sparkle
-                sparkle_size = int(sparkle['size'])
-                for dx in range(-sparkle_size, sparkle_size + 1):
-                    for dy in range(-sparkle_size, sparkle_size + 1):
-                        x = sparkle['x'] + dx
-                        y = sparkle['y'] + dy
-                        
-                        if 0 <= x < width and 0 <= y < height:
-                            # Calculate distance from center
-                            dist = math.sqrt(dx*dx + dy*dy) / sparkle_size
-                            if dist <= 1:
-                                # Sparkle color (white with theme tint)
-                                sparkle_color = np.array([255, 255, 255]) * brightness
-                                
-                                # Blend with background
-                                alpha = 1 - dist  # Fade at edges
-                                frame_array[y, x] = np.clip(
-                                    frame_array[y, x] * (1 - alpha) + sparkle_color * alpha,
-                                    0, 255
-                                )
+            if NUMBA_AVAILABLE:
+                _sparkle_kernel(frame_array, xs_arr, ys_arr, radii_arr, frame_values[frame_num])
+            else:
+                # Blend each sparkle stamp (white with theme tint) into the frame
+                for x, y, radius, values in zip(xs, ys, radii, sparkle_values):
+                    y0, y1 = max(0, y - radius), min(height, y + radius + 1)
+                    x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+                    stamp = (slice(y0 - y + radius, y1 - y + radius),
+                             slice(x0 - x + radius, x1 - x + radius))
+                    alpha, inverse = kernels[radius][0][stamp], kernels[radius][1][stamp]
+                    
+                    # The weights sum to 256, so the result stays within uint8
+                    region = frame_array[y0:y1, x0:x1]
+                    region[...] = (region * inverse + values[frame_num] * alpha) >> 8
             
-            frame = Image.fromarray(frame_array.astype(np.uint8))
+            frame = Image.fromarray(frame_array)
             result_frames.append(frame)
         
         return result_frames
     
+    @staticmethod
+    def _shift1d_axis(src: np.ndarray, shift: int, axis: int, out: np.ndarray) -> np.ndarray:
+        """Roll src by shift along axis 0 or 1 into out, like np.roll."""
+        n = src.shape[axis]
+        shift %= n
+        if axis == 0:
+            out[shift:] = src[:n - shift]
+            out[:shift] = src[n - shift:]
+        else:
+            out[:, shift:] = src[:, :n - shift]
+            out[:, :shift] = src[:, n - shift:]
+        return out
+    
+    @staticmethod
+    def _frame_indices(frames: int, frame_range: Optional[Tuple[int, int]]) -> range:
+        """Get the indices of the frames to render."""
+        return range(*frame_range) if frame_range else range(frames)
+    
     def _create_fade_out(self, base_img: Image.Image, frames: int) -> List[Image.Image]:
         """Create fade out sequence."""
         result_frames = []
         
+        # Fully opaque and fully transparent frames share one image each
+        opaque = self._apply_alpha(base_img, 1.0)
+        transparent = self._apply_alpha(base_img, 0.0)
+        
         for i in range(frames):
             alpha = 1 - i / frames
-            faded = self._apply_alpha(base_img, alpha)
-            result_frames.append(faded)
+            if alpha * 255 >= 255:
+                result_frames.append(opaque)
+            elif alpha * 255 < 1:
+                result_frames.append(transparent)
+            else:
+                result_frames.append(self._apply_alpha(base_img, alpha))
         
         return result_frames
     
@@ -458,17 +727,7 @@ class AnimationEngine:
         Returns:
             List of image frames
         """
-        # Map themes to default animations
-        theme_animations = {
-            CodeTheme.NEON: AnimationType.PULSE,
-            CodeTheme.CYBERPUNK: AnimationType.GLITCH,
-            CodeTheme.MATRIX: AnimationType.RAIN,
-            CodeTheme.AURORA: AnimationType.WAVE,
-            CodeTheme.HOLOGRAM: AnimationType.SCAN,
-            CodeTheme.DEFAULT: AnimationType.FADE
-        }
-        
-        anim_type = animation_type or theme_animations.get(theme, AnimationType.PULSE)
+        anim_type = animation_type or self.THEME_ANIMATIONS.get(theme, AnimationType.PULSE)
         
         return self.create_animated_qr(
             pairing_code,
@@ -476,3 +735,115 @@ class AnimationEngine:
             fps=self.default_fps,
             duration=self.default_duration
         )
+    
+    def frame_specs(self,
+                    pairing_code: Any,
+                    theme: CodeTheme,
+                    animation_type: Optional[AnimationType] = None,
+                    chunks: int = 1) -> List[Dict[str, Any]]:
+        """
+        Split a theme animation into independently renderable chunks.
+        
+        Animations whose frames depend on earlier frames are always
+        returned as a single chunk.
+        
+        Args:
+            pairing_code: PairingCode object
+            theme: Code theme
+            animation_type: Override default animation type
+            chunks: Desired number of chunks
+        
+        Returns:
+            List of frame specs, in frame order, for render_frames
+        """
+        anim_type = animation_type or self.THEME_ANIMATIONS.get(theme, AnimationType.PULSE)
+        total_frames = int(self.default_fps * self.default_duration)
+        
+        if anim_type not in self.CHUNKABLE_ANIMATIONS:
+            chunks = 1
+        chunks = max(1, min(chunks, total_frames))
+        
+        bounds = [total_frames * k // chunks for k in range(chunks + 1)]
+        
+        return [
+            {
+                "pairing_code": pairing_code,
+                "animation_type": anim_type,
+                "fps": self.default_fps,
+                "duration": self.default_duration,
+                "frame_range": (bounds[k], bounds[k + 1]),
+            }
+            for k in range(chunks)
+        ]
+
+
+# Animation engine of the current process used by render_frames
+_process_engine: Optional[AnimationEngine] = None
+
+
+def render_frames(spec: Dict[str, Any]) -> List[Image.Image]:
+    """
+    Render the frames described by a frame spec.
+    
+    Safe to run in worker processes; each process keeps its own engine.
+    
+    Args:
+        spec: Frame spec from AnimationEngine.frame_specs
+    
+    Returns:
+        List of PIL Image frames
+    """
+    global _process_engine
+    if _process_engine is None:
+        _process_engine = AnimationEngine()
+    
+    return _process_engine.create_animated_qr(
+        spec["pairing_code"],
+        animation_type=spec["animation_type"],
+        fps=spec["fps"],
+        duration=spec["duration"],
+        frame_range=spec["frame_range"]
+    )
+
+
+# Worker pool used to render long animations in parallel
+_frame_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _seed_frame_worker() -> None:
+    """Give each worker its own engine and random state instead of the forked one."""
+    global _process_engine
+    _process_engine = None
+
+
+def _get_frame_pool() -> ProcessPoolExecutor:
+    """Get the frame worker pool, starting it on first use."""
+    global _frame_pool
+    if _frame_pool is None:
+        _frame_pool = ProcessPoolExecutor(initializer=_seed_frame_worker)
+    return _frame_pool
+
+
+def _render_chunk(base_img: Image.Image,
+                  animation_type: AnimationType,
+                  frames: int,
+                  frame_range: Tuple[int, int]) -> List[np.ndarray]:
+    """
+    Render one chunk of an animation in a worker process.
+    
+    Args:
+        base_img: Base QR code image
+        animation_type: Type of animation
+        frames: Total frames in the animation
+        frame_range: Frames [start, stop) to render
+    
+    Returns:
+        Frame arrays, one per frame; frames of one animation may differ
+        in mode (e.g. RGB full opacity and RGBA fading frames)
+    """
+    global _process_engine
+    if _process_engine is None:
+        _process_engine = AnimationEngine()
+    
+    chunk = _process_engine._render_animation(base_img, animation_type, frames, frame_range)
+    return [np.asarray(frame) for frame in chunk]
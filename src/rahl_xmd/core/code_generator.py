@@ -3,10 +3,12 @@ Code generation utilities for RAHL XMD pairing system.
 """
 
 import random
+import re
+import secrets
 import string
 import hashlib
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Pattern
 from enum import Enum
 
 from .pairing_system import CodeTheme, PairingCode
@@ -54,6 +56,24 @@ class CodeGenerator:
                 'excluded': ''
             }
         }
+        
+        # Per-format characters with the excluded ones removed, as a string,
+        # a validation regex and a byte -> character table for batches
+        self._effective_chars: Dict[CodeFormat, str] = {}
+        self._validators: Dict[CodeFormat, Pattern[str]] = {}
+        self._byte_tables: Dict[CodeFormat, Tuple[bytes, bytes]] = {}
+        
+        for code_format, char_set_info in self._char_sets.items():
+            chars = ''.join(c for c in char_set_info['all'] if c not in char_set_info['excluded'])
+            self._effective_chars[code_format] = chars
+            self._validators[code_format] = re.compile(f"[{re.escape(chars)}]*" if chars else "")
+            
+            if chars:
+                # Bytes past the last whole multiple of len(chars) are
+                # dropped so every character is equally likely
+                limit = 256 - 256 % len(chars)
+                table = bytes(ord(chars[b % len(chars)]) if b < limit else 0 for b in range(256))
+                self._byte_tables[code_format] = (table, bytes(range(limit, 256)))
     
     def generate_code(self, 
                      length: Optional[int] = None,
@@ -83,31 +103,32 @@ class CodeGenerator:
             raise ValueError("Custom format requires custom character set")
         
         # Get character set
-        char_set_info = self._char_sets[code_format]
-        chars = char_set_info['all']
-        
-        if self.exclude_similar and char_set_info['excluded']:
-            chars = ''.join(c for c in chars if c not in char_set_info['excluded'])
+        chars = self._effective_chars[code_format]
         
         if not chars:
             raise ValueError("No characters available in the selected format")
         
         # Generate code
-        if groups > 1:
-            group_length = length // groups
-            remainder = length % groups
-            code_parts = []
-            
-            for i in range(groups):
-                part_length = group_length + (1 if i < remainder else 0)
-                part = ''.join(random.choices(chars, k=part_length))
-                code_parts.append(part)
-            
-            code = separator.join(code_parts)
-        else:
-            code = ''.join(random.choices(chars, k=length))
+        code = ''.join(random.choices(chars, k=length))
         
-        return prefix + code + suffix
+        return prefix + self._join_groups(code, groups, separator) + suffix
+    
+    def _join_groups(self, code: str, groups: int, separator: str) -> str:
+        """Split a code into groups (earlier groups get the remainder) and join them."""
+        if groups <= 1:
+            return code
+        
+        group_length = len(code) // groups
+        remainder = len(code) % groups
+        code_parts = []
+        start = 0
+        
+        for i in range(groups):
+            part_length = group_length + (1 if i < remainder else 0)
+            code_parts.append(code[start:start + part_length])
+            start += part_length
+        
+        return separator.join(code_parts)
     
     def generate_batch(self, 
                       count: int,
@@ -126,14 +147,37 @@ class CodeGenerator:
         Returns:
             List of unique codes
         """
-        codes = set()
+        length = length or self.default_length
+        code_format = code_format or self.default_format
+        prefix = kwargs.get("prefix", "")
+        suffix = kwargs.get("suffix", "")
+        separator = kwargs.get("separator", "-")
+        groups = kwargs.get("groups", 1)
+        
+        if code_format == CodeFormat.CUSTOM:
+            raise ValueError("Custom format requires custom character set")
+        
+        if not self._effective_chars[code_format]:
+            raise ValueError("No characters available in the selected format")
+        
+        table, rejected = self._byte_tables[code_format]
+        
+        codes: Dict[str, None] = {}
         attempts = 0
         max_attempts = count * 10
         
         while len(codes) < count and attempts < max_attempts:
-            code = self.generate_code(length, code_format, **kwargs)
-            codes.add(code)
-            attempts += 1
+            # Draw random bytes for all missing codes at once (twice as
+            # many as needed, to cover rejected bytes and duplicates)
+            needed = count - len(codes)
+            raw = secrets.token_bytes(needed * length * 2).translate(table, rejected).decode('ascii')
+            
+            for start in range(0, len(raw) - length + 1, length):
+                code = prefix + self._join_groups(raw[start:start + length], groups, separator) + suffix
+                codes[code] = None
+                attempts += 1
+                if len(codes) == count or attempts == max_attempts:
+                    break
         
         if len(codes) < count:
             raise RuntimeError(f"Failed to generate {count} unique codes after {max_attempts} attempts")
@@ -172,13 +216,7 @@ class CodeGenerator:
         
         # Check format
         if code_format and code_format != CodeFormat.CUSTOM:
-            char_set_info = self._char_sets[code_format]
-            allowed_chars = set(char_set_info['all'])
-            
-            if self.exclude_similar and char_set_info['excluded']:
-                allowed_chars -= set(char_set_info['excluded'])
-            
-            return all(c in allowed_chars for c in core_code)
+            return self._validators[code_format].fullmatch(core_code) is not None
         
         return True
     
@@ -198,14 +236,14 @@ class CodeGenerator:
             Secure code string
         """
         # Start with seed hash
-        current_hash = hashlib.sha256(seed.encode()).hexdigest().upper()
+        current_hash = hashlib.sha256(seed.encode()).digest()
         
-        # Iterative hashing
+        # Iterative hashing on raw digests, hex-encoded only once at the end
         for _ in range(iterations - 1):
-            current_hash = hashlib.sha256(current_hash.encode()).hexdigest().upper()
+            current_hash = hashlib.sha256(current_hash).digest()
         
         # Take first 'length' characters
-        return current_hash[:length]
+        return current_hash.hex().upper()[:length]
     
     def create_pairing_code(self,
                            owner_id: str,
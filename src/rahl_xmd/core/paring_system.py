@@ -4,22 +4,139 @@ Handles user management, pairing logic, and code generation.
 """
 
 import uuid
-import json
+import os
+import functools
+import secrets
+import atexit
+import threading
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from collections import Counter
 import pickle
 import hashlib
 
+import numpy as np
+import orjson
+
 from ..utils.logger import setup_logger
 from ..utils.validators import validate_user_data, validate_pairing_code
 from ..utils.security import generate_secure_hash
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = setup_logger(__name__)
 
 
+# Odd 64-bit multiplier (2**64 / golden ratio) for mixing user ID hashes
+_MIX_MULTIPLIER = 0x9E3779B97F4A7C15
+_MIX_MASK = 0xFFFFFFFFFFFFFFFF
+
+# On-disk schema version; version 1 files store ISO timestamp strings,
+# version 2 stores epoch milliseconds
+SCHEMA_VERSION = 2
+
+
+@functools.lru_cache(maxsize=65536)
+def _parse_dt(value: str) -> datetime:
+    """Parse an ISO timestamp, caching repeats across records."""
+    return datetime.fromisoformat(value)
+
+
+def _dump_dt(value: datetime) -> int:
+    """Convert a datetime to epoch milliseconds for storage."""
+    return round(value.timestamp() * 1000)
+
+
+def _load_dt(value: Any) -> datetime:
+    """Convert a stored timestamp (epoch millis or legacy ISO string) to a datetime."""
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value / 1000)
+    return _parse_dt(value)
+
+
+def _compat_numeric(last_active_a: float, last_active_b: float, inter_count: int,
+                    interests_a_len: int, hash_seed: int) -> float:
+    """Compatibility score from the numeric features of two users."""
+    score = 0.0
+    
+    # Interest matching (40%)
+    if interests_a_len > 0:
+        score += inter_count / interests_a_len * 0.4
+    
+    # Preference matching (30%)
+    # This can be customized based on your preference structure
+    score += 0.15  # Base preference score
+    
+    # Activity level (20%)
+    activity_diff = abs(last_active_a - last_active_b)
+    score += max(0.0, 1 - activity_diff / 86400) * 0.2  # 24 hours
+    
+    # Random factor for variety (10%)
+    score += hash_seed % 100 / 1000
+    
+    return min(score, 1.0)
+
+
+if NUMBA_AVAILABLE:
+    # Compiled scoring kernels; batch scoring falls back to NumPy without Numba
+    _compat_numeric = njit(cache=True)(_compat_numeric)
+    
+    @njit(parallel=True, cache=True)
+    def _compat_batch(last_active_a, last_active_b, inter_counts, interests_a_len, hash_seeds):
+        """Score one user against every candidate."""
+        scores = np.empty(last_active_b.shape[0])
+        for i in prange(last_active_b.shape[0]):
+            scores[i] = _compat_numeric(last_active_a, last_active_b[i], inter_counts[i],
+                                        interests_a_len, hash_seeds[i])
+        return scores
+else:
+    def _compat_batch(last_active_a, last_active_b, inter_counts, interests_a_len, hash_seeds):
+        """Score one user against every candidate."""
+        scores = np.full(last_active_b.shape[0], 0.15)
+        if interests_a_len > 0:
+            scores += inter_counts / interests_a_len * 0.4
+        activity_diff = np.abs(last_active_a - last_active_b)
+        scores += np.maximum(0.0, 1 - activity_diff / 86400) * 0.2
+        scores += hash_seeds % 100 / 1000
+        return np.minimum(scores, 1.0)
+
+
+def _compile_from_dict(cls: type, converters: Dict[str, str]) -> Any:
+    """
+    Generate a from_dict function specialized to a dataclass's fields.
+    
+    Args:
+        cls: Dataclass to build
+        converters: Expression template per field, formatted with the raw value
+    
+    Returns:
+        Function mapping a serialized record dict to a new instance
+    """
+    # Positional arguments in field order; cheaper than keyword matching
+    args = []
+    for f in fields(cls):
+        if not f.init:
+            continue
+        value = f"data[{f.name!r}]"
+        args.append(converters[f.name].format(value) if f.name in converters else value)
+    
+    source = (
+        f"def from_dict(data):\n"
+        f"    \"\"\"Create a {cls.__name__} from a serialized record.\"\"\"\n"
+        f"    return {cls.__name__}({', '.join(args)})\n"
+    )
+    namespace = {}
+    exec(source, globals(), namespace)
+    return namespace['from_dict']
+
+
 class PairingStatus(str, Enum):
     """Status of a pairing relationship."""
     PENDING = "pending"
@@ -39,7 +156,12 @@ class CodeTheme(str, Enum):
     HOLOGRAM = "hologram"
 
 
-@dataclass
+# Stored value -> member lookups, skipping Enum.__call__ on load
+_STATUS_MAP = PairingStatus._value2member_map_
+_THEME_MAP = CodeTheme._value2member_map_
+
+
+@dataclass(slots=True)
 class UserProfile:
     """User profile data structure."""
     user_id: str
@@ -51,23 +173,42 @@ class UserProfile:
     created_at: datetime = field(default_factory=datetime.now)
     last_active: datetime = field(default_factory=datetime.now)
     is_verified: bool = False
+    _interest_set: frozenset = field(init=False, repr=False, compare=False)
+    _id_hash: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Precompute the values used for matching."""
+        self._id_hash = int.from_bytes(
+            hashlib.blake2b(self.user_id.encode(), digest_size=8).digest(), 'little'
+        )
+        self.refresh_interests()
+    
+    def refresh_interests(self) -> None:
+        """Recompute the interest set after interests change."""
+        self._interest_set = frozenset(self.interests)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
-        data = asdict(self)
-        data['created_at'] = self.created_at.isoformat()
-        data['last_active'] = self.last_active.isoformat()
-        return data
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'UserProfile':
-        """Create from dictionary."""
-        data['created_at'] = datetime.fromisoformat(data['created_at'])
-        data['last_active'] = datetime.fromisoformat(data['last_active'])
-        return cls(**data)
+        return {
+            'user_id': self.user_id,
+            'username': self.username,
+            'email': self.email,
+            'avatar_url': self.avatar_url,
+            'preferences': self.preferences,
+            'interests': self.interests,
+            'created_at': _dump_dt(self.created_at),
+            'last_active': _dump_dt(self.last_active),
+            'is_verified': self.is_verified
+        }
+
+
+UserProfile.from_dict = staticmethod(_compile_from_dict(UserProfile, {
+    'created_at': "_load_dt({})",
+    'last_active': "_load_dt({})",
+}))
 
 
-@dataclass
+@dataclass(slots=True)
 class PairingCode:
     """Pairing code data structure."""
     code: str
@@ -114,23 +255,28 @@ class PairingCode:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
-        data = asdict(self)
-        data['created_at'] = self.created_at.isoformat()
-        data['expires_at'] = self.expires_at.isoformat() if self.expires_at else None
-        data['theme'] = self.theme.value
-        return data
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'PairingCode':
-        """Create from dictionary."""
-        data['created_at'] = datetime.fromisoformat(data['created_at'])
-        if data['expires_at']:
-            data['expires_at'] = datetime.fromisoformat(data['expires_at'])
-        data['theme'] = CodeTheme(data['theme'])
-        return cls(**data)
-
-
-@dataclass
+        return {
+            'code': self.code,
+            'owner_id': self.owner_id,
+            'created_at': _dump_dt(self.created_at),
+            'expires_at': _dump_dt(self.expires_at) if self.expires_at else None,
+            'max_uses': self.max_uses,
+            'uses_count': self.uses_count,
+            'theme': self.theme.value,
+            'is_animated': self.is_animated,
+            'is_active': self.is_active,
+            'metadata': self.metadata
+        }
+
+
+PairingCode.from_dict = staticmethod(_compile_from_dict(PairingCode, {
+    'created_at': "_load_dt({})",
+    'expires_at': "(_load_dt({0}) if {0} else None)",
+    'theme': "_THEME_MAP[{}]",
+}))
+
+
+@dataclass(slots=True)
 class Pairing:
     """Pairing relationship data structure."""
     pairing_id: str
@@ -154,24 +300,43 @@ class Pairing:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
-        data = asdict(self)
-        data['created_at'] = self.created_at.isoformat()
-        data['last_interaction'] = self.last_interaction.isoformat()
-        data['status'] = self.status.value
-        return data
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Pairing':
-        """Create from dictionary."""
-        data['created_at'] = datetime.fromisoformat(data['created_at'])
-        data['last_interaction'] = datetime.fromisoformat(data['last_interaction'])
-        data['status'] = PairingStatus(data['status'])
-        return cls(**data)
+        return {
+            'pairing_id': self.pairing_id,
+            'user1_id': self.user1_id,
+            'user2_id': self.user2_id,
+            'created_at': _dump_dt(self.created_at),
+            'status': self.status.value,
+            'compatibility_score': self.compatibility_score,
+            'shared_interests': self.shared_interests,
+            'last_interaction': _dump_dt(self.last_interaction),
+            'metadata': self.metadata
+        }
+
+
+Pairing.from_dict = staticmethod(_compile_from_dict(Pairing, {
+    'created_at': "_load_dt({})",
+    'last_interaction': "_load_dt({})",
+    'status': "_STATUS_MAP[{}]",
+}))
 
 
 class PairingSystem:
     """Main pairing system class."""
     
+    # Stores persisted as a pickle snapshot plus an append-only mutation log
+    STORES = ("users", "codes", "pairings")
+    
+    # Record type held by each store
+    STORE_TYPES = {"users": UserProfile, "codes": PairingCode, "pairings": Pairing}
+    
+    # Compact a store once its log holds more entries than this share of
+    # its records (and at least WAL_COMPACT_MIN entries)
+    WAL_COMPACT_RATIO = 0.25
+    WAL_COMPACT_MIN = 100
+    
+    # Seconds buffered log entries may wait before being flushed to disk
+    FLUSH_DELAY = 0.05
+    
     def __init__(self, data_dir: str = "data"):
         """
         Initialize the pairing system.
@@ -182,14 +347,21 @@ class PairingSystem:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
-        # Storage dictionaries
-        self.users: Dict[str, UserProfile] = {}
-        self.codes: Dict[str, PairingCode] = {}
-        self.pairings: Dict[str, Pairing] = {}
-        self.user_pairings: Dict[str, List[str]] = {}
+        # Log entries per store since its last compaction; the stores
+        # themselves are loaded on first access
+        self._wal_counts: Dict[str, int] = {store: 0 for store in self.STORES}
+        
+        # Mutation logs, kept open for appending
+        self._wal = {
+            store: open(self._get_file_path(f"{store}.wal"), 'ab', buffering=1 << 16)
+            for store in self.STORES
+        }
         
-        # Load existing data
-        self._load_data()
+        # Stores with buffered log entries, flushed together by one timer
+        self._dirty: Set[str] = set()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._flush_lock = threading.Lock()
+        atexit.register(self.flush)
         
         logger.info("Pairing system initialized")
     
@@ -197,73 +369,234 @@ class PairingSystem:
         """Get full path for data file."""
         return self.data_dir / filename
     
-    def _load_data(self) -> None:
-        """Load data from disk."""
-        try:
-            # Load users
-            users_file = self._get_file_path("users.json")
-            if users_file.exists():
-                with open(users_file, 'r') as f:
-                    users_data = json.load(f)
-                    self.users = {uid: UserProfile.from_dict(data) 
-                                 for uid, data in users_data.items()}
-            
-            # Load codes
-            codes_file = self._get_file_path("codes.json")
-            if codes_file.exists():
-                with open(codes_file, 'r') as f:
-                    codes_data = json.load(f)
-                    self.codes = {code: PairingCode.from_dict(data) 
-                                 for code, data in codes_data.items()}
+    def _read_snapshot(self, store: str) -> Dict[str, Any]:
+        """
+        Read a store's snapshot, preferring pickle over a legacy JSON file.
+        
+        Raises:
+            ValueError: If the pickle snapshot exists but can't be read or
+                has another schema version
+        """
+        record_cls = self.STORE_TYPES[store]
+        
+        pickle_file = self._get_file_path(f"{store}.pkl")
+        if pickle_file.exists():
+            # Never fall back to an empty store here: the next compaction
+            # would replace the snapshot with it
+            try:
+                with open(pickle_file, 'rb') as f:
+                    snapshot = pickle.load(f)
+            except Exception as e:
+                raise ValueError(f"Unreadable {store} snapshot {pickle_file}: {e}") from e
             
-            # Load pairings
-            pairings_file = self._get_file_path("pairings.json")
-            if pairings_file.exists():
-                with open(pairings_file, 'r') as f:
-                    pairings_data = json.load(f)
-                    self.pairings = {pid: Pairing.from_dict(data) 
-                                    for pid, data in pairings_data.items()}
+            version = snapshot.get("version") if isinstance(snapshot, dict) else None
+            if version != SCHEMA_VERSION or "records" not in snapshot:
+                raise ValueError(f"Unsupported {store} snapshot version {version!r} "
+                                 f"(expected {SCHEMA_VERSION})")
+            return snapshot["records"]
+        
+        json_file = self._get_file_path(f"{store}.json")
+        if not json_file.exists():
+            return {}
+        
+        with open(json_file, 'rb') as f:
+            snapshot = orjson.loads(f.read())
+        
+        # Version 1 snapshots are the bare record mapping
+        if isinstance(snapshot.get("version"), int) and "records" in snapshot:
+            snapshot = snapshot["records"]
+        return {key: record_cls.from_dict(data) for key, data in snapshot.items()}
+    
+    def _load_store(self, store: str) -> Dict[str, Any]:
+        """Load a store's snapshot and replay its mutation log over it."""
+        record_cls = self.STORE_TYPES[store]
+        
+        try:
+            records = self._read_snapshot(store)
             
-            # Rebuild user_pairings index
-            self.user_pairings = {}
-            for pairing_id, pairing in self.pairings.items():
-                for user_id in [pairing.user1_id, pairing.user2_id]:
-                    if user_id not in self.user_pairings:
-                        self.user_pairings[user_id] = []
-                    self.user_pairings[user_id].append(pairing_id)
+            wal_file = self._get_file_path(f"{store}.wal")
+            if wal_file.exists():
+                with open(wal_file, 'rb') as f:
+                    replayed_size = 0
+                    for line in f:
+                        entry = None
+                        if line.endswith(b"\n"):
+                            try:
+                                entry = orjson.loads(line)
+                            except orjson.JSONDecodeError:
+                                pass
+                        
+                        if entry is None:
+                            # A crash can leave a partially written last entry;
+                            # cut it off so new entries aren't appended after it
+                            logger.warning(f"Ignoring truncated {store} log entry")
+                            self._wal[store].truncate(replayed_size)
+                            break
+                        
+                        if entry["op"] == "put":
+                            records[entry["key"]] = record_cls.from_dict(entry["record"])
+                        else:
+                            records.pop(entry["key"], None)
+                        self._wal_counts[store] += 1
+                        replayed_size += len(line)
             
-            logger.info(f"Loaded {len(self.users)} users, {len(self.codes)} codes, "
-                       f"{len(self.pairings)} pairings")
+            logger.info(f"Loaded {len(records)} {store}")
         
         except Exception as e:
-            logger.error(f"Failed to load data: {e}")
+            # Fail the store rather than serve (and later compact) a partial one
+            logger.error(f"Failed to load {store}: {e}")
+            raise
+        
+        return records
+    
+    @functools.cached_property
+    def users(self) -> Dict[str, UserProfile]:
+        """User profiles by user ID, loaded on first access."""
+        return self._load_store("users")
+    
+    @functools.cached_property
+    def codes(self) -> Dict[str, PairingCode]:
+        """Pairing codes by code, loaded on first access with their owner index."""
+        codes = self._load_store("codes")
+        
+        codes_by_owner = {}
+        for code, pairing_code in codes.items():
+            codes_by_owner.setdefault(pairing_code.owner_id, set()).add(code)
+        self._codes_by_owner = codes_by_owner
+        
+        return codes
+    
+    @functools.cached_property
+    def _codes_by_owner(self) -> Dict[str, Set[str]]:
+        """Codes per owner user ID, built when the codes store loads."""
+        self.codes  # Loading the codes store sets the attribute
+        return self.__dict__['_codes_by_owner']
+    
+    @functools.cached_property
+    def pairings(self) -> Dict[str, Pairing]:
+        """Pairings by pairing ID, loaded on first access with their indexes."""
+        pairings = self._load_store("pairings")
+        self._index_pairings(pairings)
+        return pairings
+    
+    @functools.cached_property
+    def user_pairings(self) -> Dict[str, Set[str]]:
+        """Pairing IDs per user, built when the pairings store loads."""
+        self.pairings  # Loading the pairings store sets the attribute
+        return self.__dict__['user_pairings']
+    
+    @functools.cached_property
+    def _pair_index(self) -> Dict[Tuple[str, str], str]:
+        """Active pairing ID per unordered pair of user IDs."""
+        self.pairings  # Loading the pairings store sets the attribute
+        return self.__dict__['_pair_index']
+    
+    @staticmethod
+    def _pair_key(user1_id: str, user2_id: str) -> Tuple[str, str]:
+        """Get the order-independent index key for two users."""
+        return (user1_id, user2_id) if user1_id <= user2_id else (user2_id, user1_id)
+    
+    def _index_pairings(self, pairings: Dict[str, Pairing]) -> None:
+        """Rebuild user_pairings and the active pairing index in one pass."""
+        user_pairings = {}
+        pair_index = {}
+        for pairing_id, pairing in pairings.items():
+            user_pairings.setdefault(pairing.user1_id, set()).add(pairing_id)
+            user_pairings.setdefault(pairing.user2_id, set()).add(pairing_id)
+            if pairing.is_active:
+                pair_index[self._pair_key(pairing.user1_id, pairing.user2_id)] = pairing_id
+        
+        self.user_pairings = user_pairings
+        self._pair_index = pair_index
     
     def _save_data(self) -> None:
         """Save data to disk."""
         try:
-            # Save users
-            users_file = self._get_file_path("users.json")
-            users_data = {uid: user.to_dict() for uid, user in self.users.items()}
-            with open(users_file, 'w') as f:
-                json.dump(users_data, f, indent=2)
-            
-            # Save codes
-            codes_file = self._get_file_path("codes.json")
-            codes_data = {code: pc.to_dict() for code, pc in self.codes.items()}
-            with open(codes_file, 'w') as f:
-                json.dump(codes_data, f, indent=2)
-            
-            # Save pairings
-            pairings_file = self._get_file_path("pairings.json")
-            pairings_data = {pid: pairing.to_dict() for pid, pairing in self.pairings.items()}
-            with open(pairings_file, 'w') as f:
-                json.dump(pairings_data, f, indent=2)
+            # Stores never loaded are unchanged on disk
+            for store in self.STORES:
+                if store in self.__dict__:
+                    self._compact(store)
             
             logger.debug("Data saved successfully")
         
         except Exception as e:
             logger.error(f"Failed to save data: {e}")
     
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Write a file in one buffered write, publishing it only once durable."""
+        tmp_file = path.with_suffix('.tmp')
+        with open(tmp_file, 'wb', buffering=1 << 20) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    
+    def _compact(self, store: str) -> None:
+        """Rewrite a store's snapshot and empty its mutation log."""
+        data = {"version": SCHEMA_VERSION, "records": getattr(self, store)}
+        self._write_atomic(self._get_file_path(f"{store}.pkl"),
+                           pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        
+        # The pickle supersedes any pre-pickle JSON snapshot
+        self._get_file_path(f"{store}.json").unlink(missing_ok=True)
+        
+        # Entries are idempotent, so a crash before truncating only replays them
+        self._wal[store].truncate(0)
+        self._wal_counts[store] = 0
+    
+    def _append_wal(self, store: str, op: str, key: str,
+                    record: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Log a change to one record of a store.
+        
+        Args:
+            store: Store name ("users", "codes" or "pairings")
+            op: "put" to store the record, "del" to remove the key
+            key: Record key
+            record: Serialized record for "put"
+        """
+        try:
+            entry = {"op": op, "key": key}
+            if record is not None:
+                entry["record"] = record
+            
+            self._wal[store].write(orjson.dumps(entry) + b"\n")
+            self._wal_counts[store] += 1
+            self._mark_dirty(store)
+            
+            threshold = max(self.WAL_COMPACT_MIN, len(getattr(self, store)) * self.WAL_COMPACT_RATIO)
+            if self._wal_counts[store] > threshold:
+                self._compact(store)
+        
+        except Exception as e:
+            logger.error(f"Failed to log {store} change: {e}")
+    
+    def _mark_dirty(self, store: str) -> None:
+        """Schedule a flush of a store's buffered log entries."""
+        with self._flush_lock:
+            self._dirty.add(store)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self) -> None:
+        """Write all buffered log entries to disk and sync them."""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            dirty, self._dirty = self._dirty, set()
+        
+        for store in dirty:
+            try:
+                wal = self._wal[store]
+                wal.flush()
+                os.fsync(wal.fileno())
+            except Exception as e:
+                logger.error(f"Failed to flush {store} log: {e}")
+    
     def register_user(self, user_id: str, username: str, **kwargs) -> UserProfile:
         """
         Register a new user.
@@ -302,8 +635,7 @@ class PairingSystem:
         )
         
         self.users[user_id] = user
-        self.user_pairings[user_id] = []
-        self._save_data()
+        self._append_wal("users", "put", user_id, user.to_dict())
         
         logger.info(f"User registered: {username} ({user_id})")
         return user
@@ -326,8 +658,11 @@ class PairingSystem:
             if field in kwargs:
                 setattr(user, field, kwargs[field])
         
+        if 'interests' in kwargs:
+            user.refresh_interests()
+        
         user.last_active = datetime.now()
-        self._save_data()
+        self._append_wal("users", "put", user_id, user.to_dict())
         
         logger.debug(f"User updated: {user_id}")
         return user
@@ -360,7 +695,7 @@ class PairingSystem:
         
         # Generate unique code
         while True:
-            code = ''.join([str(uuid.uuid4().int % 10) for _ in range(8)])
+            code = f"{secrets.randbelow(100_000_000):08d}"
             if code not in self.codes:
                 break
         
@@ -376,7 +711,8 @@ class PairingSystem:
         )
         
         self.codes[code] = pairing_code
-        self._save_data()
+        self._codes_by_owner.setdefault(owner_id, set()).add(code)
+        self._append_wal("codes", "put", code, pairing_code.to_dict())
         
         logger.info(f"Pairing code generated: {code} for user {owner_id}")
         return pairing_code
@@ -419,8 +755,8 @@ class PairingSystem:
         # Calculate compatibility
         user1 = self.users[pairing_code.owner_id]
         user2 = self.users[user_id]
-        compatibility_score = self._calculate_compatibility(user1, user2)
         shared_interests = self._find_shared_interests(user1, user2)
+        compatibility_score = self._calculate_compatibility(user1, user2, len(shared_interests))
         
         # Create pairing
         pairing_id = str(uuid.uuid4())
@@ -436,54 +772,73 @@ class PairingSystem:
         self.pairings[pairing_id] = pairing
         
         # Update user pairings index
-        self.user_pairings[pairing_code.owner_id].append(pairing_id)
-        self.user_pairings[user_id].append(pairing_id)
+        self.user_pairings.setdefault(pairing_code.owner_id, set()).add(pairing_id)
+        self.user_pairings.setdefault(user_id, set()).add(pairing_id)
+        self._pair_index[self._pair_key(pairing_code.owner_id, user_id)] = pairing_id
         
-        self._save_data()
+        self._append_wal("codes", "put", code, pairing_code.to_dict())
+        self._append_wal("pairings", "put", pairing_id, pairing.to_dict())
         
         logger.info(f"Pairing created: {pairing_id} between {pairing_code.owner_id} and {user_id}")
         return True, pairing_id
     
     def _find_existing_pairing(self, user1_id: str, user2_id: str) -> Optional[str]:
-        """Find existing pairing between two users."""
-        user1_pairings = self.user_pairings.get(user1_id, [])
-        
-        for pairing_id in user1_pairings:
-            pairing = self.pairings[pairing_id]
-            if (pairing.user1_id == user2_id or pairing.user2_id == user2_id) and pairing.is_active:
-                return pairing_id
-        
-        return None
+        """Find existing active pairing between two users."""
+        return self._pair_index.get(self._pair_key(user1_id, user2_id))
     
-    def _calculate_compatibility(self, user1: UserProfile, user2: UserProfile) -> float:
-        """Calculate compatibility score between two users."""
-        score = 0.0
-        
-        # Interest matching (40%)
-        common_interests = set(user1.interests) & set(user2.interests)
-        if user1.interests:
-            interest_score = len(common_interests) / len(user1.interests) * 0.4
-            score += interest_score
+    def _calculate_compatibility(self, user1: UserProfile, user2: UserProfile,
+                                 inter_count: Optional[int] = None) -> float:
+        """
+        Calculate compatibility score between two users.
         
-        # Preference matching (30%)
-        # This can be customized based on your preference structure
-        pref_score = 0.15  # Base preference score
-        score += pref_score
+        Args:
+            user1: First user
+            user2: Second user
+            inter_count: Number of shared interests, if already known
         
-        # Activity level (20%)
-        activity_diff = abs((user1.last_active - user2.last_active).total_seconds())
-        activity_score = max(0, 1 - activity_diff / 86400) * 0.2  # 24 hours
-        score += activity_score
+        Returns:
+            Compatibility score between 0 and 1
+        """
+        if inter_count is None:
+            inter_count = len(user1._interest_set & user2._interest_set)
+        
+        return _compat_numeric(
+            user1.last_active.timestamp(),
+            user2.last_active.timestamp(),
+            inter_count,
+            len(user1.interests),
+            ((user1._id_hash ^ user2._id_hash) * _MIX_MULTIPLIER & _MIX_MASK) % 100
+        )
+    
+    def score_candidates(self, user: UserProfile,
+                         candidates: List[UserProfile]) -> np.ndarray:
+        """
+        Score a user's compatibility with many candidate partners at once.
         
-        # Random factor for variety (10%)
-        random_factor = hash(f"{user1.user_id}{user2.user_id}") % 100 / 1000
-        score += random_factor
+        Args:
+            user: User looking for a match
+            candidates: Candidate partners
         
-        return min(score, 1.0)
+        Returns:
+            Array of compatibility scores, in candidate order
+        """
+        count = len(candidates)
+        last_active = np.fromiter((c.last_active.timestamp() for c in candidates),
+                                  dtype=np.float64, count=count)
+        inter_counts = np.fromiter((len(user._interest_set & c._interest_set) for c in candidates),
+                                   dtype=np.int64, count=count)
+        id_hashes = np.fromiter((c._id_hash for c in candidates), dtype=np.uint64, count=count)
+        
+        # uint64 multiplication wraps, matching the masked mix in _calculate_compatibility
+        mixes = (np.uint64(user._id_hash) ^ id_hashes) * np.uint64(_MIX_MULTIPLIER)
+        hash_seeds = (mixes % np.uint64(100)).astype(np.int64)
+        
+        return _compat_batch(user.last_active.timestamp(), last_active, inter_counts,
+                             len(user.interests), hash_seeds)
     
     def _find_shared_interests(self, user1: UserProfile, user2: UserProfile) -> List[str]:
         """Find shared interests between two users."""
-        return list(set(user1.interests) & set(user2.interests))
+        return sorted(user1._interest_set & user2._interest_set)
     
     def get_user_pairings(self, user_id: str, 
                          status: Optional[PairingStatus] = None) -> List[Pairing]:
@@ -513,7 +868,13 @@ class PairingSystem:
         
         pairing.status = status
         pairing.last_interaction = datetime.now()
-        self._save_data()
+        
+        key = self._pair_key(pairing.user1_id, pairing.user2_id)
+        if pairing.is_active:
+            self._pair_index[key] = pairing_id
+        elif self._pair_index.get(key) == pairing_id:
+            del self._pair_index[key]
+        self._append_wal("pairings", "put", pairing_id, pairing.to_dict())
         
         logger.info(f"Pairing {pairing_id} status updated to {status}")
         return pairing
@@ -528,58 +889,69 @@ class PairingSystem:
         # Remove from user pairings index
         for user_id in [pairing.user1_id, pairing.user2_id]:
             if user_id in self.user_pairings:
-                self.user_pairings[user_id] = [
-                    pid for pid in self.user_pairings[user_id] 
-                    if pid != pairing_id
-                ]
+                self.user_pairings[user_id].discard(pairing_id)
+        
+        key = self._pair_key(pairing.user1_id, pairing.user2_id)
+        if self._pair_index.get(key) == pairing_id:
+            del self._pair_index[key]
         
         # Remove pairing
         del self.pairings[pairing_id]
-        self._save_data()
+        self._append_wal("pairings", "del", pairing_id)
         
         logger.info(f"Pairing deleted: {pairing_id}")
         return True
     
     def get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """Get statistics for a user."""
-        if user_id not in self.users:
-            return {}
-        
-        pairings = self.get_user_pairings(user_id)
-        active_pairings = [p for p in pairings if p.is_active]
-        codes = [code for code in self.codes.values() if code.owner_id == user_id]
-        
-        return {
-            "user_id": user_id,
-            "total_pairings": len(pairings),
-            "active_pairings": len(active_pairings),
-            "codes_generated": len(codes),
-            "active_codes": len([c for c in codes if c.is_valid]),
-            "compatibility_avg": (
-                sum(p.compatibility_score for p in active_pairings) / 
-                len(active_pairings) if active_pairings else 0
-            ),
-            "most_common_interest": self._find_most_common_interest(user_id)
-        }
-    
-    def _find_most_common_interest(self, user_id: str) -> Optional[str]:
-        """Find user's most common interest among pairings."""
         user = self.users.get(user_id)
         if not user:
-            return None
-        
-        interest_counts = {}
-        pairings = self.get_user_pairings(user_id)
+            return {}
         
-        for pairing in pairings:
+        # One pass over the user's pairings
+        total_pairings = 0
+        active_pairings = 0
+        score_sum = 0.0
+        interest_counts = Counter()
+        for pairing_id in self.user_pairings.get(user_id, ()):
+            pairing = self.pairings.get(pairing_id)
+            if not pairing:
+                continue
+            
+            total_pairings += 1
+            if pairing.is_active:
+                active_pairings += 1
+                score_sum += pairing.compatibility_score
+            
             other_id = pairing.user2_id if pairing.user1_id == user_id else pairing.user1_id
             other_user = self.users.get(other_id)
             if other_user:
-                for interest in user.interests:
-                    if interest in other_user.interests:
-                        interest_counts[interest] = interest_counts.get(interest, 0) + 1
+                interest_counts.update(
+                    interest for interest in user.interests
+                    if interest in other_user._interest_set
+                )
+        
+        # Only the user's own codes
+        owned_codes = self._codes_by_owner.get(user_id, ())
+        codes_generated = len(owned_codes)
+        active_codes = sum(1 for code in owned_codes if self.codes[code].is_valid)
+        
+        # Ties go to the interest listed first on the profile
+        most_common_interest = max(
+            (interest for interest in user.interests if interest in interest_counts),
+            key=interest_counts.__getitem__,
+            default=None
+        )
         
-        return max(interest_counts.items(), key=lambda x: x[1])[0] if interest_counts else None
+        return {
+            "user_id": user_id,
+            "total_pairings": total_pairings,
+            "active_pairings": active_pairings,
+            "codes_generated": codes_generated,
+            "active_codes": active_codes,
+            "compatibility_avg": score_sum / active_pairings if active_pairings else 0,
+            "most_common_interest": most_common_interest
+        }
     
     def cleanup_expired(self) -> Dict[str, int]:
         """Clean up expired codes and pairings."""
@@ -602,8 +974,10 @@ class PairingSystem:
                 pairing.status = PairingStatus.ARCHIVED
                 archived_pairings.append(pairing_id)
         
-        if expired_codes or archived_pairings:
-            self._save_data()
+        for code in expired_codes:
+            self._append_wal("codes", "put", code, self.codes[code].to_dict())
+        for pairing_id in archived_pairings:
+            self._append_wal("pairings", "put", pairing_id, self.pairings[pairing_id].to_dict())
         
         return {
             "expired_codes": len(expired_codes),
@@ -614,15 +988,15 @@ class PairingSystem:
         """Export all data to JSON file."""
         try:
             export_data = {
-                "exported_at": datetime.now().isoformat(),
-                "version": "1.0",
+                "exported_at": datetime.now(),
+                "version": f"{SCHEMA_VERSION}.0",
                 "users": {uid: user.to_dict() for uid, user in self.users.items()},
                 "codes": {code: pc.to_dict() for code, pc in self.codes.items()},
                 "pairings": {pid: pairing.to_dict() for pid, pairing in self.pairings.items()}
             }
             
-            with open(filepath, 'w') as f:
-                json.dump(export_data, f, indent=2)
+            self._write_atomic(Path(filepath),
+                               orjson.dumps(export_data, option=orjson.OPT_INDENT_2))
             
             logger.info(f"Data exported to {filepath}")
             return True
@@ -634,34 +1008,37 @@ class PairingSystem:
     def import_data(self, filepath: str) -> bool:
         """Import data from JSON file."""
         try:
-            with open(filepath, 'r') as f:
-                import_data = json.load(f)
+            with open(filepath, 'rb') as f:
+                import_data = orjson.loads(f.read())
             
-            # Clear existing data
-            self.users.clear()
-            self.codes.clear()
-            self.pairings.clear()
-            self.user_pairings.clear()
+            # Replace existing data without loading it first
+            self.users = {}
+            self.codes = {}
+            self._codes_by_owner = {}
+            self.pairings = {}
+            self.user_pairings = {}
+            self._pair_index = {}
             
             # Import users
             for uid, user_data in import_data.get("users", {}).items():
                 self.users[uid] = UserProfile.from_dict(user_data)
-                self.user_pairings[uid] = []
+                self.user_pairings[uid] = set()
             
             # Import codes
             for code, code_data in import_data.get("codes", {}).items():
-                self.codes[code] = PairingCode.from_dict(code_data)
+                pairing_code = PairingCode.from_dict(code_data)
+                self.codes[code] = pairing_code
+                self._codes_by_owner.setdefault(pairing_code.owner_id, set()).add(code)
             
-            # Import pairings
+            # Import pairings, indexing each as it is built
             for pid, pairing_data in import_data.get("pairings", {}).items():
                 pairing = Pairing.from_dict(pairing_data)
                 self.pairings[pid] = pairing
                 
-                # Update user pairings index
-                for user_id in [pairing.user1_id, pairing.user2_id]:
-                    if user_id not in self.user_pairings:
-                        self.user_pairings[user_id] = []
-                    self.user_pairings[user_id].append(pid)
+                self.user_pairings.setdefault(pairing.user1_id, set()).add(pid)
+                self.user_pairings.setdefault(pairing.user2_id, set()).add(pid)
+                if pairing.is_active:
+                    self._pair_index[self._pair_key(pairing.user1_id, pairing.user2_id)] = pid
             
             self._save_data()
             
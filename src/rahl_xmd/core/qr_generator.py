@@ -18,12 +18,115 @@ from qrcode.image.styles.colormasks import (
 from PIL import Image, ImageDraw, ImageFont
 from typing import Optional, Tuple, List, Dict, Any
 import base64
+import functools
+import math
+import threading
+from collections import OrderedDict
 from io import BytesIO
 import numpy as np
 
 from .pairing_system import PairingCode, CodeTheme
 
 
+class _ArrayColorMask:
+    """
+    Color mask mixin that applies the mask to the whole pixel array at once.
+    
+    Reproduces QRColorMask.apply_mask's per-pixel arithmetic exactly,
+    without going through getpixel/putpixel for every pixel.
+    """
+    
+    def _fg_pixels(self, width: int, height: int) -> np.ndarray:
+        """
+        Get foreground colors for every pixel.
+        
+        Args:
+            width: Image width
+            height: Image height
+        
+        Returns:
+            Integer color array broadcastable to (height, width, channels)
+        """
+        raise NotImplementedError
+    
+    def _gradient_pixels(self, norm: np.ndarray) -> np.ndarray:
+        """Interpolate center to edge color by per-pixel distance, truncating like interp_num."""
+        center = np.asarray(self.center_color, dtype=np.float64)
+        edge = np.asarray(self.edge_color, dtype=np.float64)
+        norm = norm[..., None]
+        return np.trunc(edge * norm + center * (1 - norm))
+    
+    def apply_mask(self, image: Image.Image) -> None:
+        """Apply the mask to a styled QR image in place."""
+        width, height = image.size
+        pixels = np.array(image, dtype=np.float64)
+        back = np.asarray(self.back_color, dtype=np.float64)
+        paint = np.asarray(self.paint_color, dtype=np.float64)
+        channels = len(self.back_color)
+        
+        # Background pixels are left untouched (only comparable when the
+        # image has the same number of bands as the back color)
+        if pixels.shape[2] == channels:
+            keep = (pixels == back).all(axis=2)
+        else:
+            keep = np.zeros((height, width), dtype=bool)
+        
+        # Average interpolation coefficient over channels where back and paint differ
+        used = [k for k in range(min(channels, len(self.paint_color), pixels.shape[2]))
+                if back[k] != paint[k]]
+        if used:
+            norm = (pixels[..., used[0]] - back[used[0]]) / (paint[used[0]] - back[used[0]])
+            for k in used[1:]:
+                norm = norm + (pixels[..., k] - back[k]) / (paint[k] - back[k])
+            norm = (norm / len(used))[..., None]
+            fg = self._fg_pixels(width, height)
+            new = np.trunc(fg * norm + back * (1 - norm))
+        else:
+            new = np.broadcast_to(back, (height, width, channels))
+        
+        out = pixels.copy()
+        out[..., :channels] = np.where(keep[..., None], pixels[..., :channels], new)
+        if out.shape[2] > channels:
+            # Colors written without an alpha band come out opaque
+            out[..., channels:] = np.where(keep[..., None], pixels[..., channels:], 255)
+        
+        np.clip(out, 0, 255, out=out)
+        image.paste(Image.fromarray(out.astype(np.uint8), image.mode))
+
+
+class _FastSolidFillColorMask(_ArrayColorMask, SolidFillColorMask):
+    """SolidFillColorMask applied over the pixel array."""
+    
+    def apply_mask(self, image: Image.Image) -> None:
+        # Already drawn black on white
+        if self.back_color == (255, 255, 255) and self.front_color == (0, 0, 0):
+            return
+        _ArrayColorMask.apply_mask(self, image)
+    
+    def _fg_pixels(self, width: int, height: int) -> np.ndarray:
+        return np.asarray(self.front_color, dtype=np.float64)
+
+
+class _FastRadialGradiantColorMask(_ArrayColorMask, RadialGradiantColorMask):
+    """RadialGradiantColorMask applied over the pixel array."""
+    
+    def _fg_pixels(self, width: int, height: int) -> np.ndarray:
+        x = np.arange(width, dtype=np.float64) - width / 2
+        y = np.arange(height, dtype=np.float64)[:, None] - width / 2
+        distance = np.sqrt(x * x + y * y) / (math.sqrt(2) * width / 2)
+        return self._gradient_pixels(distance)
+
+
+class _FastSquareGradiantColorMask(_ArrayColorMask, SquareGradiantColorMask):
+    """SquareGradiantColorMask applied over the pixel array."""
+    
+    def _fg_pixels(self, width: int, height: int) -> np.ndarray:
+        x = np.abs(np.arange(width, dtype=np.float64) - width / 2)
+        y = np.abs(np.arange(height, dtype=np.float64)[:, None] - width / 2)
+        distance = np.maximum(x, y) / (width / 2)
+        return self._gradient_pixels(distance)
+
+
 class QRGenerator:
     """Generates QR codes for pairing codes."""
     
@@ -67,12 +170,34 @@ class QRGenerator:
         }
     }
     
+    # zlib level used for PNG byte output
+    PNG_COMPRESS_LEVEL = 1
+    
+    # Module drawer classes by theme drawer name. Drawers keep per-image state
+    # from initialize(), so a fresh instance is made for each render
+    _DRAWERS = {
+        "square": SquareModuleDrawer,
+        "rounded": RoundedModuleDrawer,
+        "circle": CircleModuleDrawer,
+        "gapped": GappedSquareModuleDrawer
+    }
+    
+    # Fraction of the QR width covered by the embedded logo
+    LOGO_RATIO = 0.25
+    
+    # Number of rendered QR PNGs kept for repeated renders of a code
+    QR_CACHE_SIZE = 256
+    
+    # Loaded label fonts by size, shared across instances
+    _FONT_CACHE: Dict[int, Any] = {}
+    
     def __init__(self, 
                  size: int = 400,
                  border: int = 4,
                  error_correction: str = "H",
                  include_logo: bool = True,
-                 logo_path: Optional[str] = None):
+                 logo_path: Optional[str] = None,
+                 mask_pattern: Optional[int] = None):
         """
         Initialize QR generator.
         
@@ -82,17 +207,34 @@ class QRGenerator:
             error_correction: Error correction level (L/M/Q/H)
             include_logo: Whether to include logo
             logo_path: Path to custom logo
+            mask_pattern: Fixed QR mask pattern (0-7). Skips the penalty
+                search over all eight masks, most of the encode time;
+                None picks the lowest-penalty mask per code
         """
         self.size = size
         self.border = border
         self.error_correction = getattr(qrcode.constants, f"ERROR_CORRECT_{error_correction}")
         self.include_logo = include_logo
         self.logo_path = logo_path
+        self.mask_pattern = mask_pattern
         
         # Load default logo if available
         self.logo = None
         if self.include_logo:
             self.logo = self._load_logo(logo_path)
+        
+        # Logo resized to its embedded width (pixels -> image)
+        self._logo_sizes: Dict[int, Image.Image] = {}
+        
+        # Rendered QR PNGs ((code, owner ID, theme, size, logo, resample, mode) -> bytes),
+        # least recently used first
+        self._qr_cache: "OrderedDict[Tuple[str, str, Any, int, bool, int, str], bytes]" = OrderedDict()
+        
+        # Base64 encodings of the cached PNGs, same keys and eviction
+        self._b64_cache: "OrderedDict[Tuple[str, str, Any, int, bool, int, str], str]" = OrderedDict()
+        
+        # Guards both caches when tiles render on worker threads
+        self._cache_lock = threading.Lock()
     
     def _load_logo(self, logo_path: Optional[str] = None) -> Optional[Image.Image]:
         """Load logo image."""
@@ -138,35 +280,77 @@ class QRGenerator:
         
         return logo
     
+    def _get_sized_logo(self, pixel_size: int, box_size: int) -> Optional[Image.Image]:
+        """
+        Get the logo pre-resized to the width StyledPilImage embeds it at.
+        
+        The embedded width is snapped to whole modules, so a given QR size
+        always needs the same logo size; resizing once per size makes the
+        library's own resize a plain copy.
+        
+        Args:
+            pixel_size: Rendered QR width in pixels
+            box_size: Module size in pixels
+        
+        Returns:
+            Resized logo, or None if there is no logo
+        """
+        if self.logo is None:
+            return None
+        
+        # Same geometry as StyledPilImage.draw_embedded_image
+        logo_width_ish = int(pixel_size * self.LOGO_RATIO)
+        logo_offset = int((int(pixel_size / 2) - int(logo_width_ish / 2)) / box_size) * box_size
+        logo_width = pixel_size - logo_offset * 2
+        
+        logo = self._logo_sizes.get(logo_width)
+        if logo is None:
+            logo = self.logo.resize((logo_width, logo_width), Image.Resampling.LANCZOS)
+            self._logo_sizes[logo_width] = logo
+        return logo
+    
+    @classmethod
+    def _get_font(cls, size: int):
+        """Get the label font at a size, loading it on first use."""
+        font = cls._FONT_CACHE.get(size)
+        if font is None:
+            try:
+                font = ImageFont.truetype("arial.ttf", size)
+            except:
+                font = ImageFont.load_default()
+            cls._FONT_CACHE[size] = font
+        return font
+    
     def _get_theme_config(self, theme: CodeTheme) -> Dict[str, Any]:
         """Get configuration for a theme."""
         return self.THEME_COLORS.get(theme, self.THEME_COLORS[CodeTheme.DEFAULT])
     
     def _get_module_drawer(self, drawer_type: str):
         """Get module drawer based on type."""
-        drawers = {
-            "square": SquareModuleDrawer(),
-            "rounded": RoundedModuleDrawer(),
-            "circle": CircleModuleDrawer(),
-            "gapped": GappedSquareModuleDrawer()
-        }
-        return drawers.get(drawer_type, SquareModuleDrawer())
+        return self._DRAWERS.get(drawer_type, SquareModuleDrawer)()
     
-    def _get_color_mask(self, fill_color: Tuple[int, int, int], 
-                       back_color: Tuple[int, int, int],
-                       gradient_type: str):
-        """Get color mask based on gradient type."""
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _get_color_mask(fill_color: Tuple[int, int, int], 
+                        back_color: Tuple[int, int, int],
+                        gradient_type: str):
+        """
+        Get color mask based on gradient type.
+        
+        Masks hold no per-image state, so one instance is shared per
+        (fill, back, gradient) combination.
+        """
         if gradient_type == "radial":
-            return RadialGradiantColorMask(back_color=back_color, 
-                                          center_color=fill_color,
-                                          edge_color=back_color)
+            return _FastRadialGradiantColorMask(back_color=back_color, 
+                                                center_color=fill_color,
+                                                edge_color=back_color)
         elif gradient_type == "square":
-            return SquareGradiantColorMask(back_color=back_color,
-                                          center_color=fill_color,
-                                          edge_color=back_color)
+            return _FastSquareGradiantColorMask(back_color=back_color,
+                                                center_color=fill_color,
+                                                edge_color=back_color)
         else:
-            return SolidFillColorMask(back_color=back_color, 
-                                     front_color=fill_color)
+            return _FastSolidFillColorMask(back_color=back_color, 
+                                           front_color=fill_color)
     
     def generate_qr_data(self, pairing_code: PairingCode) -> str:
         """
@@ -180,17 +364,66 @@ class QRGenerator:
         """
         return f"RAHLXMD:PAIR:{pairing_code.code}:{pairing_code.owner_id}"
     
-    def generate_qr_code(self, 
+    def _cache_key(self,
+                   pairing_code: PairingCode,
+                   size: Optional[int],
+                   add_logo: Optional[bool],
+                   resample: Image.Resampling,
+                   mode: str = 'RGB') -> Tuple[str, str, Any, int, bool, int, str]:
+        """Get the render cache key for a pairing code and output options."""
+        return (pairing_code.code, pairing_code.owner_id, pairing_code.theme,
+                size or self.size, bool(add_logo or self.include_logo), int(resample), mode)
+    
+    def _cache_png(self,
+                   key: Tuple[str, str, Any, int, bool, int, str],
+                   img: Image.Image,
+                   buffer: Optional[BytesIO] = None) -> bytes:
+        """
+        Encode a rendered QR image as PNG and store it in the render cache.
+        
+        Args:
+            key: Render cache key
+            img: Rendered QR image
+            buffer: Empty buffer to encode into (a new one is used if None)
+        
+        Returns:
+            PNG image bytes
+        """
+        buffered = buffer if buffer is not None else BytesIO()
+        # Favor encode speed: QR images compress well even at low levels
+        img.save(buffered, format="PNG", compress_level=self.PNG_COMPRESS_LEVEL)
+        png_bytes = buffered.getvalue()
+        
+        with self._cache_lock:
+            self._qr_cache[key] = png_bytes
+            if len(self._qr_cache) > self.QR_CACHE_SIZE:
+                self._qr_cache.popitem(last=False)
+        
+        return png_bytes
+    
+    def _get_cached_png(self, key: Tuple[str, str, Any, int, bool, int, str]) -> Optional[bytes]:
+        """Get PNG bytes from the render cache, marking them recently used."""
+        with self._cache_lock:
+            png_bytes = self._qr_cache.get(key)
+            if png_bytes is not None:
+                self._qr_cache.move_to_end(key)
+        return png_bytes
+    
+    def _render_qr_code(self,
                         pairing_code: PairingCode,
-                        size: Optional[int] = None,
-                        add_logo: Optional[bool] = None) -> Image.Image:
+                        output_size: int,
+                        use_logo: bool,
+                        resample: Image.Resampling,
+                        mode: str = 'RGB') -> Image.Image:
         """
-        Generate QR code image.
+        Render a styled QR code image, bypassing the render cache.
         
         Args:
             pairing_code: PairingCode object
-            size: Output size (overrides default)
-            add_logo: Whether to add logo (overrides default)
+            output_size: Output size in pixels
+            use_logo: Whether to embed the logo
+            resample: Filter used to stretch the render to the output size
+            mode: Image mode to return
         
         Returns:
             PIL Image object
@@ -198,12 +431,12 @@ class QRGenerator:
         # Get theme configuration
         theme_config = self._get_theme_config(pairing_code.theme)
         
-        # Create QR code
+        # Create QR code; make() picks the smallest version fitting the data
         qr = qrcode.QRCode(
-            version=1,
             error_correction=self.error_correction,
             box_size=10,
             border=self.border,
+            mask_pattern=self.mask_pattern,
         )
         
         # Add data
@@ -211,6 +444,10 @@ class QRGenerator:
         qr.add_data(data)
         qr.make(fit=True)
         
+        # Size modules so the render lands on (or just under) the output size
+        modules = qr.modules_count + 2 * self.border
+        qr.box_size = max(1, output_size // modules)
+        
         # Create styled image
         img = qr.make_image(
             image_factory=StyledPilImage,
@@ -220,15 +457,77 @@ class QRGenerator:
                 gradient_type=theme_config["gradient"]
             ),
             module_drawer=self._get_module_drawer(theme_config["drawer"]),
-            embeded_image=self.logo if (add_logo or self.include_logo) else None
+            embeded_image=self._get_sized_logo(modules * qr.box_size, qr.box_size) if use_logo else None,
+            embeded_image_ratio=self.LOGO_RATIO
         )
         
-        # Resize if needed
-        output_size = size or self.size
+        # Stretch the remainder to the output size
         if img.size[0] != output_size:
-            img = img.resize((output_size, output_size), Image.Resampling.LANCZOS)
+            img = img.resize((output_size, output_size), resample)
+        
+        return img.convert(mode)
+    
+    def generate_qr_code(self, 
+                        pairing_code: PairingCode,
+                        size: Optional[int] = None,
+                        add_logo: Optional[bool] = None,
+                        resample: Image.Resampling = Image.Resampling.NEAREST,
+                        _mode: str = 'RGB') -> Image.Image:
+        """
+        Generate QR code image.
+        
+        Args:
+            pairing_code: PairingCode object
+            size: Output size (overrides default)
+            add_logo: Whether to add logo (overrides default)
+            resample: Filter used to stretch the render to the output size
+                (modules are hard-edged, so NEAREST keeps them sharp)
+            _mode: Image mode to return; 'RGBA' spares callers that
+                composite onto the QR a conversion copy
+        
+        Returns:
+            PIL Image object
+        """
+        key = self._cache_key(pairing_code, size, add_logo, resample, _mode)
+        png_bytes = self._get_cached_png(key)
+        if png_bytes is not None:
+            img = Image.open(BytesIO(png_bytes))
+            img.load()
+            return img
+        
+        img = self._render_qr_code(pairing_code, key[3], key[4], resample, _mode)
+        self._cache_png(key, img)
+        
+        return img
+    
+    def generate_qr_png_bytes(self,
+                              pairing_code: PairingCode,
+                              size: Optional[int] = None,
+                              add_logo: Optional[bool] = None,
+                              buffer: Optional[BytesIO] = None,
+                              resample: Image.Resampling = Image.Resampling.NEAREST) -> bytes:
+        """
+        Generate QR code as PNG encoded bytes.
+        
+        Args:
+            pairing_code: PairingCode object
+            size: Output size (overrides default)
+            add_logo: Whether to add logo (overrides default)
+            buffer: Empty buffer to encode into on cache miss (a new one is
+                used if None)
+            resample: Filter used to stretch the render to the output size
         
-        return img.convert('RGB')
+        Returns:
+            PNG image bytes
+        """
+        key = self._cache_key(pairing_code, size, add_logo, resample)
+        png_bytes = self._get_cached_png(key)
+        if png_bytes is not None:
+            return png_bytes
+        
+        qr_img = self._render_qr_code(pairing_code, key[3], key[4], resample)
+        
+        return self._cache_png(key, qr_img, buffer)
     
     def generate_qr_with_overlay(self,
                                 pairing_code: PairingCode,
@@ -246,23 +545,16 @@ class QRGenerator:
             PIL Image with overlay
         """
         # Generate base QR
-        qr_img = self.generate_qr_code(pairing_code, size=size)
-        
         if not text:
-            return qr_img
+            return self.generate_qr_code(pairing_code, size=size)
         
-        # Create overlay
-        overlay = Image.new('RGBA', qr_img.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+        # Render straight to RGBA since the label is composited onto it
+        qr_img = self.generate_qr_code(pairing_code, size=size, _mode='RGBA')
         
-        # Try to load font
-        try:
-            font = ImageFont.truetype("arial.ttf", 20)
-        except:
-            font = ImageFont.load_default()
+        font = self._get_font(20)
         
-        # Draw text background
-        text_bbox = draw.textbbox((0, 0), text, font=font)
+        # Measure text background
+        text_bbox = font.getbbox(text)
         text_width = text_bbox[2] - text_bbox[0]
         text_height = text_bbox[3] - text_bbox[1]
         
@@ -274,23 +566,23 @@ class QRGenerator:
         bg_x = (qr_img.width - bg_width) // 2
         bg_y = qr_img.height - bg_height - 20
         
-        # Draw rounded rectangle background
+        # Draw the label on a stamp covering just its box (rectangle
+        # corners are inclusive, hence the extra pixel)
+        stamp = Image.new('RGBA', (bg_width + 1, bg_height + 1), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(stamp)
         draw.rounded_rectangle(
-            [bg_x, bg_y, bg_x + bg_width, bg_y + bg_height],
+            [0, 0, bg_width, bg_height],
             radius=10,
             fill=(0, 0, 0, 180)
         )
+        draw.text((padding, padding), text, fill=(255, 255, 255, 255), font=font)
         
-        # Draw text
-        text_x = bg_x + padding
-        text_y = bg_y + padding
-        draw.text((text_x, text_y), text, fill=(255, 255, 255, 255), font=font)
+        # Composite only the stamp region, clipping labels wider than the QR
+        qr_img.alpha_composite(stamp,
+                               dest=(max(bg_x, 0), max(bg_y, 0)),
+                               source=(max(-bg_x, 0), max(-bg_y, 0)))
         
-        # Combine with QR
-        qr_img = qr_img.convert('RGBA')
-        result = Image.alpha_composite(qr_img, overlay)
-        
-        return result.convert('RGB')
+        return qr_img.convert('RGB')
     
     def save_qr_code(self, 
                     pairing_code: PairingCode,
@@ -324,6 +616,26 @@ class QRGenerator:
         Returns:
             Base64 encoded image string
         """
+        if format.upper() == "PNG":
+            key = self._cache_key(pairing_code, kwargs.get("size"), kwargs.get("add_logo"),
+                                  kwargs.get("resample", Image.Resampling.NEAREST))
+            with self._cache_lock:
+                b64 = self._b64_cache.get(key)
+                if b64 is not None:
+                    self._b64_cache.move_to_end(key)
+                    return b64
+            
+            # Encode the cached PNG directly instead of re-rendering
+            png_bytes = self.generate_qr_png_bytes(pairing_code, **kwargs)
+            b64 = base64.b64encode(png_bytes).decode()
+            
+            with self._cache_lock:
+                self._b64_cache[key] = b64
+                if len(self._b64_cache) > self.QR_CACHE_SIZE:
+                    self._b64_cache.popitem(last=False)
+            
+            return b64
+        
         qr_img = self.generate_qr_code(pairing_code, **kwargs)
         
         buffered = BytesIO()
@@ -351,27 +663,24 @@ class QRGenerator:
         cols, rows = grid_size
         qr_size = min(150, self.size // 2)  # Smaller for grid
         
-        # Generate individual QR codes
-        qr_images = []
-        for code in pairing_codes[:cols * rows]:
-            qr_img = self.generate_qr_code(code, size=qr_size)
-            qr_images.append(qr_img)
-        
         # Calculate total size
         total_width = cols * qr_size + (cols + 1) * spacing
         total_height = rows * qr_size + (rows + 1) * spacing
         
         # Create canvas
-        canvas = Image.new('RGB', (total_width, total_height), background)
+        canvas = np.empty((total_height, total_width, 3), dtype=np.uint8)
+        canvas[:] = background
         
-        # Paste QR codes
-        for i, qr_img in enumerate(qr_images):
+        # Render QR codes straight into their grid cells
+        for i, code in enumerate(pairing_codes[:cols * rows]):
             row = i // cols
             col = i % cols
             
             x = spacing + col * (qr_size + spacing)
             y = spacing + row * (qr_size + spacing)
             
-            canvas.paste(qr_img, (x, y))
+            qr_img = self.generate_qr_code(code, size=qr_size,
+                                           resample=Image.Resampling.NEAREST)
+            canvas[y:y + qr_size, x:x + qr_size] = np.asarray(qr_img)
         
-        return canvas
+        return Image.fromarray(canvas, 'RGB')
@@ -3,35 +3,43 @@ RAHL XMD Pairing System
 An advanced pairing system with animated QR codes and multi-platform support.
 """
 
+from ._lazy import lazy_exports
+
 __version__ = "1.0.0"
 __author__ = "RAHL XMD Team"
 __license__ = "MIT"
 
-# Core exports
-from .core.pairing_system import PairingSystem, PairingCode, PairingStatus
-from .core.code_generator import CodeGenerator
-from .core.qr_generator import QRGenerator
-from .core.animation_engine import AnimationEngine
-
-# Theme exports
-from .themes.base_theme import BaseTheme
-from .themes.neon_theme import NeonTheme
-from .themes.cyberpunk_theme import CyberpunkTheme
-from .themes.matrix_theme import MatrixTheme
-from .themes.aurora_theme import AuroraTheme
-from .themes.hologram_theme import HologramTheme
-
-# Enums
-from .core.pairing_system import CodeTheme
-
-# Bot exports
-from .bot.discord_bot import RAHLDiscordBot
-from .bot.telegram_bot import RAHLTelegramBot
-from .bot.web_bot import RAHLWebBot
-
-# API exports
-from .api.fastapi_app import app
-from .api.routes import router
+# Exported name -> submodule defining it; imported on first access so
+# that using one component doesn't pull in the bots, API and every theme
+_LAZY_IMPORTS = {
+    # Core
+    "PairingSystem": "core.pairing_system",
+    "PairingCode": "core.pairing_system",
+    "PairingStatus": "core.pairing_system",
+    "CodeGenerator": "core.code_generator",
+    "QRGenerator": "core.qr_generator",
+    "AnimationEngine": "core.animation_engine",
+    
+    # Themes
+    "BaseTheme": "themes.base_theme",
+    "NeonTheme": "themes.neon_theme",
+    "CyberpunkTheme": "themes.cyberpunk_theme",
+    "MatrixTheme": "themes.matrix_theme",
+    "AuroraTheme": "themes.aurora_theme",
+    "HologramTheme": "themes.hologram_theme",
+    
+    # Enums
+    "CodeTheme": "core.pairing_system",
+    
+    # Bots
+    "RAHLDiscordBot": "bot.discord_bot",
+    "RAHLTelegramBot": "bot.telegram_bot",
+    "RAHLWebBot": "bot.web_bot",
+    
+    # API
+    "app": "api.fastapi_app",
+    "router": "api.routes",
+}
 
 __all__ = [
     "PairingSystem",
@@ -53,3 +61,5 @@ __all__ = [
     "app",
     "router",
 ]
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
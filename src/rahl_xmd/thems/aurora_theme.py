@@ -2,15 +2,40 @@
 Aurora theme for RAHL XMD pairing system.
 """
 
-from typing import Tuple
+from typing import Any, Dict, Tuple
 from PIL import Image, ImageDraw, ImageFilter
 import numpy as np
-import random
 import math
 
-from .base_theme import BaseTheme
+from .base_theme import BaseTheme, get_font
 from ..core.animation_engine import AnimationType
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # Compiled color shift; apply_theme falls back to NumPy without Numba
+    
+    @njit(parallel=True, cache=True)
+    def _aurora_shift(img, shifts, out):
+        """Write img with the RGB shift planes added and clipped into out."""
+        height, width, channels = img.shape
+        for y in prange(height):
+            for x in range(width):
+                for c in range(3):
+                    value = img[y, x, c] + shifts[y, x, c]
+                    out[y, x, c] = int(min(max(value, 0.0), 255.0))
+                for c in range(3, channels):
+                    out[y, x, c] = img[y, x, c]
+    
+    # Compile (or load from cache) at import rather than on the first render
+    _aurora_shift(np.zeros((1, 1, 3), dtype=np.uint8), np.zeros((1, 1, 3)),
+                  np.empty((1, 1, 3), dtype=np.uint8))
+
 
 class AuroraTheme(BaseTheme):
     """Aurora theme with northern lights color shifting."""
@@ -30,6 +55,20 @@ class AuroraTheme(BaseTheme):
             "background": (10, 20, 40),  # Dark blue
             "aurora": (0, 255, 200),     # Teal
         }
+        
+        # Color shift planes per (height, width), reused across renders
+        self._shift_cache: Dict[Tuple[int, int], np.ndarray] = {}
+        
+        # Random source for background jitter and stars
+        self._rng = np.random.default_rng()
+        
+        # Pixel offsets covered by a star of each size (1-3)
+        self._star_offsets: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        for size in range(1, 4):
+            stamp = Image.new('L', (2 * size + 1, 2 * size + 1), 0)
+            ImageDraw.Draw(stamp).ellipse([0, 0, 2 * size, 2 * size], fill=255)
+            dy, dx = np.nonzero(np.array(stamp))
+            self._star_offsets[size] = (dy - size, dx - size)
     
     @property
     def primary_color(self) -> Tuple[int, int, int]:
@@ -49,41 +88,51 @@ class AuroraTheme(BaseTheme):
         
         # Create color shift based on pixel position
         height, width, _ = img_array.shape
+        shifts = self._color_shifts(height, width)
         
-        for y in range(height):
-            for x in range(width):
-                # Calculate phase based on position
-                x_phase = x / width * 2 * math.pi
-                y_phase = y / height * 2 * math.pi
-                
-                # Create color shift
-                r_shift = math.sin(x_phase + y_phase) * 50
-                g_shift = math.cos(x_phase) * 50
-                b_shift = math.sin(y_phase) * 50
-                
-                # Apply shift
-                img_array[y, x, 0] = np.clip(img_array[y, x, 0] + r_shift, 0, 255)
-                img_array[y, x, 1] = np.clip(img_array[y, x, 1] + g_shift, 0, 255)
-                img_array[y, x, 2] = np.clip(img_array[y, x, 2] + b_shift, 0, 255)
+        if NUMBA_AVAILABLE:
+            out = np.empty_like(img_array)
+            _aurora_shift(img_array, shifts, out)
+            return Image.fromarray(out)
+        
+        # Apply shift; the uint8 cast truncates like the per-pixel assignment did
+        shifted = img_array[..., :3] + shifts
+        img_array[..., :3] = np.clip(shifted, 0, 255, out=shifted)
         
         return Image.fromarray(img_array.astype(np.uint8))
     
+    def _color_shifts(self, height: int, width: int) -> np.ndarray:
+        """Get the (height, width, 3) RGB shift planes for an image size."""
+        shifts = self._shift_cache.get((height, width))
+        if shifts is None:
+            # Calculate phase based on position
+            x_phase = np.arange(width) / width * (2 * math.pi)
+            y_phase = (np.arange(height) / height * (2 * math.pi))[:, None]
+            
+            # Create color shift
+            shifts = np.empty((height, width, 3))
+            np.sin(x_phase + y_phase, out=shifts[..., 0])
+            shifts[..., 1] = np.cos(x_phase)
+            shifts[..., 2] = np.sin(y_phase)
+            shifts *= 50
+            
+            self._shift_cache[(height, width)] = shifts
+        return shifts
+    
     def generate_background(self, width: int, height: int) -> Image.Image:
         """Generate aurora borealis background."""
-        # Create gradient background
-        background = Image.new('RGB', (width, height))
-        draw = ImageDraw.Draw(background)
+        # Vertical gradient from dark blue to purple: one color per row in a
+        # 1px column, stretched across (NEAREST just repeats it)
+        ratio = (np.arange(height) / height)[:, None]
+        top = np.array(self.background_color, dtype=np.float64)
+        bottom = np.array([40, 20, 60], dtype=np.float64)
+        rows = (top * (1 - ratio) + bottom * ratio).astype(np.uint8)
         
-        # Draw vertical gradient from dark blue to purple
-        for y in range(height):
-            ratio = y / height
-            
-            # Gradient from dark blue to purple
-            r = int(self.background_color[0] * (1 - ratio) + 40 * ratio)
-            g = int(self.background_color[1] * (1 - ratio) + 20 * ratio)
-            b = int(self.background_color[2] * (1 - ratio) + 60 * ratio)
-            
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
+        # Kept RGBA while the layers are composited in place, so no layer
+        # pays for mode conversions
+        background = Image.fromarray(rows[:, None, :], 'RGB').resize(
+            (width, height), Image.Resampling.NEAREST
+        ).convert('RGBA')
         
         # Create aurora layers
         aurora_layers = 5
@@ -102,19 +151,11 @@ class AuroraTheme(BaseTheme):
                 wave_x = width * wave / wave_count
                 wave_width = width / wave_count
                 
-                # Draw wavy line
-                points = []
-                for i in range(int(wave_width)):
-                    x = wave_x + i
-                    # Sine wave for aurora shape
-                    y_offset = math.sin(x / 50 + layer * 0.5) * 30
-                    y_offset += math.cos(x / 30) * 20
-                    y = layer_y + y_offset
-                    
-                    # Add some randomness
-                    y += random.randint(-5, 5)
-                    
-                    points.append((x, y))
+                # Wavy line: sine wave for aurora shape plus some randomness
+                xs = wave_x + np.arange(int(wave_width))
+                y_offsets = np.sin(xs / 50 + layer * 0.5) * 30 + np.cos(xs / 30) * 20
+                ys = layer_y + y_offsets + self._rng.integers(-5, 6, xs.size)
+                points = list(zip(xs.tolist(), ys.tolist()))
                 
                 # Draw smooth curve through points
                 if len(points) > 1:
@@ -126,93 +167,75 @@ class AuroraTheme(BaseTheme):
                     # Convert HSV to RGB
                     color = self._hsv_to_rgb(hue, saturation, brightness)
                     
-                    # Draw thick line with gradient opacity
-                    for width_mult in range(5, 0, -1):
-                        line_width = width_mult * 2
-                        alpha = int(50 / width_mult)
-                        
-                        # Draw line segment
-                        for i in range(len(points) - 1):
-                            x1, y1 = points[i]
-                            x2, y2 = points[i + 1]
-                            
-                            aurora_draw.line([(x1, y1), (x2, y2)], 
-                                           fill=(*color, alpha), 
-                                           width=line_width)
+                    # Draw one thick polyline; the blur below provides the glow
+                    # falloff (alpha 32 matches the old nested 2-10px strokes
+                    # to within 2 levels once blurred)
+                    aurora_draw.line(points, fill=(*color, 32), width=10)
             
             # Apply blur for aurora glow
             aurora_layer = aurora_layer.filter(ImageFilter.GaussianBlur(radius=10))
             
             # Composite onto background
-            background = Image.alpha_composite(
-                background.convert('RGBA'), 
-                aurora_layer
-            ).convert('RGB')
+            background.alpha_composite(aurora_layer)
+        background = background.convert('RGB')
         
-        # Add stars
+        # Add stars: white disks, stamped per size for all stars at once
         star_count = (width * height) // 1000
-        star_draw = ImageDraw.Draw(background)
+        xs = self._rng.integers(0, width, star_count)
+        ys = self._rng.integers(0, height, star_count)
+        sizes = self._rng.integers(1, 4, star_count)
         
-        for _ in range(star_count):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-            
-            # Star brightness
-            brightness = random.randint(100, 255)
-            size = random.randint(1, 3)
-            
-            # Draw star
-            for offset in range(size, 0, -1):
-                alpha = int(brightness * (offset / size))
-                star_color = (255, 255, 255, alpha)
-                
-                left = x - offset
-                top = y - offset
-                right = x + offset
-                bottom = y + offset
-                
-                star_draw.ellipse([left, top, right, bottom], 
-                                 fill=star_color, outline=None)
+        star_array = np.array(background)
+        for size, (dy, dx) in self._star_offsets.items():
+            selected = sizes == size
+            py = ys[selected, None] + dy
+            px = xs[selected, None] + dx
+            inside = (py >= 0) & (py < height) & (px >= 0) & (px < width)
+            star_array[py[inside], px[inside]] = 255
         
-        return background
+        return Image.fromarray(star_array)
     
     def _hsv_to_rgb(self, h: float, s: float, v: float) -> Tuple[int, int, int]:
         """Convert HSV to RGB."""
-        h = h % 360
-        s = max(0, min(100, s)) / 100
-        v = max(0, min(100, v)) / 100
+        r, g, b = self._hsv_to_rgb_array(np.array([h]), s, v)[0]
+        return (int(r), int(g), int(b))
+    
+    @staticmethod
+    def _hsv_to_rgb_array(h: np.ndarray, s: Any, v: Any) -> np.ndarray:
+        """
+        Convert arrays of HSV values to RGB.
+        
+        Args:
+            h: Hues in degrees
+            s: Saturations (0-100), scalar or broadcastable to h
+            v: Values (0-100), scalar or broadcastable to h
+        
+        Returns:
+            uint8 array of shape h.shape + (3,)
+        """
+        h = np.mod(h, 360)
+        s = np.clip(s, 0, 100) / 100
+        v = np.clip(v, 0, 100) / 100
         
         c = v * s
-        x = c * (1 - abs((h / 60) % 2 - 1))
+        x = c * (1 - np.abs((h / 60) % 2 - 1))
         m = v - c
+        h, c, x, m = np.broadcast_arrays(h, c, x, m)
+        
+        # Hue sector 0-5; anything from 300 up (including a wrapped 360) is the last
+        sector = np.minimum((h / 60).astype(np.intp), 5)
+        zero = np.zeros_like(c)
+        rgb = np.stack([
+            np.choose(sector, [c, x, zero, zero, x, c]),
+            np.choose(sector, [x, c, c, x, zero, zero]),
+            np.choose(sector, [zero, zero, x, c, c, x]),
+        ], axis=-1)
         
-        if 0 <= h < 60:
-            r, g, b = c, x, 0
-        elif 60 <= h < 120:
-            r, g, b = x, c, 0
-        elif 120 <= h < 180:
-            r, g, b = 0, c, x
-        elif 180 <= h < 240:
-            r, g, b = 0, x, c
-        elif 240 <= h < 300:
-            r, g, b = x, 0, c
-        else:
-            r, g, b = c, 0, x
-        
-        r = int((r + m) * 255)
-        g = int((g + m) * 255)
-        b = int((b + m) * 255)
-        
-        return (r, g, b)
+        return ((rgb + m[..., None]) * 255).astype(np.uint8)
     
     def create_color_shift_text(self, text: str, font_size: int = 48) -> Image.Image:
         """Create color shifting text."""
-        from PIL import ImageFont
-        
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        font = get_font("arial.ttf", font_size)
         
         # Calculate text size
         temp_img = Image.new('RGBA', (1, 1), (0, 0, 0, 0))
@@ -221,23 +244,14 @@ class AuroraTheme(BaseTheme):
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
-        # Create canvas
+        # Render the text once; its alpha is the coverage mask
         canvas = Image.new('RGBA', (text_width, text_height), (0, 0, 0, 0))
         draw = ImageDraw.Draw(canvas)
+        draw.text((0, 0), text, fill=(255, 255, 255, 255), font=font)
         
-        # Draw text with color gradient
-        for x in range(text_width):
-            # Calculate color based on position
-            hue = (x / text_width) * 360
-            color = self._hsv_to_rgb(hue, 80, 100)
-            
-            # Draw vertical slice
-            slice_img = Image.new('RGBA', (1, text_height), (0, 0, 0, 0))
-            slice_draw = ImageDraw.Draw(slice_img)
-            slice_draw.text((0, 0), text, fill=(*color, 255), font=font)
-            
-            # Extract slice and apply to canvas
-            canvas_slice = slice_img.crop((x, 0, x + 1, text_height))
-            canvas.paste(canvas_slice, (x, 0), canvas_slice)
+        # Color each column by its position along the hue gradient
+        color_strip = self._hsv_to_rgb_array(np.arange(text_width) / text_width * 360, 80, 100)
+        rgba = np.array(canvas)
+        rgba[..., :3] = color_strip[None, :, :]
         
-        return canvas
+        return Image.fromarray(rgba, 'RGBA')
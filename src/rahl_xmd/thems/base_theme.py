@@ -3,14 +3,36 @@ Base theme class for RAHL XMD pairing system.
 """
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, Tuple, List
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
 from ..core.animation_engine import AnimationType
 from ..core.pairing_system import CodeTheme
 
 
+@lru_cache(maxsize=64)
+def get_font(name: str, size: int, *fallbacks: str):
+    """
+    Load a TrueType font, trying fallbacks in turn; cached per arguments.
+    
+    Args:
+        name: Font file to try first
+        size: Font size
+        fallbacks: Font files to try if name can't be loaded
+    
+    Returns:
+        First font that loads, or PIL's default font
+    """
+    for font_name in (name,) + fallbacks:
+        try:
+            return ImageFont.truetype(font_name, size)
+        except:
+            continue
+    return ImageFont.load_default()
+
+
 class BaseTheme(ABC):
     """Abstract base class for all themes."""
     
@@ -87,24 +109,20 @@ class BaseTheme(ABC):
         card_width = max(600, qr_code.width + 200)
         card_height = max(400, qr_code.height + 200)
         
-        # Create background
+        # Create background; content is opaque, so it is drawn straight onto it
         background = self.generate_background(card_width, card_height)
-        
-        # Create overlay with content
-        overlay = Image.new('RGBA', (card_width, card_height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+        if background.mode != 'RGB':
+            background = background.convert('RGB')
+        draw = ImageDraw.Draw(background)
         
         # Add QR code
         qr_x = (card_width - qr_code.width) // 2
         qr_y = 50
-        overlay.paste(qr_code, (qr_x, qr_y))
+        background.paste(qr_code, (qr_x, qr_y), qr_code if qr_code.mode == 'RGBA' else None)
         
         # Add pairing code
         code_font_size = 40
-        try:
-            code_font = ImageFont.truetype("arial.ttf", code_font_size)
-        except:
-            code_font = ImageFont.load_default()
+        code_font = get_font("arial.ttf", code_font_size)
         
         code_bbox = draw.textbbox((0, 0), pairing_code, font=code_font)
         code_width = code_bbox[2] - code_bbox[0]
@@ -116,10 +134,7 @@ class BaseTheme(ABC):
         
         # Add user name
         name_font_size = 24
-        try:
-            name_font = ImageFont.truetype("arial.ttf", name_font_size)
-        except:
-            name_font = ImageFont.load_default()
+        name_font = get_font("arial.ttf", name_font_size)
         
         name_text = f"Shared by: {user_name}"
         name_bbox = draw.textbbox((0, 0), name_text, font=name_font)
@@ -143,10 +158,7 @@ class BaseTheme(ABC):
         # Add footer
         footer_text = "RAHL XMD Pairing System"
         footer_font_size = 16
-        try:
-            footer_font = ImageFont.truetype("arial.ttf", footer_font_size)
-        except:
-            footer_font = ImageFont.load_default()
+        footer_font = get_font("arial.ttf", footer_font_size)
         
         footer_bbox = draw.textbbox((0, 0), footer_text, font=footer_font)
         footer_width = footer_bbox[2] - footer_bbox[0]
@@ -156,9 +168,20 @@ class BaseTheme(ABC):
         draw.text((footer_x, footer_y), footer_text, 
                  fill=self.secondary_color, font=footer_font)
         
-        # Combine background and overlay
-        result = Image.alpha_composite(background.convert('RGBA'), overlay)
-        return result.convert('RGB')
+        return background
+    
+    @staticmethod
+    def add_scan_lines(image: Image.Image, spacing: int, color: Tuple[int, int, int]) -> None:
+        """
+        Paint a solid scan line across every spacing-th row of an image.
+        
+        Args:
+            image: Image to draw on, in place
+            spacing: Rows from one scan line to the next
+            color: Scan line color
+        """
+        for y in range(0, image.height, spacing):
+            image.paste(color, (0, y, image.width, y + 1))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert theme to dictionary."""
@@ -2,8 +2,8 @@
 Cyberpunk theme for RAHL XMD pairing system.
 """
 
-from typing import Tuple
-from PIL import Image, ImageDraw, ImageFilter
+from typing import Dict, Tuple
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
 import numpy as np
 import random
 import math
@@ -15,6 +15,24 @@ from ..core.animation_engine import AnimationType
 class CyberpunkTheme(BaseTheme):
     """Cyberpunk theme with futuristic grid and glitch effects."""
     
+    # Unit hexagon vertices (from math.cos/sin so grid points are bit-for-bit
+    # what the per-vertex scalar math produced)
+    UNIT_HEX = np.array([(math.cos(math.pi / 3 * i), math.sin(math.pi / 3 * i))
+                         for i in range(6)])
+    
+    # Image.point table for the HSV bands, using the same uint8 arithmetic
+    # as adjusting the arrays: hue shifted 90 toward cyan/pink, saturation
+    # doubled, value unchanged
+    _LEVELS = np.arange(256, dtype=np.uint8)
+    HSV_LUT = np.concatenate([
+        (_LEVELS + 90) % 255,
+        np.clip(_LEVELS * 2, 0, 255).astype(np.uint8),
+        _LEVELS,
+    ]).tolist()
+    
+    # Hexagon glow outline (scale, alpha) layers, outermost first
+    HEX_GLOW = [(1 + i * 0.1, int(30 / i)) for i in range(3, 0, -1)]
+    
     def __init__(self):
         super().__init__()
         self.name = "cyberpunk"
@@ -30,6 +48,11 @@ class CyberpunkTheme(BaseTheme):
             "background": (20, 10, 40),   # Dark purple
             "grid": (0, 200, 255),        # Bright blue grid
         }
+        
+        self._rng = np.random.default_rng()
+        
+        # Binary rain glyph coverage masks ((char, alpha) -> L image)
+        self._glyph_masks: Dict[Tuple[str, int], Image.Image] = {}
     
     @property
     def primary_color(self) -> Tuple[int, int, int]:
@@ -45,115 +68,119 @@ class CyberpunkTheme(BaseTheme):
     
     def apply_theme(self, image: Image.Image) -> Image.Image:
         """Apply cyberpunk effect to image."""
-        img_array = np.array(image)
-        
-        # Split color channels for glitch effect
-        r, g, b = img_array[:, :, 0], img_array[:, :, 1], img_array[:, :, 2]
+        img_array = np.asarray(image)
+        height, width = img_array.shape[:2]
         
-        # Apply channel shifts
+        # Apply channel shifts: red wraps right, blue wraps up, written
+        # straight into the glitched image instead of rolled copies
         shift_amount = random.randint(1, 3)
-        r_shifted = np.roll(r, shift_amount, axis=1)
-        b_shifted = np.roll(b, -shift_amount, axis=0)
-        
-        # Create glitched image
-        glitched_array = np.stack([r_shifted, g, b_shifted], axis=2)
-        
-        # Apply color filter
+        r_shift = shift_amount % width
+        b_shift = shift_amount % height
+        
+        glitched_array = np.empty((height, width, 3), dtype=img_array.dtype)
+        glitched_array[:, r_shift:, 0] = img_array[:, :width - r_shift, 0]
+        glitched_array[:, :r_shift, 0] = img_array[:, width - r_shift:, 0]
+        glitched_array[:, :, 1] = img_array[:, :, 1]
+        glitched_array[:height - b_shift, :, 2] = img_array[b_shift:, :, 2]
+        glitched_array[height - b_shift:, :, 2] = img_array[:b_shift, :, 2]
+        
+        # Apply color filter: boost saturation and shift hue toward
+        # cyan/pink in HSV, as one table lookup over all three bands
         hsv_img = Image.fromarray(glitched_array).convert('HSV')
-        hsv_array = np.array(hsv_img)
-        
-        # Boost saturation
-        hsv_array[:, :, 1] = np.clip(hsv_array[:, :, 1] * 2, 0, 255)
-        
-        # Shift hue toward cyan/pink
-        hue_shift = 90
-        hsv_array[:, :, 0] = (hsv_array[:, :, 0] + hue_shift) % 255
-        
-        # Convert back
-        result = Image.fromarray(hsv_array, 'HSV').convert('RGB')
+        result = hsv_img.point(self.HSV_LUT).convert('RGB')
         
         return result
     
     def generate_background(self, width: int, height: int) -> Image.Image:
         """Generate cyberpunk grid background."""
-        # Create base background with gradient
-        background = Image.new('RGB', (width, height))
+        # Create base background with a vertical gradient: one color per row
+        # in a 1px column, stretched across (NEAREST just repeats it)
+        ratio = (np.arange(height) / height)[:, None]
+        rows = (np.array(self.background_color) * (1 - ratio)
+                + np.array([0, 20, 40]) * ratio).astype(np.uint8)
+        
+        background = Image.fromarray(rows[:, None, :], 'RGB').resize(
+            (width, height), Image.Resampling.NEAREST
+        )
         draw = ImageDraw.Draw(background)
         
-        # Draw vertical gradient
-        for y in range(height):
-            # Calculate gradient color
-            ratio = y / height
-            r = int(self.background_color[0] * (1 - ratio) + 0 * ratio)
-            g = int(self.background_color[1] * (1 - ratio) + 20 * ratio)
-            b = int(self.background_color[2] * (1 - ratio) + 40 * ratio)
-            
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-        
         # Draw hexagonal grid
         hex_size = 40
         hex_width = hex_size * 2
         hex_height = int(hex_size * math.sqrt(3))
         
-        for x in range(-hex_width, width + hex_width, hex_width):
-            for y in range(-hex_height, height + hex_height, hex_height):
-                # Calculate hexagon points
-                center_x = x + hex_width // 2
-                center_y = y + hex_height // 2
-                
-                points = []
-                for i in range(6):
-                    angle = math.pi / 3 * i
-                    px = center_x + hex_size * math.cos(angle)
-                    py = center_y + hex_size * math.sin(angle)
-                    points.append((px, py))
-                
-                # Draw hexagon with glow
-                for i in range(3, 0, -1):
-                    alpha = int(30 / i)
-                    glow_color = (*self.colors["grid"], alpha)
-                    
-                    # Scale points for glow
-                    glow_points = []
-                    scale = 1 + i * 0.1
-                    for px, py in points:
-                        gx = center_x + (px - center_x) * scale
-                        gy = center_y + (py - center_y) * scale
-                        glow_points.append((gx, gy))
-                    
-                    draw.polygon(glow_points, outline=glow_color, width=1)
+        # Hexagon centers, column by column
+        xs = np.arange(-hex_width, width + hex_width, hex_width) + hex_width // 2
+        ys = np.arange(-hex_height, height + hex_height, hex_height) + hex_height // 2
+        centers = np.stack(np.meshgrid(xs, ys, indexing='ij'), axis=-1)
+        
+        # Skip cells whose outermost glow outline lies entirely off the canvas
+        reach = hex_size * self.HEX_GLOW[0][0] * np.abs(self.UNIT_HEX).max(axis=0)
+        on_canvas = np.all((centers + reach >= -1) & (centers - reach <= (width, height)), axis=-1)
+        centers = centers[on_canvas].reshape(-1, 1, 1, 2).astype(np.float64)
+        
+        # Vertices of every glow outline at once: (cells, layers, 6, 2)
+        scales = np.array([scale for scale, _ in self.HEX_GLOW])[:, None, None]
+        points = centers + hex_size * self.UNIT_HEX
+        glow_points = centers + (points - centers) * scales
+        
+        # Draw hexagons with glow
+        glow_colors = [(*self.colors["grid"], alpha) for _, alpha in self.HEX_GLOW]
+        for cell in glow_points.reshape(len(glow_points), len(self.HEX_GLOW), -1).tolist():
+            for layer_points, glow_color in zip(cell, glow_colors):
+                draw.polygon(layer_points, outline=glow_color, width=1)
         
         # Add scan lines
-        for y in range(0, height, 4):
-            alpha = random.randint(5, 15)
-            draw.line([(0, y), (width, y)], 
-                     fill=(0, 255, 255, alpha), width=1)
+        self.add_scan_lines(background, 4, (0, 255, 255))
         
-        # Add random binary code rain
+        # Add random binary code rain; drops fade out along their length
         binary_count = width // 10
-        for _ in range(binary_count):
-            x = random.randint(0, width - 1)
-            y_start = random.randint(-100, 0)
-            length = random.randint(5, 15)
-            speed = random.uniform(2, 5)
-            
-            # Draw falling binary
-            for i in range(length):
-                char_y = int(y_start + i * 10)
-                if 0 <= char_y < height:
-                    char = random.choice(['0', '1'])
-                    color = self.primary_color if random.random() > 0.7 else self.secondary_color
-                    alpha = int(255 * (1 - i / length))
-                    
-                    try:
-                        draw.text((x, char_y), char, 
-                                 fill=(*color, alpha), 
-                                 font=ImageFont.load_default())
-                    except:
-                        pass
+        xs = self._rng.integers(0, width, binary_count)
+        y_starts = self._rng.integers(-100, 1, binary_count)
+        lengths = self._rng.integers(5, 16, binary_count)
+        
+        # One entry per character of every drop
+        drop = np.repeat(np.arange(binary_count), lengths)
+        step = np.arange(len(drop)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        char_ys = y_starts[drop] + step * 10
+        alphas = (255 * (1 - step / lengths[drop])).astype(np.intp)
+        bits = self._rng.integers(0, 2, len(drop))
+        use_primary = self._rng.random(len(drop)) > 0.7
+        
+        visible = (char_ys >= 0) & (char_ys < height)
+        font = ImageFont.load_default()
+        for x, char_y, bit, primary, alpha in zip(xs[drop][visible].tolist(),
+                                                  char_ys[visible].tolist(),
+                                                  bits[visible].tolist(),
+                                                  use_primary[visible].tolist(),
+                                                  alphas[visible].tolist()):
+            mask = self._get_glyph_mask("01"[bit], alpha, font)
+            color = self.primary_color if primary else self.secondary_color
+            background.paste(color, (x, char_y, x + mask.width, char_y + mask.height), mask)
         
         return background
     
+    def _get_glyph_mask(self, char: str, alpha: int, font) -> Image.Image:
+        """
+        Get a binary rain glyph's coverage mask at an alpha, rendering it on first use.
+        
+        Args:
+            char: Glyph to render
+            alpha: Opacity the coverage is scaled to
+            font: Font to render with
+        
+        Returns:
+            L mask laid out like draw.text at the paste origin
+        """
+        key = (char, alpha)
+        mask = self._glyph_masks.get(key)
+        if mask is None:
+            bbox = font.getbbox(char)
+            mask = Image.new('L', (bbox[2], bbox[3]), 0)
+            ImageDraw.Draw(mask).text((0, 0), char, fill=alpha, font=font)
+            self._glyph_masks[key] = mask
+        return mask
+    
     def create_data_matrix(self, text: str) -> Image.Image:
         """Create data matrix visualization."""
         # Convert text to binary
@@ -166,34 +193,27 @@ class CyberpunkTheme(BaseTheme):
         cell_size = 10
         img_size = matrix_size * cell_size
         
-        matrix_img = Image.new('RGB', (img_size, img_size), self.background_color)
-        draw = ImageDraw.Draw(matrix_img)
-        
-        # Draw matrix cells
-        for i in range(matrix_size):
-            for j in range(matrix_size):
-                idx = i * matrix_size + j
-                if idx < len(binary_text):
-                    bit = binary_text[idx]
-                    
-                    if bit == '1':
-                        # Active cell
-                        x1 = j * cell_size
-                        y1 = i * cell_size
-                        x2 = x1 + cell_size
-                        y2 = y1 + cell_size
-                        
-                        # Draw cell with glow
-                        draw.rectangle([x1, y1, x2, y2], 
-                                      fill=self.primary_color)
-                        
-                        # Add inner highlight
-                        highlight_size = cell_size // 3
-                        highlight_x = x1 + (cell_size - highlight_size) // 2
-                        highlight_y = y1 + (cell_size - highlight_size) // 2
-                        draw.rectangle([highlight_x, highlight_y, 
-                                       highlight_x + highlight_size, 
-                                       highlight_y + highlight_size],
-                                      fill=self.secondary_color)
+        # Lay the bits out row by row on a square grid
+        bits = np.zeros(matrix_size * matrix_size, dtype=np.uint8)
+        bits[:len(binary_text)] = np.frombuffer(binary_text.encode(), dtype=np.uint8) - ord('0')
+        grid = bits.reshape(matrix_size, matrix_size)
+        
+        # Palette index of every pixel: a cell tile (1) with its inner
+        # highlight (2) for each active bit, the background (0) elsewhere
+        highlight_size = cell_size // 3
+        highlight_start = (cell_size - highlight_size) // 2
+        highlight_end = highlight_start + highlight_size + 1
+        tile = np.ones((cell_size, cell_size), dtype=np.uint8)
+        tile[highlight_start:highlight_end, highlight_start:highlight_end] = 2
+        cells = (grid[:, None, :, None] * tile[None, :, None, :]).reshape(img_size, img_size)
+        
+        # Cell bounds are inclusive, so each active cell also covers the
+        # first pixel row and column of the next one
+        cells[:, cell_size::cell_size] |= cells[:, cell_size - 1:-1:cell_size]
+        cells[cell_size::cell_size] |= cells[cell_size - 1:-1:cell_size]
+        
+        matrix_img = Image.fromarray(cells, 'P')
+        matrix_img.putpalette(self.background_color + self.primary_color + self.secondary_color)
+        matrix_img = matrix_img.convert('RGB')
         
         return matrix_img
@@ -1,13 +1,21 @@
 """
 Theme modules for RAHL XMD pairing system.
+
+Theme classes are imported on first access so that using one theme
+doesn't load every other theme module.
 """
 
-from .base_theme import BaseTheme
-from .neon_theme import NeonTheme
-from .cyberpunk_theme import CyberpunkTheme
-from .matrix_theme import MatrixTheme
-from .aurora_theme import AuroraTheme
-from .hologram_theme import HologramTheme
+from .._lazy import lazy_exports
+
+# Exported name -> submodule defining it
+_LAZY_IMPORTS = {
+    "BaseTheme": "base_theme",
+    "NeonTheme": "neon_theme",
+    "CyberpunkTheme": "cyberpunk_theme",
+    "MatrixTheme": "matrix_theme",
+    "AuroraTheme": "aurora_theme",
+    "HologramTheme": "hologram_theme",
+}
 
 __all__ = [
     "BaseTheme",
@@ -17,3 +25,5 @@ __all__ = [
     "AuroraTheme",
     "HologramTheme",
 ]
+
+__getattr__, __dir__ = lazy_exports(globals(), _LAZY_IMPORTS)
@@ -2,13 +2,12 @@
 Matrix theme for RAHL XMD pairing system.
 """
 
-from typing import Tuple
-from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, Tuple
+from PIL import Image, ImageDraw, ImageFilter
 import numpy as np
-import random
 import math
 
-from .base_theme import BaseTheme
+from .base_theme import BaseTheme, get_font
 from ..core.animation_engine import AnimationType
 
 
@@ -33,6 +32,15 @@ class MatrixTheme(BaseTheme):
         
         # Character set for code rain
         self.matrix_chars = "01アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲン"
+        
+        # Green per luminance bucket (dark, medium, bright), signed so noise can be added in place
+        self._palette = np.array([
+            self.colors["accent"],
+            self.colors["secondary"],
+            self.colors["primary"],
+        ], dtype=np.int16)
+        self._rng = np.random.default_rng()
+        self._glyph_masks: Dict[Tuple[str, object], Image.Image] = {}
     
     @property
     def primary_color(self) -> Tuple[int, int, int]:
@@ -49,32 +57,23 @@ class MatrixTheme(BaseTheme):
     def apply_theme(self, image: Image.Image) -> Image.Image:
         """Apply matrix effect to image."""
         # Convert to green scale
-        img_array = np.array(image)
-        
-        # Calculate luminance
-        luminance = np.dot(img_array[..., :3], [0.299, 0.587, 0.114])
-        
-        # Map luminance to green colors
-        green_array = np.zeros_like(img_array)
+        img_array = np.asarray(image)
         
-        # Bright areas become bright green
-        mask_bright = luminance > 200
-        green_array[mask_bright] = self.primary_color
+        # Calculate luminance in thousandths, exactly, in integer arithmetic
+        luminance = np.multiply(img_array[..., 0], 299, dtype=np.int32)
+        luminance += np.multiply(img_array[..., 1], 587, dtype=np.int32)
+        luminance += np.multiply(img_array[..., 2], 114, dtype=np.int32)
         
-        # Medium areas become medium green
-        mask_medium = (luminance > 100) & (luminance <= 200)
-        green_array[mask_medium] = self.secondary_color
-        
-        # Dark areas become dark green
-        mask_dark = luminance <= 100
-        green_array[mask_dark] = self.colors["accent"]
+        # Map luminance to green colors in one gather: dark areas (<= 100)
+        # become dark green, medium (<= 200) medium and the rest bright green
+        bucket = (luminance > 100000).view(np.uint8) + (luminance > 200000)
+        green_array = self._palette[bucket]
         
         # Add some noise for matrix effect
-        noise = np.random.randint(-20, 20, green_array.shape[:2])
-        for i in range(3):
-            green_array[:, :, i] = np.clip(green_array[:, :, i] + noise, 0, 255)
+        noise = self._rng.integers(-20, 20, green_array.shape[:2], dtype=np.int16)
+        green_array += noise[..., None]
         
-        return Image.fromarray(green_array.astype(np.uint8))
+        return Image.fromarray(np.clip(green_array, 0, 255).astype(np.uint8))
     
     def generate_background(self, width: int, height: int) -> Image.Image:
         """Generate matrix code rain background."""
@@ -83,35 +82,24 @@ class MatrixTheme(BaseTheme):
         
         # We'll create the rain in the animation
         # For static background, just add some random characters
-        draw = ImageDraw.Draw(background)
         
         # Try to load a monospace font
-        try:
-            font = ImageFont.truetype("consola.ttf", 14)
-        except:
-            try:
-                font = ImageFont.truetype("courier.ttf", 14)
-            except:
-                font = ImageFont.load_default()
-        
-        # Add some random characters
+        font = get_font("consola.ttf", 14, "courier.ttf")
+        
+        # Add some random characters, with positions, glyphs and
+        # brightness drawn for all of them at once
         char_count = (width * height) // 1000
-        for _ in range(char_count):
-            x = random.randint(0, width - 20)
-            y = random.randint(0, height - 20)
-            char = random.choice(self.matrix_chars)
-            
-            # Random brightness
-            brightness = random.randint(50, 255)
-            color = (0, brightness, 0)
-            
-            draw.text((x, y), char, fill=color, font=font)
+        xs = self._rng.integers(0, width - 19, char_count).tolist()
+        ys = self._rng.integers(0, height - 19, char_count).tolist()
+        picks = self._rng.integers(0, len(self.matrix_chars), char_count).tolist()
+        brightnesses = self._rng.integers(50, 256, char_count).tolist()
+        
+        for x, y, pick, brightness in zip(xs, ys, picks, brightnesses):
+            mask = self._get_glyph_mask(self.matrix_chars[pick], font)
+            background.paste((0, brightness, 0), (x, y, x + mask.width, y + mask.height), mask)
         
         # Add scan lines
-        for y in range(0, height, 3):
-            alpha = random.randint(5, 20)
-            draw.line([(0, y), (width, y)], 
-                     fill=(0, 100, 0, alpha), width=1)
+        self.add_scan_lines(background, 3, (0, 100, 0))
         
         return background
     
@@ -119,85 +107,93 @@ class MatrixTheme(BaseTheme):
                               width: int, 
                               height: int,
                               frame_num: int,
-                              drops: list) -> Tuple[Image.Image, list]:
+                              drops: Dict[str, np.ndarray]) -> Tuple[Image.Image, Dict[str, np.ndarray]]:
         """Create a single frame of code rain animation."""
         # Create background
         frame = Image.new('RGB', (width, height), self.background_color)
-        draw = ImageDraw.Draw(frame)
         
         # Try to load font
-        try:
-            font = ImageFont.truetype("consola.ttf", 16)
-        except:
-            try:
-                font = ImageFont.truetype("courier.ttf", 16)
-            except:
-                font = ImageFont.load_default()
+        font = get_font("consola.ttf", 16, "courier.ttf")
         
         # Update drops
-        for drop in drops:
-            # Update position
-            drop['y'] += drop['speed']
-            drop['age'] += 1
-            
-            # Reset if off screen
-            if drop['y'] > height + drop['length'] * 20:
-                drop['y'] = random.randint(-200, -20)
-                drop['x'] = random.randint(0, width - 1)
-                drop['speed'] = random.uniform(2, 6)
-                drop['length'] = random.randint(5, 15)
-                drop['age'] = 0
-            
-            # Draw drop
-            for i in range(drop['length']):
-                y_pos = int(drop['y']) - i * 20
-                
-                if 0 <= y_pos < height:
-                    # Calculate brightness (head is brightest)
-                    brightness = 255 * (1 - i / drop['length'])
-                    
-                    # Head character (bright)
-                    if i == 0:
-                        char = random.choice(['@', '#', '$', '%', '&'])
-                        color = (0, int(brightness), 0)
-                    # Body characters
-                    else:
-                        char = random.choice(self.matrix_chars)
-                        color = (0, int(brightness * 0.7), 0)
-                    
-                    # Draw character
-                    draw.text((drop['x'], y_pos), char, 
-                             fill=color, font=font)
+        drops['y'] += drops['speed']
+        drops['age'] += 1
+        
+        # Reset drops that fell off screen
+        reset = drops['y'] > height + drops['length'] * 20
+        reset_count = int(np.count_nonzero(reset))
+        if reset_count:
+            drops['y'][reset] = self._rng.integers(-200, -19, reset_count)
+            drops['x'][reset] = self._rng.integers(0, width, reset_count)
+            drops['speed'][reset] = self._rng.uniform(2, 6, reset_count)
+            drops['length'][reset] = self._rng.integers(5, 16, reset_count)
+            drops['age'][reset] = 0
+        
+        # One entry per character of every drop; step 0 is the head
+        lengths = drops['length']
+        drop = np.repeat(np.arange(len(lengths)), lengths)
+        step = np.arange(len(drop)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        y_pos = drops['y'].astype(np.intp)[drop] - step * 20
+        
+        visible = (y_pos >= 0) & (y_pos < height)
+        drop, step, y_pos = drop[visible], step[visible], y_pos[visible]
+        
+        # Calculate brightness (head is brightest, body is dimmed)
+        brightness = 255 * (1 - step / lengths[drop])
+        greens = np.where(step == 0, brightness, brightness * 0.7).astype(np.intp)
+        
+        # Head characters come first in the alphabet, body characters after
+        head_chars = "@#$%&"
+        alphabet = head_chars + self.matrix_chars
+        picks = np.where(step == 0,
+                         self._rng.integers(0, len(head_chars), len(step)),
+                         self._rng.integers(len(head_chars), len(alphabet), len(step)))
+        
+        # Draw characters
+        for x, y, green, pick in zip(drops['x'][drop].tolist(), y_pos.tolist(),
+                                     greens.tolist(), picks.tolist()):
+            mask = self._get_glyph_mask(alphabet[pick], font)
+            frame.paste((0, green, 0), (x, y, x + mask.width, y + mask.height), mask)
         
         return frame, drops
     
-    def initialize_code_rain(self, width: int, height: int) -> list:
-        """Initialize code rain drops."""
-        drops = []
+    def _get_glyph_mask(self, char: str, font) -> Image.Image:
+        """
+        Get a rain glyph's coverage mask, rendering it on first use.
+        
+        Args:
+            char: Glyph to render
+            font: Font to render with
+        
+        Returns:
+            L mask laid out like draw.text at the paste origin
+        """
+        key = (char, font)
+        mask = self._glyph_masks.get(key)
+        if mask is None:
+            bbox = font.getbbox(char)
+            mask = Image.new('L', (max(bbox[2], 1), max(bbox[3], 1)), 0)
+            ImageDraw.Draw(mask).text((0, 0), char, fill=255, font=font)
+            self._glyph_masks[key] = mask
+        return mask
+    
+    def initialize_code_rain(self, width: int, height: int) -> Dict[str, np.ndarray]:
+        """Initialize code rain drops as parallel arrays of their fields."""
         drop_count = width // 15
         
-        for _ in range(drop_count):
-            drops.append({
-                'x': random.randint(0, width - 1),
-                'y': random.randint(-200, -20),
-                'speed': random.uniform(2, 6),
-                'length': random.randint(5, 15),
-                'age': 0
-            })
+        drops = {
+            'x': self._rng.integers(0, width, drop_count),
+            'y': self._rng.integers(-200, -19, drop_count).astype(np.float64),
+            'speed': self._rng.uniform(2, 6, drop_count),
+            'length': self._rng.integers(5, 16, drop_count),
+            'age': np.zeros(drop_count, dtype=np.int64),
+        }
         
         return drops
     
     def create_matrix_text(self, text: str, font_size: int = 36) -> Image.Image:
         """Create matrix-style text."""
-        from PIL import ImageFont
-        
-        try:
-            font = ImageFont.truetype("consola.ttf", font_size)
-        except:
-            try:
-                font = ImageFont.truetype("courier.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
+        font = get_font("consola.ttf", font_size, "courier.ttf")
         
         # Calculate text size
         temp_img = Image.new('RGBA', (1, 1), (0, 0, 0, 0))
@@ -210,30 +206,25 @@ class MatrixTheme(BaseTheme):
         canvas = Image.new('RGBA', (text_width, text_height), (0, 0, 0, 0))
         draw = ImageDraw.Draw(canvas)
         
-        # Draw text with vertical streaks
-        for x_offset in range(-2, 3):
-            for y_offset in range(-2, 3):
-                if x_offset == 0 and y_offset == 0:
-                    continue
-                
-                alpha = 30
-                color = (0, 100, 0, alpha)
-                draw.text((x_offset, y_offset), text, 
-                         fill=color, font=font)
+        # Nothing to draw for empty or whitespace-only text; filtering a
+        # zero-size mask crashes Pillow
+        if text_width == 0 or text_height == 0:
+            return canvas
+        
+        # Shadow streaks: the text spread 2px in every direction, i.e. its
+        # coverage dilated by a 5x5 max filter
+        coverage = Image.new('L', (text_width, text_height), 0)
+        ImageDraw.Draw(coverage).text((0, 0), text, fill=255, font=font)
+        canvas.paste((0, 100, 0, 30), (0, 0), coverage.filter(ImageFilter.MaxFilter(5)))
         
         # Draw main text
         draw.text((0, 0), text, fill=self.primary_color, font=font)
         
-        # Add flickering effect
-        flicker_mask = Image.new('L', (text_width, text_height), 255)
-        flicker_draw = ImageDraw.Draw(flicker_mask)
-        
-        # Randomly darken some pixels
-        for _ in range(text_width * text_height // 10):
-            x = random.randint(0, text_width - 1)
-            y = random.randint(0, text_height - 1)
-            flicker_draw.point((x, y), fill=random.randint(150, 255))
+        # Add flickering effect: randomly darken some pixels
+        flicker = np.full(text_width * text_height, 255, dtype=np.uint8)
+        count = text_width * text_height // 10
+        flicker[self._rng.integers(0, flicker.size, count)] = self._rng.integers(150, 256, count, dtype=np.uint8)
         
-        canvas.putalpha(flicker_mask)
+        canvas.putalpha(Image.fromarray(flicker.reshape(text_height, text_width), 'L'))
         
         return canvas
@@ -5,16 +5,28 @@ Neon theme for RAHL XMD pairing system.
 from typing import Tuple, List
 from PIL import Image, ImageDraw, ImageFilter
 import numpy as np
-import random
 import math
 
-from .base_theme import BaseTheme
+from .base_theme import BaseTheme, get_font
 from ..core.animation_engine import AnimationType
 
 
 class NeonTheme(BaseTheme):
     """Neon theme with vibrant glowing effects."""
     
+    # Image.point table for the HSV bands, using the same uint8 arithmetic
+    # as adjusting the arrays: hue shifted 180 toward cyan/magenta,
+    # saturation x1.5 and value (brightness) x1.3
+    _LEVELS = np.arange(256, dtype=np.uint8)
+    HSV_LUT = np.concatenate([
+        (_LEVELS + 180) % 255,
+        np.clip(_LEVELS * 1.5, 0, 255).astype(np.uint8),
+        np.clip(_LEVELS * 1.3, 0, 255).astype(np.uint8),
+    ]).tolist()
+    
+    # Blur radius of the glow around text
+    GLOW_RADIUS = 8
+    
     def __init__(self):
         super().__init__()
         self.name = "neon"
@@ -30,6 +42,8 @@ class NeonTheme(BaseTheme):
             "background": (10, 10, 20),   # Dark blue
             "glow": (200, 200, 255),      # Light purple glow
         }
+        
+        self._rng = np.random.default_rng()
     
     @property
     def primary_color(self) -> Tuple[int, int, int]:
@@ -45,24 +59,9 @@ class NeonTheme(BaseTheme):
     
     def apply_theme(self, image: Image.Image) -> Image.Image:
         """Apply neon effect to image."""
-        img_array = np.array(image)
-        
-        # Convert to HSV for better color manipulation
-        hsv_img = image.convert('HSV')
-        hsv_array = np.array(hsv_img)
-        
-        # Enhance saturation
-        hsv_array[:, :, 1] = np.clip(hsv_array[:, :, 1] * 1.5, 0, 255)
-        
-        # Shift hue toward neon colors
-        hue_shift = 180  # Shift toward cyan/magenta
-        hsv_array[:, :, 0] = (hsv_array[:, :, 0] + hue_shift) % 255
-        
-        # Increase value (brightness)
-        hsv_array[:, :, 2] = np.clip(hsv_array[:, :, 2] * 1.3, 0, 255)
-        
-        # Convert back to RGB
-        enhanced_img = Image.fromarray(hsv_array, 'HSV').convert('RGB')
+        # Shift hue and boost saturation and brightness in HSV, as one
+        # table lookup over all three bands
+        enhanced_img = image.convert('HSV').point(self.HSV_LUT).convert('RGB')
         
         # Apply glow effect
         glow = enhanced_img.filter(ImageFilter.GaussianBlur(radius=2))
@@ -117,48 +116,29 @@ class NeonTheme(BaseTheme):
                 draw.line([(0, y - offset), (width, y - offset)], 
                          fill=glow_line, width=1)
         
-        # Add random neon dots
+        # Add random neon dots. Their glow rings are drawn opaque on the RGB
+        # card in the dot's own color, so each dot is one disk of its full radius
         dot_count = (width * height) // 5000
-        for _ in range(dot_count):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-            
-            # Random neon color
-            colors = [self.primary_color, self.secondary_color, self.colors["accent"]]
-            color = random.choice(colors)
-            
-            # Draw dot with glow
-            radius = random.randint(2, 5)
-            for r in range(radius, 0, -1):
-                alpha = int(200 * (r / radius))
-                glow_color = (*color, alpha)
-                
-                left = x - r
-                top = y - r
-                right = x + r
-                bottom = y + r
-                
-                draw.ellipse([left, top, right, bottom], 
-                            fill=glow_color, outline=None)
+        dot_colors = [self.primary_color, self.secondary_color, self.colors["accent"]]
+        xs = self._rng.integers(0, width, dot_count)
+        ys = self._rng.integers(0, height, dot_count)
+        color_indices = self._rng.integers(0, len(dot_colors), dot_count)
+        radii = self._rng.integers(2, 6, dot_count)
+        
+        for x, y, color_index, radius in zip(xs.tolist(), ys.tolist(),
+                                             color_indices.tolist(), radii.tolist()):
+            draw.ellipse([x - radius, y - radius, x + radius, y + radius],
+                        fill=dot_colors[color_index], outline=None)
         
         # Add scan lines
-        scan_spacing = 4
-        for y in range(0, height, scan_spacing):
-            alpha = random.randint(10, 30)
-            draw.line([(0, y), (width, y)], 
-                     fill=(0, 255, 255, alpha), width=1)
+        self.add_scan_lines(background, 4, (0, 255, 255))
         
         return background
     
     def create_glow_effect(self, text: str, font_size: int = 48) -> Image.Image:
         """Create glowing text effect."""
-        from PIL import ImageFont
-        
         # Create text image
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        font = get_font("arial.ttf", font_size)
         
         # Calculate text size
         temp_img = Image.new('RGBA', (1, 1), (0, 0, 0, 0))
@@ -172,23 +152,16 @@ class NeonTheme(BaseTheme):
         canvas_width = text_width + padding * 2
         canvas_height = text_height + padding * 2
         
-        canvas = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(canvas)
+        # Glow: the text rendered once as a mask and blurred, used as the
+        # alpha of a primary colored canvas
+        mask = Image.new('L', (canvas_width, canvas_height), 0)
+        ImageDraw.Draw(mask).text((padding, padding), text, fill=255, font=font)
         
-        # Draw glow layers
-        glow_layers = 10
-        for i in range(glow_layers, 0, -1):
-            alpha = int(50 * (i / glow_layers))
-            glow_color = (*self.primary_color, alpha)
-            
-            # Draw text with offset for glow
-            offset = glow_layers - i
-            x = padding + offset
-            y = padding + offset
-            
-            draw.text((x, y), text, fill=glow_color, font=font)
+        canvas = Image.new('RGBA', (canvas_width, canvas_height), (*self.primary_color, 0))
+        canvas.putalpha(mask.filter(ImageFilter.GaussianBlur(self.GLOW_RADIUS)))
         
         # Draw main text
+        draw = ImageDraw.Draw(canvas)
         draw.text((padding, padding), text, 
                  fill=self.primary_color, font=font)
         
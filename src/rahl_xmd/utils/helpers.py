@@ -2,12 +2,48 @@
 Helper functions for RAHL XMD.
 """
 
+import re
 import uuid
 import random
 import string
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import hashlib
+import json
+import threading
+import zlib
+
+import numpy as np
+
+# Characters of generated IDs, and a byte -> character table for them;
+# bytes past the last whole multiple of len(_ID_CHARS) are dropped so
+# every character is equally likely
+_ID_CHARS = string.ascii_uppercase + string.digits
+_ID_LIMIT = 256 - 256 % len(_ID_CHARS)
+_ID_TABLE = bytes(ord(_ID_CHARS[b % len(_ID_CHARS)]) if b < _ID_LIMIT else 0 for b in range(256))
+_ID_REJECTED = bytes(range(_ID_LIMIT, 256))
+
+# Characters not allowed in filenames on common filesystems
+_INVALID_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+
+# Durations written as optional days, hours and minutes, in that order,
+# with optional whitespace around numbers and units; each unit's trailing
+# whitespace lives inside its group so no two \s* runs are adjacent and
+# non-matching input fails in linear time
+_DURATION_RE = re.compile(r'\s*(?:(\d+)\s*d\s*)?(?:(\d+)\s*h\s*)?(?:(\d+)\s*m\s*)?')
+
+# Age score indexed by how many of the 10 and 5 year thresholds the
+# age difference is within
+_AGE_SCORES = (0.05, 0.1, 0.15)
+_AGE_SCORES_ARRAY = np.array(_AGE_SCORES)
+
+# Bit index of each interest tag, assigned the first time a tag is seen
+# (bounded, so masks stay short; tags past the bound fall back to sets)
+MAX_INTEREST_BITS = 1024
+_INTEREST_BITS: Dict[str, int] = {}
+_INTEREST_BITS_LOCK = threading.Lock()
 
 
 def generate_id(prefix: str = "", length: int = 8) -> str:
@@ -21,9 +57,11 @@ def generate_id(prefix: str = "", length: int = 8) -> str:
     Returns:
         Unique ID string
     """
-    # Generate random alphanumeric string
-    chars = string.ascii_uppercase + string.digits
-    random_part = ''.join(random.choices(chars, k=length))
+    # Generate random alphanumeric string from one draw of random bytes
+    random_part = ''
+    while len(random_part) < length:
+        random_part += random.randbytes(length * 2).translate(_ID_TABLE, _ID_REJECTED).decode('ascii')
+    random_part = random_part[:length]
     
     return f"{prefix}{random_part}"
 
@@ -56,6 +94,76 @@ def format_timedelta(delta: timedelta) -> str:
         return f"{days}d {hours}h"
 
 
+@dataclass(slots=True)
+class CompatibilityProfile:
+    """A user's interests and preferences, prepared once for repeated matching."""
+    interests: frozenset
+    interest_mask: Optional[int]
+    interest_count: int
+    age: Any = None
+    timezone: Any = None
+    language: Any = 'en'
+    prefs_hash: int = 0
+    
+    @classmethod
+    def from_user(cls, interests: List[str], prefs: Dict[str, Any]) -> 'CompatibilityProfile':
+        """
+        Prepare a user's interests and preferences for matching.
+        
+        Args:
+            interests: User's interests
+            prefs: User's preferences
+        
+        Returns:
+            Profile to pass to calculate_profile_compatibility
+        """
+        return cls(frozenset(interests), _interest_mask(interests), len(interests), prefs.get('age'),
+                   prefs.get('timezone'), prefs.get('language', 'en'), _prefs_hash(prefs))
+
+
+def _interest_mask(interests: List[str]) -> Optional[int]:
+    """
+    Encode interests as a bitmask over the shared tag table.
+    
+    Args:
+        interests: User's interests
+    
+    Returns:
+        Integer with the bit of each interest set, or None if the table
+        is full and some interest has no bit
+    """
+    mask = 0
+    for interest in interests:
+        bit = _INTEREST_BITS.get(interest)
+        if bit is None:
+            with _INTEREST_BITS_LOCK:
+                bit = _INTEREST_BITS.get(interest)
+                if bit is None:
+                    if len(_INTEREST_BITS) >= MAX_INTEREST_BITS:
+                        return None
+                    bit = _INTEREST_BITS[interest] = len(_INTEREST_BITS)
+        mask |= 1 << bit
+    return mask
+
+
+def _prefs_hash(prefs: Dict[str, Any]) -> int:
+    """
+    Hash preferences stably across processes.
+    
+    Args:
+        prefs: User's preferences
+    
+    Returns:
+        CRC32 of the preferences in canonical JSON form
+    """
+    try:
+        canonical = json.dumps(prefs, sort_keys=True, default=str)
+    except TypeError:
+        # Keys of mixed types can't be sorted
+        canonical = repr(prefs)
+    return zlib.crc32(canonical.encode())
+
+
 def calculate_compatibility(user1_interests: List[str], 
                           user2_interests: List[str],
                           user1_prefs: Dict[str, Any],
@@ -63,55 +171,121 @@ def calculate_compatibility(user1_interests: List[str],
     """
     Calculate compatibility score between two users.
     
+    When one user is compared against many others, build each
+    CompatibilityProfile once and call calculate_profile_compatibility.
+    
     Args:
         user1_interests: First user's interests
         user2_interests: Second user's interests
         user1_prefs: First user's preferences
         user2_prefs: Second user's preferences
     
+    Returns:
+        Compatibility score (0.0 to 1.0)
+    """
+    return calculate_profile_compatibility(
+        CompatibilityProfile.from_user(user1_interests, user1_prefs),
+        CompatibilityProfile.from_user(user2_interests, user2_prefs),
+    )
+
+
+def calculate_profile_compatibility(user1: CompatibilityProfile,
+                                    user2: CompatibilityProfile) -> float:
+    """
+    Calculate compatibility score between two prepared users.
+    
+    Args:
+        user1: First user's profile
+        user2: Second user's profile
+    
     Returns:
         Compatibility score (0.0 to 1.0)
     """
     score = 0.0
     
     # Interest matching (40%)
-    if user1_interests and user2_interests:
-        common_interests = set(user1_interests) & set(user2_interests)
-        interest_score = len(common_interests) / max(len(user1_interests), 1) * 0.4
+    if user1.interest_count and user2.interest_count:
+        if user1.interest_mask is not None and user2.interest_mask is not None:
+            common_interests = (user1.interest_mask & user2.interest_mask).bit_count()
+        else:
+            common_interests = len(user1.interests & user2.interests)
+        interest_score = common_interests / user1.interest_count * 0.4
         score += interest_score
     
     # Preference matching (30%)
     # Compare age if available
-    age1 = user1_prefs.get('age')
-    age2 = user2_prefs.get('age')
-    if age1 and age2:
-        age_diff = abs(age1 - age2)
-        if age_diff <= 5:
-            score += 0.15
-        elif age_diff <= 10:
-            score += 0.1
-        else:
-            score += 0.05
+    if user1.age and user2.age:
+        age_diff = abs(user1.age - user2.age)
+        score += _AGE_SCORES[(age_diff <= 10) + (age_diff <= 5)]
     
     # Timezone matching (10%)
-    tz1 = user1_prefs.get('timezone')
-    tz2 = user2_prefs.get('timezone')
-    if tz1 and tz2 and tz1 == tz2:
+    if user1.timezone and user2.timezone and user1.timezone == user2.timezone:
         score += 0.1
     
     # Language matching (10%)
-    lang1 = user1_prefs.get('language', 'en')
-    lang2 = user2_prefs.get('language', 'en')
-    if lang1 == lang2:
+    if user1.language == user2.language:
         score += 0.1
     
     # Random factor for variety (10%)
-    random_factor = hash(f"{str(user1_prefs)}{str(user2_prefs)}") % 100 / 1000
+    random_factor = (user1.prefs_hash ^ user2.prefs_hash) % 100 / 1000
     score += random_factor
     
     return min(score, 1.0)
 
 
+def score_all_candidates(user: CompatibilityProfile,
+                         candidates: List[CompatibilityProfile]) -> np.ndarray:
+    """
+    Score a user's compatibility with many candidates at once.
+    
+    Args:
+        user: Profile of the user looking for a match
+        candidates: Candidate profiles
+    
+    Returns:
+        Array of compatibility scores (0.0 to 1.0), in candidate order
+    """
+    count = len(candidates)
+    scores = np.zeros(count)
+    
+    # Interest matching (40%)
+    if user.interest_count:
+        user_mask = user.interest_mask
+        if user_mask is not None:
+            common = np.fromiter(
+                ((user_mask & c.interest_mask).bit_count() if c.interest_mask is not None
+                 else len(user.interests & c.interests) for c in candidates),
+                dtype=np.float64, count=count)
+        else:
+            common = np.fromiter((len(user.interests & c.interests) for c in candidates),
+                                 dtype=np.float64, count=count)
+        scores += common / user.interest_count * 0.4
+    
+    # Preference matching (30%): age difference bucket, when both are known
+    if user.age:
+        ages = np.fromiter((c.age or np.nan for c in candidates), dtype=np.float64, count=count)
+        age_diff = np.abs(ages - user.age)
+        age_score = _AGE_SCORES_ARRAY[(age_diff <= 10).astype(np.intp) + (age_diff <= 5)]
+        scores += np.where(np.isnan(ages), 0.0, age_score)
+    
+    # Timezone matching (10%)
+    if user.timezone:
+        same_timezone = np.fromiter((c.timezone == user.timezone for c in candidates),
+                                    dtype=bool, count=count)
+        scores += same_timezone * 0.1
+    
+    # Language matching (10%)
+    same_language = np.fromiter((c.language == user.language for c in candidates),
+                                dtype=bool, count=count)
+    scores += same_language * 0.1
+    
+    # Random factor for variety (10%)
+    prefs_hashes = np.fromiter((c.prefs_hash for c in candidates), dtype=np.int64, count=count)
+    scores += (prefs_hashes ^ user.prefs_hash) % 100 / 1000
+    
+    return np.minimum(scores, 1.0)
+
+
 def find_shared_interests(user1_interests: List[str], 
                          user2_interests: List[str]) -> List[str]:
     """
@@ -127,27 +301,22 @@ def find_shared_interests(user1_interests: List[str],
     return list(set(user1_interests) & set(user2_interests))
 
 
+@lru_cache(maxsize=4096)
 def generate_color_from_string(text: str) -> Tuple[int, int, int]:
     """
     Generate a consistent color from a string.
     
+    Colors are cached per string, since the same user or label is
+    colored over and over.
+    
     Args:
         text: Input text
     
     Returns:
         RGB color tuple
     """
-    # Generate hash
-    hash_obj = hashlib.md5(text.encode())
-    hash_hex = hash_obj.hexdigest()
-    
-    # Take first 6 characters for color
-    color_hex = hash_hex[:6]
-    
-    # Convert to RGB
-    r = int(color_hex[0:2], 16)
-    g = int(color_hex[2:4], 16)
-    b = int(color_hex[4:6], 16)
+    # The first three digest bytes are the RGB channels
+    r, g, b = hashlib.md5(text.encode()).digest()[:3]
     
     return (r, g, b)
 
@@ -170,6 +339,28 @@ def truncate_text(text: str, max_length: int = 50, suffix: str = "...") -> str:
     return text[:max_length - len(suffix)] + suffix
 
 
+def make_truncator(max_length: int = 50, suffix: str = "...") -> Callable[[str], str]:
+    """
+    Build a truncate_text with fixed length and suffix, for truncating many texts.
+    
+    Args:
+        max_length: Maximum length
+        suffix: Suffix to add when truncated
+    
+    Returns:
+        Function truncating a text exactly like truncate_text
+    """
+    cut = max_length - len(suffix)
+    
+    def truncate(text: str) -> str:
+        if len(text) <= max_length:
+            return text
+        return text[:cut] + suffix
+    
+    return truncate
+
+
+@lru_cache(maxsize=256)
 def parse_duration_string(duration_str: str) -> Optional[timedelta]:
     """
     Parse duration string to timedelta.
@@ -180,31 +371,12 @@ def parse_duration_string(duration_str: str) -> Optional[timedelta]:
     Returns:
         Timedelta or None if invalid
     """
-    try:
-        # Parse days
-        days = 0
-        if 'd' in duration_str:
-            day_part = duration_str.split('d')[0]
-            days = int(day_part)
-            duration_str = duration_str.split('d')[1] if 'd' in duration_str[1:] else ''
-        
-        # Parse hours
-        hours = 0
-        if 'h' in duration_str:
-            hour_part = duration_str.split('h')[0]
-            hours = int(hour_part)
-            duration_str = duration_str.split('h')[1] if 'h' in duration_str[1:] else ''
-        
-        # Parse minutes
-        minutes = 0
-        if 'm' in duration_str:
-            minute_part = duration_str.split('m')[0]
-            minutes = int(minute_part)
-        
-        return timedelta(days=days, hours=hours, minutes=minutes)
-    
-    except (ValueError, IndexError):
+    match = _DURATION_RE.fullmatch(duration_str)
+    if not match or not any(match.groups()):
         return None
+    
+    days, hours, minutes = (int(group) if group else 0 for group in match.groups())
+    return timedelta(days=days, hours=hours, minutes=minutes)
 
 
 def get_file_extension(filename: str) -> str:
@@ -217,7 +389,8 @@ def get_file_extension(filename: str) -> str:
     Returns:
         File extension (lowercase, without dot)
     """
-    return filename.split('.')[-1].lower() if '.' in filename else ''
+    _, dot, extension = filename.rpartition('.')
+    return extension.lower() if dot else ''
 
 
 def sanitize_filename(filename: str) -> str:
@@ -231,8 +404,7 @@ def sanitize_filename(filename: str) -> str:
         Sanitized filename
     """
     # Remove invalid characters
-    import re
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _INVALID_FILENAME_RE.sub('_', filename)
     
     # Limit length
     if len(filename) > 255:
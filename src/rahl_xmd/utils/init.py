@@ -3,19 +3,35 @@ Utility modules for RAHL XMD pairing system.
 """
 
 from .logger import setup_logger, get_logger
-from .validators import validate_user_data, validate_pairing_code, validate_email
-from .helpers import generate_id, format_timedelta, calculate_compatibility
+from .validators import (
+    validate_user_data,
+    validate_user_data_batch,
+    validate_pairing_code,
+    validate_email,
+)
+from .helpers import (
+    generate_id,
+    format_timedelta,
+    calculate_compatibility,
+    calculate_profile_compatibility,
+    score_all_candidates,
+    CompatibilityProfile,
+)
 from .security import generate_secure_hash, encrypt_data, decrypt_data
 
 __all__ = [
     "setup_logger",
     "get_logger",
     "validate_user_data",
+    "validate_user_data_batch",
     "validate_pairing_code",
     "validate_email",
     "generate_id",
     "format_timedelta",
     "calculate_compatibility",
+    "calculate_profile_compatibility",
+    "score_all_candidates",
+    "CompatibilityProfile",
     "generate_secure_hash",
     "encrypt_data",
     "decrypt_data",
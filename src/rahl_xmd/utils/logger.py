@@ -3,10 +3,12 @@ Logging utilities for RAHL XMD.
 """
 
 import logging
+from logging.handlers import MemoryHandler, RotatingFileHandler
 import sys
+import time
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import colorama
 
 colorama.init()
@@ -25,12 +27,111 @@ class ColoredFormatter(logging.Formatter):
     
     RESET = colorama.Style.RESET_ALL
     
+    # Colored level names, built once and looked up by level number
+    COLORED_LEVELS = {
+        logging.getLevelName(levelname): f"{color}{levelname}{colorama.Style.RESET_ALL}"
+        for levelname, color in COLORS.items()
+    }
+    
     def format(self, record):
-        # Add color to levelname
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.RESET}"
+        # Color levelname for this handler only; the record is shared
+        # with the file handler, which must get the plain name
+        levelname = record.levelname
+        record.levelname = self.COLORED_LEVELS.get(record.levelno, levelname)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+
+# Formatters shared by every configured logger
+FILE_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Only color the console when it is a terminal
+CONSOLE_FORMATTER = (ColoredFormatter if sys.stdout.isatty() else logging.Formatter)(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
+)
+
+# Log file rotation size and number of rotated files kept
+LOG_FILE_MAX_BYTES = 32 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
+# Records buffered before a write to the log file; errors flush at once
+LOG_BUFFER_CAPACITY = 1024
+
+# Seconds a computed day stamp is reused; log files only roll over daily
+DAY_STAMP_TTL = 60
+
+# Time the day stamp was computed, and the stamp
+_day_stamp: Tuple[float, str] = (0.0, "")
+
+# One buffered file handler per log file, shared by every logger using it
+_file_handlers: Dict[Path, logging.Handler] = {}
+
+
+def _today_stamp() -> str:
+    """
+    Get today's date stamp for log file names.
+    
+    Returns:
+        Date as YYYYMMDD, recomputed at most once per DAY_STAMP_TTL seconds
+    """
+    global _day_stamp
+    now = time.time()
+    computed_at, stamp = _day_stamp
+    if now - computed_at >= DAY_STAMP_TTL:
+        stamp = time.strftime("%Y%m%d", time.localtime(now))
+        _day_stamp = (now, stamp)
+    return stamp
+
+
+@lru_cache(maxsize=None)
+def _ensure_log_dir(log_dir: str) -> Path:
+    """
+    Create a log directory once per process.
+    
+    Args:
+        log_dir: Directory for log files
+    
+    Returns:
+        Log directory path
+    """
+    log_path = Path(log_dir)
+    log_path.mkdir(exist_ok=True)
+    return log_path
+
+
+def _get_file_handler(log_file: Path) -> logging.Handler:
+    """
+    Get the shared buffered handler writing to a log file.
+    
+    Args:
+        log_file: Log file path
+    
+    Returns:
+        Handler writing to the log file
+    """
+    handler = _file_handlers.get(log_file)
+    if handler is None:
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUP_COUNT,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(FILE_FORMATTER)
         
-        return super().format(record)
+        handler = MemoryHandler(
+            capacity=LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
+        _file_handlers[log_file] = handler
+    return handler
 
 
 def setup_logger(name: str, 
@@ -57,35 +158,21 @@ def setup_logger(name: str,
     # Set level
     logger.setLevel(getattr(logging, level.upper()))
     
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    console_formatter = ColoredFormatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M:%S'
-    )
-    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(CONSOLE_FORMATTER)
     logger.addHandler(console_handler)
     
     # File handler
     if log_to_file:
         # Create log directory
-        log_path = Path(log_dir)
-        log_path.mkdir(exist_ok=True)
+        log_path = _ensure_log_dir(log_dir)
         
         # Create log file with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d")
+        timestamp = _today_stamp()
         log_file = log_path / f"rahl_xmd_{timestamp}.log"
         
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        logger.addHandler(_get_file_handler(log_file))
     
     return logger
 
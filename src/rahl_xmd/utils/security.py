@@ -6,12 +6,55 @@ import hashlib
 import hmac
 import base64
 import secrets
-from typing import Optional, Union
+from functools import lru_cache
+from typing import Optional, Tuple, Union
 import json
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2
 
+# Salt and iteration count of the Fernet key derivation
+KDF_SALT = b'rahl_xmd_salt_'  # In production, use random salt stored securely
+KDF_ITERATIONS = 100000
+
+
+@lru_cache(maxsize=8)
+def _derive_key(password: str, salt: bytes, iterations: int) -> bytes:
+    """
+    Derive a Fernet key from a password.
+    
+    Args:
+        password: Password to derive from
+        salt: KDF salt
+        iterations: PBKDF2 iteration count
+    
+    Returns:
+        URL-safe base64 encoded 32-byte key
+    """
+    kdf = PBKDF2(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
+
+@lru_cache(maxsize=32)
+def _byte_table(chars: str) -> Tuple[bytes, bytes]:
+    """
+    Build a byte -> character translation table for an ASCII alphabet.
+    
+    Args:
+        chars: Alphabet, at most 256 ASCII characters
+    
+    Returns:
+        The table, and the bytes to delete so every character is equally likely
+    """
+    limit = 256 - 256 % len(chars)
+    table = bytes(ord(chars[b % len(chars)]) if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
 
 class SecurityManager:
     """Manage security operations for RAHL XMD."""
@@ -24,6 +67,7 @@ class SecurityManager:
             secret_key: Optional secret key for encryption
         """
         self.secret_key = secret_key or self._generate_secret_key()
+        self._key_bytes = self.secret_key.encode()
         self.fernet = self._create_fernet(self.secret_key)
     
     @staticmethod
@@ -33,17 +77,8 @@ class SecurityManager:
     
     def _create_fernet(self, password: str) -> Fernet:
         """Create Fernet instance from password."""
-        # Derive key from password
-        salt = b'rahl_xmd_salt_'  # In production, use random salt stored securely
-        kdf = PBKDF2(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        
-        return Fernet(key)
+        # Derive key from password, once per password
+        return Fernet(_derive_key(password, KDF_SALT, KDF_ITERATIONS))
     
     def encrypt_data(self, data: Union[str, dict]) -> str:
         """
@@ -78,6 +113,24 @@ class SecurityManager:
         except json.JSONDecodeError:
             return decrypted
     
+    def generate_secure_hash_bytes(self, data: str, salt: Optional[str] = None) -> bytes:
+        """
+        Generate raw secure hash of data.
+        
+        Args:
+            data: Data to hash
+            salt: Optional salt
+        
+        Returns:
+            SHA-256 digest bytes
+        """
+        # Use SHA-256, streaming salt and data without joining them
+        hasher = hashlib.sha256()
+        if salt:
+            hasher.update(salt.encode())
+        hasher.update(data.encode())
+        return hasher.digest()
+    
     def generate_secure_hash(self, data: str, salt: Optional[str] = None) -> str:
         """
         Generate secure hash of data.
@@ -89,11 +142,21 @@ class SecurityManager:
         Returns:
             Hashed string
         """
-        if salt:
-            data = salt + data
+        return self.generate_secure_hash_bytes(data, salt).hex()
+    
+    def generate_hmac_digest(self, data: str, key: Optional[str] = None) -> bytes:
+        """
+        Generate raw HMAC digest for data.
         
-        # Use SHA-256
-        return hashlib.sha256(data.encode()).hexdigest()
+        Args:
+            data: Data to sign
+            key: Optional key (uses secret_key if not provided)
+        
+        Returns:
+            HMAC-SHA256 digest bytes
+        """
+        key_bytes = key.encode() if key else self._key_bytes
+        return hmac.new(key_bytes, data.encode(), hashlib.sha256).digest()
     
     def generate_hmac(self, data: str, key: Optional[str] = None) -> str:
         """
@@ -106,22 +169,29 @@ class SecurityManager:
         Returns:
             HMAC string
         """
-        key = key or self.secret_key
-        return hmac.new(key.encode(), data.encode(), hashlib.sha256).hexdigest()
+        return self.generate_hmac_digest(data, key).hex()
     
-    def verify_hmac(self, data: str, signature: str, key: Optional[str] = None) -> bool:
+    def verify_hmac(self, data: str, signature: Union[str, bytes], key: Optional[str] = None) -> bool:
         """
         Verify HMAC signature.
         
         Args:
             data: Original data
-            signature: HMAC signature
+            signature: HMAC signature, as hex string or raw digest bytes
             key: Optional key
         
         Returns:
             True if signature is valid
         """
-        expected = self.generate_hmac(data, key)
+        expected = self.generate_hmac_digest(data, key)
+        if isinstance(signature, str):
+            # Compare raw digests; a malformed hex signature never matches
+            if len(signature) != 2 * len(expected):
+                return False
+            try:
+                signature = bytes.fromhex(signature)
+            except ValueError:
+                return False
         return hmac.compare_digest(expected, signature)
     
     def generate_token(self, length: int = 32) -> str:
@@ -148,7 +218,16 @@ class SecurityManager:
         Returns:
             Code string
         """
-        return ''.join(secrets.choice(chars) for _ in range(length))
+        if not chars or len(chars) > 256 or not chars.isascii():
+            return ''.join(secrets.choice(chars) for _ in range(length))
+        
+        # Map one draw of random bytes through the alphabet, drawing again
+        # in the rare case too many bytes were rejected
+        table, rejected = _byte_table(chars)
+        code = ''
+        while len(code) < length:
+            code += secrets.token_bytes(length * 2).translate(table, rejected).decode('ascii')
+        return code[:length]
 
 
 # Global instance
@@ -167,6 +246,11 @@ def generate_secure_hash(data: str, salt: Optional[str] = None) -> str:
     return get_security_manager().generate_secure_hash(data, salt)
 
 
+def generate_secure_hash_bytes(data: str, salt: Optional[str] = None) -> bytes:
+    """Generate raw secure hash."""
+    return get_security_manager().generate_secure_hash_bytes(data, salt)
+
+
 def encrypt_data(data: Union[str, dict]) -> str:
     """Encrypt data."""
     return get_security_manager().encrypt_data(data)
@@ -5,7 +5,17 @@ Validation utilities for RAHL XMD.
 import re
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-from email.utils import parseaddr
+
+# Compiled once at import; validation runs on every user submission
+_USER_ID_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+_PAIRING_CODE_RE = re.compile(r'^[A-Z0-9][A-Z0-9-]*[A-Z0-9]$')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Longest valid email address (RFC 5321 path limit)
+MAX_EMAIL_LENGTH = 254
+
+# Largest metadata accepted, in characters of its JSON encoding
+MAX_METADATA_JSON_LENGTH = 10000
 
 
 def validate_user_data(user_data: Dict[str, Any]) -> bool:
@@ -37,7 +47,7 @@ def validate_user_data(user_data: Dict[str, Any]) -> bool:
         raise ValueError("user_id must be at least 3 characters")
     if len(user_id) > 50:
         raise ValueError("user_id must not exceed 50 characters")
-    if not re.match(r'^[a-zA-Z0-9_-]+$', user_id):
+    if not _USER_ID_RE.match(user_id):
         raise ValueError("user_id can only contain letters, numbers, underscores, and hyphens")
     
     # Validate username
@@ -71,6 +81,30 @@ def validate_user_data(user_data: Dict[str, Any]) -> bool:
     return True
 
 
+def validate_user_data_batch(records: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Validate many user registration records at once.
+    
+    Args:
+        records: User data dictionaries
+    
+    Returns:
+        True or False per record, in order; call validate_user_data on a
+        failing record for the reason
+    """
+    return [_is_valid_user_data(record) for record in records]
+
+
+def _is_valid_user_data(record: Any) -> bool:
+    """Check one user record without raising."""
+    if not isinstance(record, dict):
+        return False
+    try:
+        return validate_user_data(record)
+    except ValueError:
+        return False
+
+
 def validate_pairing_code(code: str) -> bool:
     """
     Validate pairing code format.
@@ -89,7 +123,7 @@ def validate_pairing_code(code: str) -> bool:
         return False
     
     # Alphanumeric with optional separators
-    if not re.match(r'^[A-Z0-9][A-Z0-9-]*[A-Z0-9]$', code):
+    if not _PAIRING_CODE_RE.match(code):
         return False
     
     return True
@@ -105,17 +139,10 @@ def validate_email(email: str) -> bool:
     Returns:
         True if valid
     """
-    if not isinstance(email, str):
-        return False
-    
-    # Check format
-    parsed = parseaddr(email)
-    if '@' not in parsed[1]:
-        return False
-    
-    # Basic regex validation
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    # Length limit first so oversized input never reaches the regex
+    return (isinstance(email, str)
+            and len(email) <= MAX_EMAIL_LENGTH
+            and _EMAIL_RE.fullmatch(email) is not None)
 
 
 def validate_theme(theme: str) -> bool:
@@ -175,10 +202,34 @@ def validate_timestamp(timestamp: str) -> bool:
         return False
 
 
+def _json_string_bound(text: str) -> int:
+    """Upper bound on the length of a string's default JSON encoding."""
+    # Printable ASCII escapes to at most 2 characters, anything else to
+    # at most 12 (a \uXXXX surrogate pair)
+    per_char = 2 if text.isascii() and text.isprintable() else 12
+    return per_char * len(text) + 2
+
+
+def _json_scalar_bound(value: Any) -> Optional[int]:
+    """Upper bound on the length of a scalar's JSON encoding, or None if not a scalar."""
+    if isinstance(value, str):
+        return _json_string_bound(value)
+    if value is None or isinstance(value, bool):
+        return 5
+    if isinstance(value, int):
+        return len(str(value))
+    if isinstance(value, float):
+        return 24
+    return None
+
+
 def validate_metadata(metadata: Dict[str, Any]) -> bool:
     """
     Validate metadata dictionary.
     
+    The JSON encoding is only built when cheap bounds on its length
+    can't decide the size check.
+    
     Args:
         metadata: Metadata dictionary
     
@@ -188,10 +239,27 @@ def validate_metadata(metadata: Dict[str, Any]) -> bool:
     if not isinstance(metadata, dict):
         return False
     
+    # Raw string lengths are a lower bound on the JSON length, and flat
+    # metadata of scalars has a cheap upper bound too
+    lower = upper = 2
+    for key, value in metadata.items():
+        if not isinstance(key, str):
+            upper = None
+            break
+        lower += len(key) + (len(value) if isinstance(value, str) else 1)
+        value_bound = _json_scalar_bound(value)
+        if upper is not None:
+            upper = None if value_bound is None else upper + _json_string_bound(key) + value_bound + 4
+    
+    if lower > MAX_METADATA_JSON_LENGTH and upper is not None:
+        return False
+    if upper is not None and upper <= MAX_METADATA_JSON_LENGTH:
+        return True
+    
     # Check size limits
     import json
     metadata_json = json.dumps(metadata)
-    if len(metadata_json) > 10000:  # 10KB limit
+    if len(metadata_json) > MAX_METADATA_JSON_LENGTH:  # 10KB limit
         return False
     
     return True
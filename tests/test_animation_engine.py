@@ -0,0 +1,25 @@
+"""
+Tests for the animation engine.
+"""
+
+from rahl_xmd.core import animation_engine
+from rahl_xmd.core.animation_engine import AnimationEngine, AnimationType
+from rahl_xmd.core.pairing_system import PairingCode
+
+
+def test_parallel_fade_animation_mixes_frame_modes(monkeypatch):
+    # Force the worker pool path even on a single-core host
+    monkeypatch.setattr(animation_engine.os, "cpu_count", lambda: 2)
+    
+    engine = AnimationEngine()
+    pairing_code = PairingCode(code="RAHL-TEST-1234", owner_id="user1")
+    total_frames = engine.PARALLEL_MIN_FRAMES
+    
+    frames = engine.create_animated_qr(pairing_code, AnimationType.FADE,
+                                       fps=total_frames, duration=1)
+    serial = engine._render_animation(engine._get_base_qr(pairing_code),
+                                      AnimationType.FADE, total_frames)
+    
+    assert len(frames) == total_frames
+    assert [frame.mode for frame in frames] == [frame.mode for frame in serial]
+    assert {frame.mode for frame in frames} == {'RGB', 'RGBA'}
@@ -0,0 +1,62 @@
+"""
+Tests for helper functions.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from rahl_xmd.utils import helpers
+from rahl_xmd.utils.helpers import (
+    CompatibilityProfile,
+    calculate_profile_compatibility,
+    parse_duration_string,
+    score_all_candidates,
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2h30m", timedelta(hours=2, minutes=30)),
+    ("1d", timedelta(days=1)),
+    ("45m", timedelta(minutes=45)),
+    ("1d2h3m", timedelta(days=1, hours=2, minutes=3)),
+    ("1d 2h", timedelta(days=1, hours=2)),
+    (" 2h", timedelta(hours=2)),
+    ("2h ", timedelta(hours=2)),
+    ("1d 2h 30m", timedelta(days=1, hours=2, minutes=30)),
+    ("2 h", timedelta(hours=2)),
+])
+def test_parse_duration_string(text, expected):
+    assert parse_duration_string(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", " ", "45", "abc", "1h2", "d", "30m2h"])
+def test_parse_duration_string_rejects_malformed(text):
+    assert parse_duration_string(text) is None
+
+
+def test_parse_duration_string_long_whitespace():
+    # Non-matching input must fail in linear time, not backtrack over
+    # every split of the whitespace
+    assert parse_duration_string(" " * 5000 + "x") is None
+    assert parse_duration_string("1d" + " " * 5000 + "x") is None
+    assert parse_duration_string(" " * 5000 + "2h" + " " * 5000) == timedelta(hours=2)
+
+
+def test_interest_table_is_bounded_and_scores_fall_back_to_sets(monkeypatch):
+    monkeypatch.setattr(helpers, "_INTEREST_BITS", {})
+    monkeypatch.setattr(helpers, "MAX_INTEREST_BITS", 3)
+    
+    user = CompatibilityProfile.from_user(["music", "games"], {})
+    candidates = [
+        CompatibilityProfile.from_user(["music", "art"], {}),
+        CompatibilityProfile.from_user(["games", "music", "travel"], {}),
+    ]
+    
+    assert len(helpers._INTEREST_BITS) == 3
+    assert user.interest_mask is not None
+    assert candidates[1].interest_mask is None
+    
+    scores = score_all_candidates(user, candidates)
+    assert list(scores) == [calculate_profile_compatibility(user, c) for c in candidates]
+    assert scores[1] - scores[0] == pytest.approx(0.2)
@@ -0,0 +1,23 @@
+"""
+Tests for the matrix theme.
+"""
+
+import pytest
+
+from rahl_xmd.themes.matrix_theme import MatrixTheme
+
+
+@pytest.mark.parametrize("text", ["", " ", "   "])
+def test_create_matrix_text_blank_text_returns_empty_canvas(text):
+    canvas = MatrixTheme().create_matrix_text(text)
+    
+    assert canvas.mode == 'RGBA'
+    assert 0 in canvas.size
+
+
+def test_create_matrix_text_draws_text():
+    canvas = MatrixTheme().create_matrix_text("RAHL")
+    
+    assert canvas.mode == 'RGBA'
+    assert canvas.width > 0 and canvas.height > 0
+    assert canvas.getbbox() is not None
@@ -0,0 +1,68 @@
+"""
+Tests for the pairing system's persistence.
+"""
+
+import pickle
+
+import pytest
+
+from rahl_xmd.core.pairing_system import SCHEMA_VERSION, PairingSystem
+
+
+def test_restart_after_torn_log_tail_keeps_new_entries(tmp_path):
+    system = PairingSystem(data_dir=str(tmp_path))
+    system.register_user("user1", "First")
+    system.register_user("user2", "Second")
+    system.flush()
+    
+    # Simulate a crash part way through writing an entry
+    with open(tmp_path / "users.wal", 'ab') as f:
+        f.write(b'{"op": "put", "key": "user3", "rec')
+    
+    system = PairingSystem(data_dir=str(tmp_path))
+    system.register_user("user4", "Fourth")
+    system.register_user("user5", "Fifth")
+    system.flush()
+    
+    system = PairingSystem(data_dir=str(tmp_path))
+    assert set(system.users) == {"user1", "user2", "user4", "user5"}
+
+
+def test_restart_replays_flushed_entries(tmp_path):
+    system = PairingSystem(data_dir=str(tmp_path))
+    system.register_user("user1", "First")
+    system.flush()
+    
+    system = PairingSystem(data_dir=str(tmp_path))
+    assert system.get_user("user1").username == "First"
+
+
+def test_unreadable_snapshot_fails_the_store_and_is_kept(tmp_path):
+    (tmp_path / "users.pkl").write_bytes(b"not a pickle")
+    
+    system = PairingSystem(data_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="Unreadable users snapshot"):
+        system.register_user("user1", "First")
+    system.flush()
+    
+    assert (tmp_path / "users.pkl").read_bytes() == b"not a pickle"
+
+
+def test_snapshot_of_other_schema_version_fails_the_store(tmp_path):
+    with open(tmp_path / "users.pkl", 'wb') as f:
+        pickle.dump({"version": SCHEMA_VERSION + 1, "records": {}}, f)
+    
+    system = PairingSystem(data_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="Unsupported users snapshot version"):
+        system.users
+
+
+def test_compacted_snapshot_reloads(tmp_path):
+    system = PairingSystem(data_dir=str(tmp_path))
+    for i in range(PairingSystem.WAL_COMPACT_MIN + 1):
+        system.register_user(f"user{i}", f"User {i}")
+    system.flush()
+    assert (tmp_path / "users.pkl").exists()
+    
+    system = PairingSystem(data_dir=str(tmp_path))
+    assert len(system.users) == PairingSystem.WAL_COMPACT_MIN + 1